@@ -1,52 +1,232 @@
-from fastapi import FastAPI, HTTPException
-from typing import Any, Dict
+from fastapi import Body, FastAPI, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from typing import Any, Dict, List, Literal
 from dotenv import load_dotenv
-from boteco import utils
+from boteco import db, utils
+from boteco.db import env_int
+from boteco.batch import BatchError, exec_batch, parse_batch
+from boteco.cache import get_result_cache
+from boteco.catalog import CallError, Catalog, get_catalog_cache
+from boteco.query import QueryError, ViewQuery
+from boteco.singleflight import get_single_flight
+from boteco.executor import ExecutorSaturated, executor_stats, run_db, shutdown_executor
+from boteco.streaming import MEDIA_TYPES, etag_for, etag_matches, render_json, stream_rows
 
 load_dotenv()
 
 app = FastAPI(title="Boteco Pro API")
 
+STREAM_CHUNK_SIZE = env_int('BOTECOPRO_STREAM_CHUNK_SIZE', 500)
+MAX_PAGE_SIZE = env_int('BOTECOPRO_MAX_PAGE_SIZE', 1000)
+MAX_BATCH_CALLS = env_int('BOTECOPRO_MAX_BATCH_CALLS', 100)
+VIEW_QUERY_PARAMS = {'stream', 'limit', 'order_by', 'cursor', 'select'}
 
-@app.on_event("startup")
-def startup() -> None:
-    _register_view_routes()
+_registered_views: set = set()
 
 
-def _register_view_routes() -> None:
-    views = []
+@app.on_event("startup")
+def startup() -> None:
+    try:
+        db.get_pool().fill()
+    except Exception:
+        # Database might not be available on startup
+        pass
     try:
-        views = utils.list_views()
+        catalog = get_catalog_cache().refresh()
     except Exception:
         # Database might not be available on startup
         return
-    for view in views:
+    _register_view_routes(catalog)
+
+
+@app.on_event("shutdown")
+def shutdown() -> None:
+    shutdown_executor()
+    db.close_pool()
+
+
+async def _catalog() -> Catalog:
+    cache = get_catalog_cache()
+    return cache.fresh() or await run_db(cache.get)
+
+
+def _register_view_routes(catalog: Catalog) -> None:
+    for view in catalog.views:
+        if view in _registered_views:
+            continue
         route = '/' + view.replace('view_', '').replace('_', '/')
+        app.get(route, name=view)(_make_view_handler(view))
+        _registered_views.add(view)
+
+
+def _make_view_handler(view: str):
+    async def handler(
+        request: Request,
+        stream: Literal['ndjson', 'json'] | None = None,
+        limit: int | None = Query(None, ge=1, le=MAX_PAGE_SIZE),
+        order_by: str | None = None,
+        cursor: str | None = None,
+        select: str | None = None,
+    ):
+        try:
+            columns = (await _catalog()).views.get(view)
+        except ExecutorSaturated as e:
+            raise HTTPException(status_code=503, detail=str(e))
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+        if columns is None:
+            raise HTTPException(status_code=404, detail=f'view {view} no longer exists')
+        try:
+            if stream is not None and (limit is not None or cursor is not None):
+                raise QueryError('stream cannot be combined with limit or cursor')
+            filters = [(key, value) for key, value in request.query_params.multi_items()
+                       if key not in VIEW_QUERY_PARAMS]
+            query = ViewQuery(view, columns, order_by=order_by, limit=limit, cursor=cursor,
+                              select=select, filters=filters)
+        except QueryError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        try:
+            if stream is None:
+                (body, next_cursor, etag), hit = await _cached_page(view, query, request)
+                headers = {'ETag': etag, 'Cache-Control': 'no-cache', 'X-Cache': 'HIT' if hit else 'MISS'}
+                if next_cursor:
+                    headers['X-Next-Cursor'] = next_cursor
+                # A hit compares the stored ETag without touching the database. On a
+                # miss the query has to run: the ETag hashes the current rows and no
+                # cheaper indicator covers writes made outside the API
+                if etag_matches(request.headers.get('if-none-match'), etag):
+                    return Response(status_code=304, headers=headers)
+                return Response(body, media_type='application/json', headers=headers)
+            chunks = utils.iter_view_chunks(view, STREAM_CHUNK_SIZE, query)
+            # Pull the first chunk here so query errors still become a 500
+            head = await run_db(next, chunks, None)
+        except ExecutorSaturated as e:
+            raise HTTPException(status_code=503, detail=str(e))
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+        return StreamingResponse(stream_rows(chunks, stream, head), media_type=MEDIA_TYPES[stream])
+
+    return handler
+
+
+async def _cached_page(view: str, query: ViewQuery, request: Request):
+    cache = get_result_cache()
+    use_cache = cache.ttl_for(view) > 0
+    key = tuple(sorted(request.query_params.multi_items()))
+    if use_cache:
+        cached = cache.get(view, key)
+        if cached is not None:
+            return cached, True
+
+    generation = cache.generation(view)
 
-        async def handler(v=view):
-            try:
-                return utils.fetch_view(v)
-            except Exception as e:
-                raise HTTPException(status_code=500, detail=str(e))
+    async def load():
+        page = await _render_page(view, query)
+        if use_cache:
+            cache.put(view, key, page, len(page[0]), generation)
+        return page
 
-        app.get(route, name=view)(handler)
+    # Identical concurrent reads share a single query, but never one that
+    # started before a write invalidated the view
+    return await get_single_flight().do((view, generation, key), load, group=view), False
+
+
+async def _render_page(view: str, query: ViewQuery):
+    rows, next_cursor = query.paginate(await run_db(utils.fetch_view, view, query))
+    body = render_json(rows)
+    return body, next_cursor, etag_for(body)
+
+
+# Declared before /exec/{procedure_name} so 'batch' is not taken as a procedure name
+@app.post('/exec/batch')
+async def execute_batch(calls: List[Dict[str, Any]] = Body(..., embed=True)):
+    if len(calls) > MAX_BATCH_CALLS:
+        raise HTTPException(status_code=400, detail=f'batch exceeds {MAX_BATCH_CALLS} calls')
+    try:
+        catalog = await _catalog()
+        batch = parse_batch(calls, catalog)
+        try:
+            results = await run_db(exec_batch, batch)
+        finally:
+            written = set()
+            for call in batch:
+                written |= catalog.views_written_by(call.procedure)
+            get_result_cache().invalidate(written)
+    except CallError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except BatchError as e:
+        raise HTTPException(status_code=500, detail={'call': e.index, 'error': str(e)})
+    except ExecutorSaturated as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    return {'results': [{'procedure': call.procedure, 'as': call.alias, 'rows': rows}
+                        for call, rows in zip(batch, results)]}
 
 
 @app.post('/exec/{procedure_name}')
 async def execute_procedure(procedure_name: str, body: Dict[str, Any] | None = None):
     body = body or {}
     try:
-        return utils.exec_procedure(procedure_name, body)
+        catalog = await _catalog()
+        procedure = catalog.procedure(procedure_name)
+        if procedure is None:
+            raise HTTPException(status_code=404, detail=f'unknown procedure {procedure_name}')
+        args = dict(procedure.bind(body))
+        try:
+            return await run_db(utils.exec_procedure, procedure.name, args)
+        finally:
+            # Also on failure: the procedure may have written before raising
+            get_result_cache().invalidate(catalog.views_written_by(procedure.name))
+    except HTTPException:
+        raise
+    except CallError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except ExecutorSaturated as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.get('/')
-def index():
+async def index():
     try:
-        views = utils.list_views()
-        procs = utils.list_procedures()
+        catalog = await _catalog()
+        views = list(catalog.views)
+        procs = list(catalog.procedures)
     except Exception:
         views = []
         procs = []
     return {'views': views, 'procedures': procs}
+
+
+@app.get('/catalog')
+async def catalog_detail():
+    try:
+        return (await _catalog()).as_dict()
+    except ExecutorSaturated as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.post('/catalog/refresh')
+async def catalog_refresh():
+    try:
+        catalog = await run_db(get_catalog_cache().refresh)
+    except ExecutorSaturated as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    _register_view_routes(catalog)
+    return {'views': len(catalog.views), 'procedures': len(catalog.procedures)}
+
+
+@app.get('/stats')
+def stats():
+    return {
+        'pool': db.pool_stats(),
+        'executor': executor_stats(),
+        'cache': get_result_cache().stats(),
+        'singleflight': get_single_flight().stats(),
+    }
@@ -0,0 +1,115 @@
+from typing import Any, Dict, List, Sequence, Tuple
+
+from .catalog import CallError, Catalog
+from .db import get_cursor
+from .utils import call_procedure
+
+
+class BatchError(Exception):
+    """A call failed while the batch ran; ``index`` is its position in the request."""
+
+    def __init__(self, index: int, message: str):
+        super().__init__(message)
+        self.index = index
+
+
+class Ref:
+    """Placeholder for a column of the first row returned by an earlier call."""
+
+    __slots__ = ('call', 'column')
+
+    def __init__(self, call: int, column: str):
+        self.call = call
+        self.column = column
+
+    def resolve(self, results: Sequence[List[Dict[str, Any]]]) -> Any:
+        rows = results[self.call]
+        if not rows:
+            raise CallError(f'call {self.call} returned no rows')
+        for column, value in rows[0].items():
+            if column.lower() == self.column.lower():
+                return value
+        raise CallError(f"call {self.call} returned no column '{self.column}'")
+
+
+class BatchCall:
+    __slots__ = ('procedure', 'args', 'alias')
+
+    def __init__(self, procedure: str, args: List[Tuple[str, Any]], alias: str | None = None):
+        self.procedure = procedure
+        self.args = args
+        self.alias = alias
+
+
+def _parse_ref(spec: Any, aliases: Dict[str, int], index: int) -> Ref:
+    if not isinstance(spec, str) or '.' not in spec:
+        raise CallError("$ref must look like '<call>.<column>'")
+    target, _, column = spec.partition('.')
+    if target.isdigit():
+        call = int(target)
+    elif target in aliases:
+        call = aliases[target]
+    else:
+        raise CallError(f"$ref to unknown call '{target}'")
+    if call >= index:
+        raise CallError(f"$ref '{spec}' must point to an earlier call")
+    return Ref(call, column)
+
+
+def parse_batch(calls: List[Dict[str, Any]], catalog: Catalog) -> List[BatchCall]:
+    """Validate ``[{"procedure": ..., "params": {...}, "as": ...}, ...]``.
+
+    A parameter value of ``{"$ref": "<call>.<column>"}`` is replaced at run
+    time by that column of the first row returned by an earlier call, named
+    either by its position or by its ``as`` alias.
+    """
+    if not calls:
+        raise CallError('batch is empty')
+    parsed: List[BatchCall] = []
+    aliases: Dict[str, int] = {}
+    for index, call in enumerate(calls):
+        try:
+            if not isinstance(call, dict):
+                raise CallError('call must be an object')
+            procedure = catalog.procedure(call.get('procedure'))
+            if procedure is None:
+                raise CallError(f"unknown procedure {call.get('procedure')}")
+            params = call.get('params') or {}
+            if not isinstance(params, dict):
+                raise CallError('params must be an object')
+            args = {}
+            for key, value in params.items():
+                if isinstance(value, dict) and set(value) == {'$ref'}:
+                    value = _parse_ref(value['$ref'], aliases, index)
+                args[key] = value
+            alias = call.get('as')
+            if alias is not None:
+                if not isinstance(alias, str) or not alias or alias.isdigit() or alias in aliases:
+                    raise CallError(f"invalid or repeated alias '{alias}'")
+                aliases[alias] = index
+            parsed.append(BatchCall(procedure.name, procedure.bind(args), alias))
+        except CallError as e:
+            raise CallError(f'call {index}: {e}')
+    return parsed
+
+
+def exec_batch(calls: List[BatchCall]) -> List[List[Dict[str, Any]]]:
+    """Run every call on one connection and commit once; roll back on any error."""
+    results: List[List[Dict[str, Any]]] = []
+    with get_cursor() as cur:
+        try:
+            for index, call in enumerate(calls):
+                try:
+                    params = {name: value.resolve(results) if isinstance(value, Ref) else value
+                              for name, value in call.args}
+                except CallError as e:
+                    raise BatchError(index, str(e))
+                try:
+                    results.append(call_procedure(cur, call.procedure, params))
+                except Exception as e:
+                    raise BatchError(index, str(e)) from e
+            cur.commit()
+        except BaseException:
+            cur.rollback()
+            raise
+    return results
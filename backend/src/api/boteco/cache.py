@@ -0,0 +1,136 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Iterable, Tuple
+
+from .db import env_float, env_int
+
+
+def parse_ttls(spec: str | None) -> Dict[str, float]:
+    """Parse ``"view_a=2,view_b=60"`` into per-view TTLs in seconds."""
+    ttls: Dict[str, float] = {}
+    for item in (spec or '').split(','):
+        name, sep, value = item.partition('=')
+        if sep and name.strip():
+            ttls[name.strip()] = float(value)
+    return ttls
+
+
+class ResultCache:
+    """LRU cache of rendered view responses, bounded by total size in bytes.
+
+    Entries are grouped by view so a write can drop every cached page of the
+    views it affects. Each view carries a generation number: a result read
+    before an invalidation is not stored afterwards, so a slow read cannot
+    put stale rows back into the cache.
+    """
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024, default_ttl: float = 5.0,
+                 ttls: Dict[str, float] | None = None):
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self.ttls = ttls or {}
+        self._entries: OrderedDict = OrderedDict()
+        self._bytes = 0
+        self._generations: Dict[str, int] = {}
+        self._views: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+    def ttl_for(self, view: str) -> float:
+        return self.ttls.get(view, self.default_ttl)
+
+    def _counter(self, view: str) -> Dict[str, int]:
+        counters = self._views.get(view)
+        if counters is None:
+            counters = self._views[view] = {
+                'hits': 0, 'misses': 0, 'invalidations': 0, 'evictions': 0,
+            }
+        return counters
+
+    def generation(self, view: str) -> int:
+        with self._lock:
+            return self._generations.get(view, 0)
+
+    def get(self, view: str, key: Hashable) -> Any:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get((view, key))
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end((view, key))
+                self._counter(view)['hits'] += 1
+                return entry[1]
+            if entry is not None:
+                self._remove((view, key))
+            self._counter(view)['misses'] += 1
+            return None
+
+    def put(self, view: str, key: Hashable, value: Any, size: int, generation: int) -> None:
+        ttl = self.ttl_for(view)
+        if ttl <= 0 or size > self.max_bytes:
+            return
+        with self._lock:
+            if self._generations.get(view, 0) != generation:
+                return
+            if (view, key) in self._entries:
+                self._remove((view, key))
+            self._entries[(view, key)] = (time.monotonic() + ttl, value, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self._counter(oldest[0])['evictions'] += 1
+
+    def _remove(self, full_key: Tuple[str, Hashable]) -> None:
+        _, _, size = self._entries.pop(full_key)
+        self._bytes -= size
+
+    def invalidate(self, views: Iterable[str]) -> None:
+        views = set(views)
+        if not views:
+            return
+        with self._lock:
+            for view in views:
+                self._generations[view] = self._generations.get(view, 0) + 1
+                self._counter(view)['invalidations'] += 1
+            for full_key in [k for k in self._entries if k[0] in views]:
+                self._remove(full_key)
+
+    def clear(self) -> None:
+        with self._lock:
+            for view in set(self._views) | {k[0] for k in self._entries}:
+                self._generations[view] = self._generations.get(view, 0) + 1
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            entries: Dict[str, int] = {}
+            for view, _ in self._entries:
+                entries[view] = entries.get(view, 0) + 1
+            return {
+                'max_bytes': self.max_bytes,
+                'bytes': self._bytes,
+                'entries': len(self._entries),
+                'views': {
+                    view: {**counters, 'entries': entries.get(view, 0), 'ttl': self.ttl_for(view)}
+                    for view, counters in self._views.items()
+                },
+            }
+
+
+_cache: ResultCache | None = None
+_cache_lock = threading.Lock()
+
+
+def get_result_cache() -> ResultCache:
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = ResultCache(
+                    max_bytes=env_int('BOTECOPRO_CACHE_MAX_BYTES', 64 * 1024 * 1024),
+                    default_ttl=env_float('BOTECOPRO_CACHE_TTL', 5.0),
+                    ttls=parse_ttls(os.getenv('BOTECOPRO_CACHE_TTLS')),
+                )
+    return _cache
@@ -0,0 +1,316 @@
+import re
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Set, Tuple
+
+from . import utils
+from .db import env_float
+from .query import QueryError, convert_value
+
+
+class CallError(ValueError):
+    pass
+
+
+class Parameter:
+    __slots__ = ('name', 'type_name', 'is_output', 'is_table', 'has_default', 'default',
+                 'schema', 'columns')
+
+    def __init__(self, name: str, type_name: str, is_output: bool = False,
+                 is_table: bool = False, default: str | None = None,
+                 schema: str = 'dbo', columns: List[Tuple[str, str]] | None = None):
+        self.name = name
+        self.type_name = type_name
+        self.is_output = is_output
+        self.is_table = is_table
+        self.has_default = default is not None
+        self.default = default
+        self.schema = schema
+        self.columns = columns or []
+
+    def table_value(self, value: Any) -> list:
+        """Turn a JSON array of row objects into a pyodbc table-valued parameter.
+
+        Rows become tuples in the column order of the table type; columns
+        left out of a row are sent as NULL.
+        """
+        if not isinstance(value, list):
+            raise CallError(f"parameter '{self.name}' expects a list of rows")
+        by_name = {col.lower(): (col, data_type) for col, data_type in self.columns}
+        rows = []
+        for i, item in enumerate(value):
+            if not isinstance(item, dict):
+                raise CallError(f"{self.name}[{i}] must be an object")
+            row = {}
+            for key, cell in item.items():
+                column = by_name.get(key.lower())
+                if column is None:
+                    raise CallError(f"unknown column '{key}' in {self.name}[{i}]")
+                try:
+                    row[column[0]] = None if cell is None else convert_value(str(cell), column[1])
+                except QueryError as e:
+                    raise CallError(f'{self.name}[{i}].{column[0]}: {e}')
+            rows.append(tuple(row.get(col) for col, _ in self.columns))
+        # pyodbc reads the type name and schema from the first two elements
+        return [self.type_name, self.schema, *rows]
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            'name': self.name,
+            'type': self.type_name,
+            'output': self.is_output,
+            'table': self.is_table,
+            'required': not self.has_default,
+            'default': self.default,
+            **({'columns': [{'name': col, 'type': data_type} for col, data_type in self.columns]}
+               if self.is_table else {}),
+        }
+
+
+class Procedure:
+    def __init__(self, name: str, parameters: List[Parameter]):
+        self.name = name
+        self.parameters = parameters
+        self._by_name = {p.name.lower(): p for p in parameters}
+
+    def bind(self, args: Dict[str, Any]) -> List[Tuple[str, Any]]:
+        """Match JSON arguments to declared parameters by name.
+
+        Returns ``(name, value)`` pairs in declaration order; raises
+        ``CallError`` for unknown or missing arguments.
+        """
+        provided = {}
+        for key, value in args.items():
+            param = self._by_name.get(key.lstrip('@').lower())
+            if param is None:
+                raise CallError(f"unknown parameter '{key}' for {self.name}")
+            provided[param.name] = param.table_value(value) if param.is_table else value
+        missing = [p.name for p in self.parameters
+                   if not p.has_default and p.name not in provided]
+        if missing:
+            raise CallError(f"missing parameters for {self.name}: {', '.join(missing)}")
+        return [(p.name, provided[p.name]) for p in self.parameters if p.name in provided]
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {'name': self.name, 'parameters': [p.as_dict() for p in self.parameters]}
+
+
+class Catalog:
+    def __init__(self, views: Dict[str, Dict[str, str]], procedures: Dict[str, Procedure],
+                 view_tables: Dict[str, Set[str]] | None = None,
+                 procedure_writes: Dict[str, Set[str] | None] | None = None):
+        self.views = views
+        self.procedures = procedures
+        self.view_tables = view_tables or {}
+        self.procedure_writes = procedure_writes or {}
+        self.loaded_at = time.time()
+        self._procedures_by_lower = {name.lower(): proc for name, proc in procedures.items()}
+
+    def procedure(self, name: Any) -> Procedure | None:
+        """Look a procedure up the way SQL Server resolves names: case-insensitively."""
+        if not isinstance(name, str):
+            return None
+        return self.procedures.get(name) or self._procedures_by_lower.get(name.lower())
+
+    def views_written_by(self, procedure: str) -> Set[str]:
+        """Views whose underlying tables ``procedure`` may modify.
+
+        Procedures whose writes cannot be derived (unknown or dynamic SQL)
+        conservatively affect every view.
+        """
+        written = self.procedure_writes.get(procedure)
+        if written is None:
+            return set(self.views)
+        return {view for view, tables in self.view_tables.items() if tables & written}
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            'loaded_at': self.loaded_at,
+            'views': [{'name': name, 'columns': [{'name': col, 'type': data_type}
+                                                 for col, data_type in columns.items()]}
+                      for name, columns in self.views.items()],
+            'procedures': [proc.as_dict() for proc in self.procedures.values()],
+        }
+
+
+_COMMENTS = re.compile(r'--[^\n]*|/\*.*?\*/', re.DOTALL)
+_HEADER = re.compile(r'\bPROC(?:EDURE)?\s+\S+(.*?)\bAS\b', re.IGNORECASE | re.DOTALL)
+_TRAILING_KEYWORDS = re.compile(r'\s+(?:OUT|OUTPUT|READONLY)\s*$', re.IGNORECASE)
+
+
+def _split_top_level(text: str) -> List[str]:
+    parts, depth, quoted, start = [], 0, False, 0
+    for i, ch in enumerate(text):
+        if ch == "'":
+            quoted = not quoted
+        elif not quoted and ch == '(':
+            depth += 1
+        elif not quoted and ch == ')':
+            depth -= 1
+        elif not quoted and depth == 0 and ch == ',':
+            parts.append(text[start:i])
+            start = i + 1
+    parts.append(text[start:])
+    return parts
+
+
+def parameter_defaults(definition: str) -> Dict[str, str]:
+    """Read ``@param ... = default`` from a procedure's source.
+
+    ``sys.parameters`` does not record defaults of T-SQL procedures, so the
+    parameter list in the module definition is the only source for them.
+    """
+    match = _HEADER.search(_COMMENTS.sub(' ', definition or ''))
+    if not match:
+        return {}
+    defaults = {}
+    for part in _split_top_level(match.group(1)):
+        part = part.strip()
+        if not part.startswith('@'):
+            continue
+        # Types never contain '=', so the first one starts the default
+        declaration, _, default = part.partition('=')
+        if default.strip():
+            name = declaration.split()[0][1:]
+            defaults[name.lower()] = _TRAILING_KEYWORDS.sub('', default.strip())
+    return defaults
+
+
+_WRITES = re.compile(r'\b(?:INSERT|UPDATE|DELETE|MERGE|TRUNCATE)\b', re.IGNORECASE)
+_DYNAMIC_SQL = re.compile(r'\bEXEC(?:UTE)?\s*\(|\bsp_executesql\b', re.IGNORECASE)
+_READ_THROUGH = {'V', 'IF', 'TF', 'FN'}
+
+
+def resolve_dependencies(dependencies: Iterable[Tuple[str, str, str, str]],
+                         triggers: Dict[str, str], definitions: Dict[str, str],
+                         views: Iterable[str]) -> Tuple[Dict[str, Set[str]], Dict[str, Set[str] | None]]:
+    """Derive the tables behind each view and the tables each procedure writes.
+
+    Views are followed through nested views and functions down to base
+    tables. A procedure writes every table it references when its source
+    contains a DML statement, plus whatever the procedures it calls write,
+    plus whatever the triggers on those tables touch. ``None`` marks a
+    procedure built on dynamic SQL whose writes cannot be known.
+    """
+    refs: Dict[str, Set[Tuple[str, str]]] = {}
+    for referencing, _, referenced, referenced_type in dependencies:
+        refs.setdefault(referencing, set()).add((referenced, referenced_type))
+    table_triggers: Dict[str, List[str]] = {}
+    for trigger, table in triggers.items():
+        table_triggers.setdefault(table, []).append(trigger)
+
+    def read_tables(name: str, seen: Set[str]) -> Set[str]:
+        tables: Set[str] = set()
+        for referenced, referenced_type in refs.get(name, ()):
+            if referenced_type == 'U':
+                tables.add(referenced)
+            elif referenced_type in _READ_THROUGH and referenced not in seen:
+                seen.add(referenced)
+                tables |= read_tables(referenced, seen)
+        return tables
+
+    def direct_writes(name: str, seen: Set[str]) -> Set[str] | None:
+        definition = _COMMENTS.sub(' ', definitions.get(name, ''))
+        if name in definitions and _DYNAMIC_SQL.search(definition):
+            return None
+        # Triggers have no entry in definitions and are always treated as writers
+        writes_tables = name not in definitions or bool(_WRITES.search(definition))
+        written: Set[str] = set()
+        for referenced, referenced_type in refs.get(name, ()):
+            if referenced_type == 'U' and writes_tables:
+                written.add(referenced)
+            elif referenced_type == 'P' and referenced not in seen:
+                seen.add(referenced)
+                nested = direct_writes(referenced, seen)
+                if nested is None:
+                    return None
+                written |= nested
+        return written
+
+    def writes(name: str) -> Set[str] | None:
+        seen = {name}
+        written = direct_writes(name, seen)
+        if written is None:
+            return None
+        pending = list(written)
+        while pending:
+            for trigger in table_triggers.get(pending.pop(), ()):
+                if trigger in seen:
+                    continue
+                seen.add(trigger)
+                nested = direct_writes(trigger, seen)
+                if nested is None:
+                    return None
+                pending.extend(nested - written)
+                written |= nested
+        return written
+
+    view_tables = {view: read_tables(view, {view}) for view in views}
+    procedure_writes = {proc: writes(proc) for proc in definitions}
+    return view_tables, procedure_writes
+
+
+def load_catalog() -> Catalog:
+    views = utils.list_view_columns()
+    definitions = utils.list_procedure_definitions()
+    defaults = {proc: parameter_defaults(definition) for proc, definition in definitions.items()}
+    table_types = utils.list_table_types()
+    params: Dict[str, List[Parameter]] = {proc: [] for proc in definitions}
+    for proc, name, type_name, is_output, is_table in utils.list_procedure_parameters():
+        name = name.lstrip('@')
+        schema, columns = table_types.get(type_name, ('dbo', [])) if is_table else ('dbo', [])
+        params.setdefault(proc, []).append(Parameter(
+            name, type_name, bool(is_output), bool(is_table),
+            defaults.get(proc, {}).get(name.lower()), schema, columns,
+        ))
+    procedures = {proc: Procedure(proc, proc_params) for proc, proc_params in params.items()}
+    view_tables, procedure_writes = resolve_dependencies(
+        utils.list_dependencies(), utils.list_triggers(), definitions, views,
+    )
+    return Catalog(views, procedures, view_tables, procedure_writes)
+
+
+class CatalogCache:
+    def __init__(self, loader: Callable[[], Catalog] = load_catalog, ttl: float = 300.0):
+        self._loader = loader
+        self.ttl = ttl
+        self._catalog: Catalog | None = None
+        self._loaded_at = 0.0
+        self._lock = threading.Lock()
+
+    def fresh(self) -> Catalog | None:
+        """Return the cached catalog without touching the database, or None if stale."""
+        if self._catalog is not None and time.monotonic() - self._loaded_at < self.ttl:
+            return self._catalog
+        return None
+
+    def get(self) -> Catalog:
+        catalog = self.fresh()
+        if catalog is not None:
+            return catalog
+        with self._lock:
+            # Another thread may have reloaded while we waited for the lock
+            return self.fresh() or self._load()
+
+    def refresh(self) -> Catalog:
+        with self._lock:
+            return self._load()
+
+    def _load(self) -> Catalog:
+        catalog = self._loader()
+        self._catalog = catalog
+        self._loaded_at = time.monotonic()
+        return catalog
+
+
+_cache: CatalogCache | None = None
+_cache_lock = threading.Lock()
+
+
+def get_catalog_cache() -> CatalogCache:
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = CatalogCache(ttl=env_float('BOTECOPRO_CATALOG_TTL', 300.0))
+    return _cache
@@ -1,6 +1,11 @@
 import os
-import pyodbc
+import threading
+import time
+from collections import deque
 from contextlib import contextmanager
+from typing import Any, Callable, Dict
+
+import pyodbc
 
 
 def get_connection_string() -> str:
@@ -14,12 +19,267 @@ def connect():
     return pyodbc.connect(get_connection_string())
 
 
+def env_int(name: str, default: int) -> int:
+    value = os.getenv(name)
+    return int(value) if value else default
+
+
+def env_float(name: str, default: float) -> float:
+    value = os.getenv(name)
+    return float(value) if value else default
+
+
+class PoolTimeout(RuntimeError):
+    pass
+
+
+class PoolClosed(RuntimeError):
+    pass
+
+
+class _PooledConnection:
+    __slots__ = ('conn', 'created_at', 'last_used')
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+
+
+class ConnectionPool:
+    """Bounded pool of pyodbc connections.
+
+    Connections idle for longer than ``ping_after`` seconds are checked with a
+    ``SELECT 1`` before being handed out, connections older than
+    ``max_lifetime`` seconds are closed instead of reused, and every
+    connection is rolled back before going back to the idle list.
+    """
+
+    def __init__(self, factory: Callable[[], Any] = connect, max_size: int = 10,
+                 min_idle: int = 2, max_lifetime: float = 1800.0,
+                 timeout: float = 30.0, ping_after: float = 30.0):
+        if max_size < 1:
+            raise ValueError('max_size must be at least 1')
+        self._factory = factory
+        self.max_size = max_size
+        self.min_idle = max(0, min(min_idle, max_size))
+        self.max_lifetime = max_lifetime
+        self.timeout = timeout
+        self.ping_after = ping_after
+        self._idle: deque = deque()
+        self._cond = threading.Condition()
+        self._size = 0
+        self._in_use = 0
+        self._closed = False
+        self._counters = {
+            'created': 0,
+            'closed': 0,
+            'checkouts': 0,
+            'waits': 0,
+            'timeouts': 0,
+            'health_check_failures': 0,
+            'expired': 0,
+            'reset_failures': 0,
+        }
+        self._wait_time_total = 0.0
+        self._wait_time_max = 0.0
+
+    def _expired(self, entry: _PooledConnection, now: float) -> bool:
+        return self.max_lifetime > 0 and now - entry.created_at >= self.max_lifetime
+
+    def _open(self) -> _PooledConnection:
+        entry = _PooledConnection(self._factory())
+        with self._cond:
+            self._counters['created'] += 1
+        return entry
+
+    def _discard(self, entry: _PooledConnection) -> None:
+        try:
+            entry.conn.close()
+        except Exception:
+            pass
+        with self._cond:
+            self._size -= 1
+            self._counters['closed'] += 1
+            self._cond.notify()
+
+    def _healthy(self, entry: _PooledConnection) -> bool:
+        now = time.monotonic()
+        if self._expired(entry, now):
+            with self._cond:
+                self._counters['expired'] += 1
+            return False
+        if now - entry.last_used < self.ping_after:
+            return True
+        try:
+            cur = entry.conn.cursor()
+            try:
+                cur.execute('SELECT 1')
+                cur.fetchone()
+            finally:
+                cur.close()
+            entry.conn.rollback()
+            return True
+        except Exception:
+            with self._cond:
+                self._counters['health_check_failures'] += 1
+            return False
+
+    def _reset(self, entry: _PooledConnection) -> bool:
+        try:
+            entry.conn.rollback()
+            if entry.conn.autocommit:
+                entry.conn.autocommit = False
+            return True
+        except Exception:
+            with self._cond:
+                self._counters['reset_failures'] += 1
+            return False
+
+    def acquire(self) -> _PooledConnection:
+        start = time.monotonic()
+        deadline = start + self.timeout
+        waited = False
+        while True:
+            entry = None
+            with self._cond:
+                if self._closed:
+                    raise PoolClosed('connection pool is closed')
+                if self._idle:
+                    entry = self._idle.pop()
+                elif self._size < self.max_size:
+                    self._size += 1
+                else:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._counters['timeouts'] += 1
+                        raise PoolTimeout(
+                            f'no database connection available after {self.timeout:.1f}s'
+                        )
+                    waited = True
+                    self._cond.wait(remaining)
+                    continue
+            if entry is None:
+                try:
+                    entry = self._open()
+                except Exception:
+                    with self._cond:
+                        self._size -= 1
+                        self._cond.notify()
+                    raise
+            elif not self._healthy(entry):
+                self._discard(entry)
+                continue
+            waited_for = time.monotonic() - start
+            with self._cond:
+                self._in_use += 1
+                self._counters['checkouts'] += 1
+                if waited:
+                    self._counters['waits'] += 1
+                self._wait_time_total += waited_for
+                self._wait_time_max = max(self._wait_time_max, waited_for)
+            return entry
+
+    def release(self, entry: _PooledConnection) -> None:
+        with self._cond:
+            self._in_use -= 1
+        now = time.monotonic()
+        if self._closed or self._expired(entry, now) or not self._reset(entry):
+            self._discard(entry)
+            return
+        entry.last_used = now
+        with self._cond:
+            self._idle.append(entry)
+            self._cond.notify()
+
+    @contextmanager
+    def connection(self):
+        entry = self.acquire()
+        try:
+            yield entry.conn
+        finally:
+            self.release(entry)
+
+    def fill(self) -> None:
+        """Open connections until ``min_idle`` of them are idle."""
+        while True:
+            with self._cond:
+                if (self._closed or len(self._idle) >= self.min_idle
+                        or self._size >= self.max_size):
+                    return
+                self._size += 1
+            try:
+                entry = self._open()
+            except Exception:
+                with self._cond:
+                    self._size -= 1
+                    self._cond.notify()
+                raise
+            with self._cond:
+                self._idle.append(entry)
+                self._cond.notify()
+
+    def close(self) -> None:
+        with self._cond:
+            self._closed = True
+            idle = list(self._idle)
+            self._idle.clear()
+            self._cond.notify_all()
+        for entry in idle:
+            self._discard(entry)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            checkouts = self._counters['checkouts']
+            return {
+                'max_size': self.max_size,
+                'min_idle': self.min_idle,
+                'size': self._size,
+                'idle': len(self._idle),
+                'in_use': self._in_use,
+                **self._counters,
+                'wait_time_avg_ms': (self._wait_time_total / checkouts * 1000) if checkouts else 0.0,
+                'wait_time_max_ms': self._wait_time_max * 1000,
+            }
+
+
+_pool: ConnectionPool | None = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> ConnectionPool:
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool(
+                    connect,
+                    max_size=env_int('BOTECOPRO_POOL_SIZE', 10),
+                    min_idle=env_int('BOTECOPRO_POOL_MIN_IDLE', 2),
+                    max_lifetime=env_float('BOTECOPRO_POOL_MAX_LIFETIME', 1800.0),
+                    timeout=env_float('BOTECOPRO_POOL_TIMEOUT', 30.0),
+                    ping_after=env_float('BOTECOPRO_POOL_PING_AFTER', 30.0),
+                )
+    return _pool
+
+
+def close_pool() -> None:
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.close()
+
+
+def pool_stats() -> Dict[str, Any]:
+    return get_pool().stats()
+
+
 @contextmanager
 def get_cursor():
-    conn = connect()
-    try:
+    with get_pool().connection() as conn:
         cursor = conn.cursor()
-        yield cursor
-    finally:
-        cursor.close()
-        conn.close()
+        try:
+            yield cursor
+        finally:
+            cursor.close()
@@ -0,0 +1,134 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict
+
+from .db import env_int, get_pool
+
+
+class ExecutorSaturated(RuntimeError):
+    pass
+
+
+class DBExecutor:
+    """Bounded thread pool on which all blocking database work runs.
+
+    ``max_workers`` should match the connection pool size so a worker never
+    waits for a connection; ``max_queue`` bounds how many calls may wait for
+    a free worker before new ones are rejected with ``ExecutorSaturated``.
+    """
+
+    def __init__(self, max_workers: int, max_queue: int = 100):
+        if max_workers < 1:
+            raise ValueError('max_workers must be at least 1')
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(max_workers=max_workers,
+                                            thread_name_prefix='boteco-db')
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._running = 0
+        self._counters = {
+            'submitted': 0,
+            'completed': 0,
+            'failed': 0,
+            'rejected': 0,
+        }
+        self._queue_depth_max = 0
+        self._wait_time_total = 0.0
+        self._wait_time_max = 0.0
+        self._run_time_total = 0.0
+
+    def submit(self, fn: Callable[..., Any], *args, **kwargs) -> Future:
+        with self._lock:
+            if self.max_queue and self._queued >= self.max_queue:
+                self._counters['rejected'] += 1
+                raise ExecutorSaturated(
+                    f'database executor queue is full ({self.max_queue} waiting)'
+                )
+            self._queued += 1
+            self._counters['submitted'] += 1
+            self._queue_depth_max = max(self._queue_depth_max, self._queued)
+        submitted_at = time.monotonic()
+
+        def task():
+            started_at = time.monotonic()
+            waited = started_at - submitted_at
+            with self._lock:
+                self._queued -= 1
+                self._running += 1
+                self._wait_time_total += waited
+                self._wait_time_max = max(self._wait_time_max, waited)
+            failed = False
+            try:
+                return fn(*args, **kwargs)
+            except BaseException:
+                failed = True
+                raise
+            finally:
+                with self._lock:
+                    self._running -= 1
+                    self._run_time_total += time.monotonic() - started_at
+                    self._counters['failed' if failed else 'completed'] += 1
+
+        try:
+            return self._executor.submit(task)
+        except BaseException:
+            with self._lock:
+                self._queued -= 1
+            raise
+
+    async def run(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        return await asyncio.wrap_future(self.submit(fn, *args, **kwargs))
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=True)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            started = self._counters['completed'] + self._counters['failed'] + self._running
+            finished = self._counters['completed'] + self._counters['failed']
+            return {
+                'max_workers': self.max_workers,
+                'max_queue': self.max_queue,
+                'queue_depth': self._queued,
+                'queue_depth_max': self._queue_depth_max,
+                'running': self._running,
+                **self._counters,
+                'wait_time_avg_ms': (self._wait_time_total / started * 1000) if started else 0.0,
+                'wait_time_max_ms': self._wait_time_max * 1000,
+                'run_time_avg_ms': (self._run_time_total / finished * 1000) if finished else 0.0,
+            }
+
+
+_executor: DBExecutor | None = None
+_executor_lock = threading.Lock()
+
+
+def get_executor() -> DBExecutor:
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = DBExecutor(
+                    max_workers=get_pool().max_size,
+                    max_queue=env_int('BOTECOPRO_DB_EXECUTOR_QUEUE', 100),
+                )
+    return _executor
+
+
+def shutdown_executor() -> None:
+    global _executor
+    with _executor_lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown()
+
+
+async def run_db(fn: Callable[..., Any], *args, **kwargs) -> Any:
+    return await get_executor().run(fn, *args, **kwargs)
+
+
+def executor_stats() -> Dict[str, Any]:
+    return get_executor().stats()
@@ -0,0 +1,298 @@
+import base64
+import binascii
+import datetime
+import decimal
+import json
+from typing import Any, Dict, Iterable, List, Mapping, Sequence, Tuple
+
+
+class QueryError(ValueError):
+    pass
+
+
+def quote_name(name: str) -> str:
+    return '[' + name.replace(']', ']]') + ']'
+
+
+# Columns that identify one row of each view; keyset pagination appends them
+# to the requested ordering so every page boundary is unambiguous
+VIEW_KEYS: Dict[str, Tuple[str, ...]] = {
+    'view_mesas_disponiveis': ('mesa_id',),
+    'view_pedidos_em_andamento': ('pedido_id',),
+    'view_estoque_ingredientes': ('produto_id',),
+    'view_faturamento_periodo': ('ano', 'mes'),
+    'view_horas_funcionario': ('funcionario_id',),
+    'view_clientes_frequentes': ('cliente_id',),
+    'view_pratos_populares': ('prato_id',),
+    'view_fornecedores_entregas': ('fornecedor_id',),
+    'view_promocoes_ativas': ('menu_especial_id',),
+    'view_reservas_ativas': ('reserva_id',),
+    'mv_estoque_saida_agregado': ('produto_id',),
+    'view_estoque_utilizado_detalhado': ('produto_id',),
+}
+
+
+def parse_order_by(spec: str | None, columns: Sequence[str],
+                   key: Sequence[str] = ()) -> List[Tuple[str, bool]]:
+    """Parse ``"col,-other"`` into ``[(col, False), (other, True)]``.
+
+    The columns of the view's unique ``key`` not already present are
+    appended as tie-breakers, so the ordering is total.
+    """
+    order: List[Tuple[str, bool]] = []
+    for part in (spec or '').split(','):
+        part = part.strip()
+        if not part:
+            continue
+        descending = part.startswith('-')
+        name = part.lstrip('+-').strip()
+        if name not in columns:
+            raise QueryError(f"unknown column in order_by: '{name}'")
+        if any(name == col for col, _ in order):
+            raise QueryError(f"column repeated in order_by: '{name}'")
+        order.append((name, descending))
+    for name in key:
+        if not any(col == name for col, _ in order):
+            order.append((name, False))
+    return order
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, datetime.datetime):
+        return {'dt': value.isoformat()}
+    if isinstance(value, datetime.date):
+        return {'d': value.isoformat()}
+    if isinstance(value, datetime.time):
+        return {'t': value.isoformat()}
+    if isinstance(value, decimal.Decimal):
+        return {'n': str(value)}
+    return value
+
+
+def _decode_value(value: Any) -> Any:
+    if isinstance(value, dict) and len(value) == 1:
+        kind, raw = next(iter(value.items()))
+        if kind == 'dt':
+            return datetime.datetime.fromisoformat(raw)
+        if kind == 'd':
+            return datetime.date.fromisoformat(raw)
+        if kind == 't':
+            return datetime.time.fromisoformat(raw)
+        if kind == 'n':
+            return decimal.Decimal(raw)
+    return value
+
+
+def encode_cursor(order: List[Tuple[str, bool]], row: Dict[str, Any]) -> str:
+    payload = {
+        'o': [('-' if desc else '') + col for col, desc in order],
+        'k': [_encode_value(row[col]) for col, _ in order],
+    }
+    raw = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(token: str, order: List[Tuple[str, bool]]) -> List[Any]:
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        payload = json.loads(raw)
+        spec, keys = payload['o'], payload['k']
+    except (binascii.Error, ValueError, TypeError, KeyError):
+        raise QueryError('invalid cursor')
+    if spec != [('-' if desc else '') + col for col, desc in order] or len(keys) != len(order):
+        raise QueryError('cursor does not match order_by')
+    try:
+        return [_decode_value(key) for key in keys]
+    except (ValueError, decimal.InvalidOperation):
+        raise QueryError('invalid cursor')
+
+
+_INT_TYPES = {'int', 'bigint', 'smallint', 'tinyint'}
+_DECIMAL_TYPES = {'decimal', 'numeric', 'money', 'smallmoney'}
+_FLOAT_TYPES = {'float', 'real'}
+_DATETIME_TYPES = {'datetime', 'datetime2', 'smalldatetime', 'datetimeoffset'}
+
+FILTER_OPERATORS = {
+    'eq': '=',
+    'ne': '<>',
+    'gt': '>',
+    'gte': '>=',
+    'lt': '<',
+    'lte': '<=',
+    'in': 'IN',
+    'isnull': 'IS NULL',
+}
+
+
+def convert_value(raw: str, data_type: str) -> Any:
+    data_type = (data_type or '').lower()
+    try:
+        if data_type in _INT_TYPES:
+            return int(raw)
+        if data_type in _DECIMAL_TYPES:
+            return decimal.Decimal(raw)
+        if data_type in _FLOAT_TYPES:
+            return float(raw)
+        if data_type == 'bit':
+            if raw.lower() in ('1', 'true'):
+                return True
+            if raw.lower() in ('0', 'false'):
+                return False
+            raise ValueError(raw)
+        if data_type in _DATETIME_TYPES:
+            return datetime.datetime.fromisoformat(raw)
+        if data_type == 'date':
+            return datetime.date.fromisoformat(raw)
+        if data_type == 'time':
+            return datetime.time.fromisoformat(raw)
+    except (ValueError, decimal.InvalidOperation):
+        raise QueryError(f"invalid {data_type} value: '{raw}'")
+    return raw
+
+
+def parse_select(spec: str | None, columns: Sequence[str]) -> List[str]:
+    selected: List[str] = []
+    for name in (spec or '').split(','):
+        name = name.strip()
+        if not name:
+            continue
+        if name not in columns:
+            raise QueryError(f"unknown column in select: '{name}'")
+        if name not in selected:
+            selected.append(name)
+    return selected
+
+
+def parse_filters(params: Iterable[Tuple[str, str]],
+                  columns: Mapping[str, str]) -> List[Tuple[str, str, Any]]:
+    """Turn ``col=v`` / ``col__op=v`` query parameters into typed filters."""
+    filters: List[Tuple[str, str, Any]] = []
+    for key, raw in params:
+        name, _, op = key.partition('__')
+        op = op or 'eq'
+        if name not in columns:
+            raise QueryError(f"unknown filter column: '{name}'")
+        if op not in FILTER_OPERATORS:
+            raise QueryError(f"unknown filter operator: '{op}'")
+        if op == 'isnull':
+            value: Any = convert_value(raw, 'bit')
+        elif op == 'in':
+            value = [convert_value(item.strip(), columns[name]) for item in raw.split(',') if item.strip()]
+            if not value:
+                raise QueryError(f"empty list for '{key}'")
+        else:
+            value = convert_value(raw, columns[name])
+        filters.append((name, op, value))
+    return filters
+
+
+def filter_predicate(filters: List[Tuple[str, str, Any]]) -> Tuple[str, list]:
+    params: list = []
+    terms = []
+    for name, op, value in filters:
+        col = quote_name(name)
+        if op == 'isnull':
+            terms.append(f'{col} IS NULL' if value else f'{col} IS NOT NULL')
+        elif op == 'in':
+            terms.append(f"{col} IN ({', '.join('?' for _ in value)})")
+            params.extend(value)
+        else:
+            terms.append(f'{col} {FILTER_OPERATORS[op]} ?')
+            params.append(value)
+    return ' AND '.join(terms), params
+
+
+def _after(col: str, descending: bool, value: Any, params: list) -> str:
+    # SQL Server sorts NULL first in ascending order and last in descending.
+    if value is None:
+        return '1 = 0' if descending else f'{col} IS NOT NULL'
+    params.append(value)
+    return f'({col} < ? OR {col} IS NULL)' if descending else f'{col} > ?'
+
+
+def _equal(col: str, value: Any, params: list) -> str:
+    if value is None:
+        return f'{col} IS NULL'
+    params.append(value)
+    return f'{col} = ?'
+
+
+def keyset_predicate(order: List[Tuple[str, bool]], keys: List[Any]) -> Tuple[str, list]:
+    params: list = []
+    branches = []
+    for i, (col, descending) in enumerate(order):
+        terms = [_equal(quote_name(prev), keys[j], params) for j, (prev, _) in enumerate(order[:i])]
+        terms.append(_after(quote_name(col), descending, keys[i], params))
+        branches.append('(' + ' AND '.join(terms) + ')')
+    return '(' + ' OR '.join(branches) + ')', params
+
+
+class ViewQuery:
+    """Parameterised ``SELECT`` against one view.
+
+    ``columns`` maps each column of the view to its SQL type and is the
+    whitelist for projection, filters and ordering; only values are ever
+    sent as parameters. ``key`` defaults to the view's entry in
+    ``VIEW_KEYS``; views without a unique key cannot be paginated.
+    """
+
+    def __init__(self, view: str, columns: Mapping[str, str], order_by: str | None = None,
+                 limit: int | None = None, cursor: str | None = None,
+                 select: str | None = None,
+                 filters: Iterable[Tuple[str, str]] = (),
+                 key: Sequence[str] | None = None):
+        self.view = view
+        self.columns = dict(columns)
+        names = list(self.columns)
+        self.limit = limit
+        key = VIEW_KEYS.get(view, ()) if key is None else key
+        if any(col not in self.columns for col in key):
+            key = ()
+        paged = limit is not None or cursor is not None
+        if paged and not key:
+            raise QueryError(f'{view} has no unique key; limit and cursor are not supported')
+        self.order = parse_order_by(order_by, names, key) if (order_by or paged) else []
+        self.keys = decode_cursor(cursor, self.order) if cursor else None
+        self.select = parse_select(select, names)
+        self.filters = parse_filters(filters, self.columns)
+        # Keyset cursors are built from the order columns of the last row
+        self._hidden = [col for col, _ in self.order
+                        if self.select and limit is not None and col not in self.select]
+
+    def build(self) -> Tuple[str, list]:
+        params: list = []
+        sql = 'SELECT '
+        if self.limit is not None:
+            # One extra row tells whether there is a next page
+            sql += 'TOP (?) '
+            params.append(self.limit + 1)
+        if self.select:
+            sql += ', '.join(quote_name(col) for col in self.select + self._hidden)
+        else:
+            sql += '*'
+        sql += f' FROM {quote_name(self.view)}'
+        predicates = []
+        if self.filters:
+            predicate, filter_params = filter_predicate(self.filters)
+            predicates.append(predicate)
+            params.extend(filter_params)
+        if self.keys is not None:
+            predicate, keyset_params = keyset_predicate(self.order, self.keys)
+            predicates.append(predicate)
+            params.extend(keyset_params)
+        if predicates:
+            sql += ' WHERE ' + ' AND '.join(predicates)
+        if self.order:
+            sql += ' ORDER BY ' + ', '.join(
+                quote_name(col) + (' DESC' if desc else ' ASC') for col, desc in self.order
+            )
+        return sql, params
+
+    def paginate(self, rows: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], str | None]:
+        next_cursor = None
+        if self.limit is not None and len(rows) > self.limit:
+            rows = rows[:self.limit]
+            next_cursor = encode_cursor(self.order, rows[-1])
+        if self._hidden:
+            rows = [{col: row[col] for col in self.select} for row in rows]
+        return rows, next_cursor
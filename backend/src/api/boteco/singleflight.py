@@ -0,0 +1,50 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+
+class SingleFlight:
+    """Collapse concurrent identical calls into one in-flight execution.
+
+    The first caller for a key starts the work; callers arriving while it
+    runs await the same result (or exception). Waiters are shielded, so a
+    client disconnecting does not cancel the query other clients wait on.
+    """
+
+    def __init__(self):
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        self._counters = {'calls': 0, 'executions': 0, 'collapsed': 0}
+        self._collapsed_by_group: Dict[str, int] = {}
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]], group: str = '') -> Any:
+        self._counters['calls'] += 1
+        future = self._inflight.get(key)
+        if future is not None:
+            self._counters['collapsed'] += 1
+            self._collapsed_by_group[group] = self._collapsed_by_group.get(group, 0) + 1
+        else:
+            self._counters['executions'] += 1
+            future = asyncio.ensure_future(fn())
+            self._inflight[key] = future
+            future.add_done_callback(lambda done: self._finished(key, done))
+        return await asyncio.shield(future)
+
+    def _finished(self, key: Hashable, future: asyncio.Future) -> None:
+        if self._inflight.get(key) is future:
+            del self._inflight[key]
+        if not future.cancelled():
+            # Mark the exception as retrieved even if every waiter went away
+            future.exception()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **self._counters,
+            'in_flight': len(self._inflight),
+            'collapsed_by_view': dict(self._collapsed_by_group),
+        }
+
+
+_single_flight = SingleFlight()
+
+
+def get_single_flight() -> SingleFlight:
+    return _single_flight
@@ -0,0 +1,78 @@
+import asyncio
+import hashlib
+import json
+from typing import AsyncIterator, Iterator, List
+
+from fastapi.encoders import jsonable_encoder
+
+from .executor import ExecutorSaturated, get_executor
+
+MEDIA_TYPES = {
+    'ndjson': 'application/x-ndjson',
+    'json': 'application/json',
+}
+
+
+def _dumps(row: dict) -> str:
+    return json.dumps(jsonable_encoder(row), ensure_ascii=False, separators=(',', ':'))
+
+
+def render_json(rows: List[dict]) -> bytes:
+    return json.dumps(jsonable_encoder(rows), ensure_ascii=False,
+                      separators=(',', ':')).encode('utf-8')
+
+
+def etag_for(body: bytes) -> str:
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    # If-None-Match uses weak comparison, so a W/ prefix is ignored
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(',')]
+    return '*' in candidates or any(tag.removeprefix('W/') == etag for tag in candidates)
+
+
+def _close(chunks: Iterator) -> None:
+    # Closing the generator releases its cursor and returns the connection
+    # to the pool; never block the event loop on it.
+    try:
+        get_executor().submit(chunks.close)
+    except ExecutorSaturated:
+        chunks.close()
+
+
+async def stream_rows(chunks: Iterator[List[dict]], fmt: str = 'ndjson',
+                      head: List[dict] | None = None) -> AsyncIterator[str]:
+    """Encode row chunks as NDJSON lines or as a JSON array, one chunk at a time.
+
+    Each ``next()`` on ``chunks`` runs on the DB executor, so only a single
+    chunk of rows is held in memory at any moment. ``head`` is a chunk the
+    caller already pulled (to surface query errors before the response
+    starts); ``None`` means the rows are exhausted.
+    """
+    first = True
+    chunk = head
+    pending = None
+    try:
+        if fmt == 'json':
+            yield '['
+        while chunk is not None:
+            if fmt == 'json':
+                body = ','.join(_dumps(row) for row in chunk)
+                if body:
+                    yield body if first else ',' + body
+                    first = False
+            else:
+                yield ''.join(_dumps(row) + '\n' for row in chunk)
+            pending = get_executor().submit(next, chunks, None)
+            chunk = await asyncio.wrap_future(pending)
+        if fmt == 'json':
+            yield ']'
+    finally:
+        if pending is not None and not pending.done():
+            # Client went away mid-fetch: close once the fetch finishes.
+            pending.add_done_callback(lambda _: _close(chunks))
+        else:
+            _close(chunks)
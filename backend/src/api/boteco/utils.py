@@ -1,5 +1,9 @@
-from typing import List
+import re
+from typing import Dict, Iterator, List, Tuple
 from .db import get_cursor
+from .query import ViewQuery, quote_name
+
+_PARAM_NAME = re.compile(r'^@?\w+$')
 
 
 def list_views() -> List[str]:
@@ -14,22 +18,120 @@ def list_procedures() -> List[str]:
         return [row[0] for row in cur.fetchall()]
 
 
+def list_view_columns() -> Dict[str, Dict[str, str]]:
+    with get_cursor() as cur:
+        cur.execute(
+            "SELECT c.TABLE_NAME, c.COLUMN_NAME, c.DATA_TYPE "
+            "FROM INFORMATION_SCHEMA.COLUMNS c "
+            "JOIN INFORMATION_SCHEMA.VIEWS v "
+            "ON v.TABLE_SCHEMA = c.TABLE_SCHEMA AND v.TABLE_NAME = c.TABLE_NAME "
+            "ORDER BY c.TABLE_NAME, c.ORDINAL_POSITION"
+        )
+        columns: Dict[str, Dict[str, str]] = {}
+        for view, column, data_type in cur.fetchall():
+            columns.setdefault(view, {})[column] = data_type
+        return columns
+
+
+def list_procedure_parameters() -> List[Tuple[str, str, str, bool, bool]]:
+    with get_cursor() as cur:
+        cur.execute(
+            "SELECT p.name, prm.name, TYPE_NAME(prm.user_type_id), prm.is_output, prm.is_readonly "
+            "FROM sys.procedures p "
+            "JOIN sys.parameters prm ON prm.object_id = p.object_id "
+            "ORDER BY p.name, prm.parameter_id"
+        )
+        return [tuple(row) for row in cur.fetchall()]
+
+
+def list_table_types() -> Dict[str, Tuple[str, List[Tuple[str, str]]]]:
+    with get_cursor() as cur:
+        cur.execute(
+            "SELECT tt.name, SCHEMA_NAME(tt.schema_id), c.name, TYPE_NAME(c.user_type_id) "
+            "FROM sys.table_types tt "
+            "JOIN sys.columns c ON c.object_id = tt.type_table_object_id "
+            "ORDER BY tt.name, c.column_id"
+        )
+        types: Dict[str, Tuple[str, List[Tuple[str, str]]]] = {}
+        for type_name, schema, column, data_type in cur.fetchall():
+            types.setdefault(type_name, (schema, []))[1].append((column, data_type))
+        return types
+
+
+def list_procedure_definitions() -> Dict[str, str]:
+    with get_cursor() as cur:
+        cur.execute(
+            "SELECT p.name, m.definition "
+            "FROM sys.procedures p "
+            "JOIN sys.sql_modules m ON m.object_id = p.object_id"
+        )
+        return {name: definition for name, definition in cur.fetchall()}
+
+
+def list_dependencies() -> List[Tuple[str, str, str, str]]:
+    with get_cursor() as cur:
+        cur.execute(
+            "SELECT o.name, RTRIM(o.type), d.referenced_entity_name, RTRIM(ro.type) "
+            "FROM sys.sql_expression_dependencies d "
+            "JOIN sys.objects o ON o.object_id = d.referencing_id "
+            "JOIN sys.objects ro "
+            "ON ro.object_id = COALESCE(d.referenced_id, OBJECT_ID(d.referenced_entity_name)) "
+            "WHERE d.referenced_database_name IS NULL"
+        )
+        return [tuple(row) for row in cur.fetchall()]
+
+
+def list_triggers() -> Dict[str, str]:
+    with get_cursor() as cur:
+        cur.execute(
+            "SELECT t.name, OBJECT_NAME(t.parent_id) "
+            "FROM sys.triggers t WHERE t.parent_class = 1"
+        )
+        return {name: table for name, table in cur.fetchall()}
+
+
+def call_procedure(cur, name: str, params: dict) -> List[dict]:
+    for key in params:
+        if not _PARAM_NAME.match(key):
+            raise ValueError(f"invalid parameter name: '{key}'")
+    assignments = ', '.join(f"@{key.lstrip('@')} = ?" for key in params)
+    query = f"EXEC {quote_name(name)} {assignments}" if assignments else f"EXEC {quote_name(name)}"
+    cur.execute(query, *params.values())
+    columns = [d[0] for d in cur.description] if cur.description else []
+    return [dict(zip(columns, row)) for row in cur.fetchall()] if columns else []
+
+
 def exec_procedure(name: str, params: dict):
-    placeholders = ','.join('?' for _ in params)
-    query = f"EXEC {name} {placeholders}" if placeholders else f"EXEC {name}"
-    values = list(params.values())
     with get_cursor() as cur:
-        cur.execute(query, *values)
         try:
-            columns = [d[0] for d in cur.description] if cur.description else []
-            rows = [dict(zip(columns, row)) for row in cur.fetchall()] if columns else []
-            return rows
+            return call_procedure(cur, name, params)
         finally:
             cur.commit()
 
 
-def fetch_view(view_name: str):
+def _view_sql(view_name: str, query: ViewQuery | None):
+    if query is None:
+        return f"SELECT * FROM {view_name}", []
+    return query.build()
+
+
+def fetch_view(view_name: str, query: ViewQuery | None = None):
+    sql, params = _view_sql(view_name, query)
     with get_cursor() as cur:
-        cur.execute(f"SELECT * FROM {view_name}")
+        cur.execute(sql, *params)
         columns = [d[0] for d in cur.description]
         return [dict(zip(columns, row)) for row in cur.fetchall()]
+
+
+def iter_view_chunks(view_name: str, chunk_size: int = 500,
+                     query: ViewQuery | None = None) -> Iterator[List[dict]]:
+    sql, params = _view_sql(view_name, query)
+    with get_cursor() as cur:
+        cur.arraysize = chunk_size
+        cur.execute(sql, *params)
+        columns = [d[0] for d in cur.description]
+        while True:
+            rows = cur.fetchmany(chunk_size)
+            if not rows:
+                return
+            yield [dict(zip(columns, row)) for row in rows]
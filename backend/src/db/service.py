@@ -1,9 +1,21 @@
 import os
+import re
+import math
+import time
+import random
+import hashlib
+from datetime import date, datetime, timedelta, time as dtime
+from itertools import accumulate
 from pathlib import Path
+from typing import NamedTuple
 import pyodbc
 import argparse
 
 SQL_DIR = Path(__file__).resolve().parent / 'sql'
+# Generated scripts live one level down so `run` never executes them unreviewed
+ADVISOR_DIR = SQL_DIR / 'advisor'
+DATABASE = 'botecopro_db'
+HISTORY_TABLE = f'{DATABASE}.dbo.HistoricoMigracoes'
 
 
 def get_connection_string() -> str:
@@ -17,17 +29,90 @@ def connect():
     return pyodbc.connect(get_connection_string(), autocommit=True)
 
 
-def execute_sql_file(cursor: pyodbc.Cursor, path: Path) -> None:
-    with open(path, 'r', encoding='utf-8') as f:
-        contents = f.read()
-    for statement in contents.split('\nGO'):
-        stmt = statement.strip()
-        if stmt:
-            cursor.execute(stmt)
-            try:
-                cursor.commit()
-            except Exception:
-                pass
+class SqlBatch(NamedTuple):
+    sql: str
+    count: int  # GO n runs the batch n times
+    line: int   # first line of the batch in the script
+
+
+# sqlcmd separator: GO alone on its line, optionally with a count and a comment
+GO_LINE = re.compile(r'^\s*GO(?:\s+(\d+))?\s*(?:--.*)?$', re.IGNORECASE)
+
+
+def _scan_line(line: str, depth: int, in_string: bool) -> tuple:
+    """Track block comment nesting and open string literals across a line."""
+    i = 0
+    while i < len(line):
+        pair = line[i:i + 2]
+        if in_string:
+            # A doubled quote closes and reopens, which leaves the state unchanged
+            if line[i] == "'":
+                in_string = False
+        elif pair == '/*':
+            depth += 1
+            i += 1
+        elif depth and pair == '*/':
+            depth -= 1
+            i += 1
+        elif not depth:
+            if pair == '--':
+                break
+            if line[i] == "'":
+                in_string = True
+        i += 1
+    return depth, in_string
+
+
+def split_batches(text: str) -> list:
+    """Split a script on GO lines, ignoring GO inside comments and strings."""
+    batches = []
+    current, start = [], None
+    depth, in_string = 0, False
+    for number, line in enumerate(text.splitlines(), 1):
+        match = None if depth or in_string else GO_LINE.match(line)
+        if match:
+            sql = '\n'.join(current).strip()
+            if sql:
+                batches.append(SqlBatch(sql, int(match.group(1) or 1), start))
+            current, start = [], None
+            continue
+        if start is None and line.strip():
+            start = number
+        current.append(line)
+        depth, in_string = _scan_line(line, depth, in_string)
+    sql = '\n'.join(current).strip()
+    if sql:
+        batches.append(SqlBatch(sql, 1, start))
+    return batches
+
+
+def checksum(text: str) -> str:
+    # Line endings and trailing whitespace do not count as changes
+    normalized = '\n'.join(line.rstrip() for line in text.splitlines()).strip()
+    return hashlib.sha256(normalized.encode('utf-8')).hexdigest()
+
+
+def execute_sql_file(cursor: pyodbc.Cursor, path: Path, verbose: bool = False) -> int:
+    """Run every batch of ``path``; returns the number of batches executed."""
+    return execute_sql(cursor, path.read_text(encoding='utf-8'), path.name, verbose)
+
+
+def execute_sql(cursor: pyodbc.Cursor, text: str, name: str, verbose: bool = False) -> int:
+    batches = split_batches(text)
+    for batch in batches:
+        started = time.perf_counter()
+        try:
+            for _ in range(batch.count):
+                cursor.execute(batch.sql)
+                # Later statements of the batch only run (and fail) as results are consumed
+                while cursor.nextset():
+                    pass
+        except pyodbc.Error as e:
+            raise RuntimeError(f'{name}, batch at line {batch.line}: {e}') from e
+        if verbose:
+            repeat = f' x{batch.count}' if batch.count > 1 else ''
+            print(f'  line {batch.line:>5}{repeat}: {(time.perf_counter() - started) * 1000:8.1f} ms')
+    return len(batches)
 
 
 def run_all_scripts(sql_dir: Path = SQL_DIR) -> None:
@@ -43,6 +128,542 @@ def run_all_scripts(sql_dir: Path = SQL_DIR) -> None:
         print('All scripts executed successfully.')
 
 
+# Created in the application database; scripts switch databases with USE, so
+# the history is always addressed by its three-part name
+HISTORY_DDL = f"""
+    IF DB_ID('{DATABASE}') IS NOT NULL AND OBJECT_ID('{HISTORY_TABLE}') IS NULL
+        CREATE TABLE {HISTORY_TABLE} (
+            script      VARCHAR(255) NOT NULL PRIMARY KEY,
+            checksum    CHAR(64)     NOT NULL,
+            aplicado_em DATETIME2    NOT NULL DEFAULT SYSDATETIME(),
+            duracao_ms  INT          NOT NULL,
+            lotes       INT          NOT NULL
+        )
+"""
+
+RECORD_MIGRATION_SQL = f"""
+    MERGE {HISTORY_TABLE} AS h
+    USING (SELECT ? AS script, ? AS checksum, ? AS duracao_ms, ? AS lotes) AS s
+        ON h.script = s.script
+    WHEN MATCHED THEN
+        UPDATE SET checksum = s.checksum, aplicado_em = SYSDATETIME(),
+                   duracao_ms = s.duracao_ms, lotes = s.lotes
+    WHEN NOT MATCHED THEN
+        INSERT (script, checksum, duracao_ms, lotes)
+        VALUES (s.script, s.checksum, s.duracao_ms, s.lotes);
+"""
+
+
+def applied_migrations(cursor: pyodbc.Cursor) -> dict:
+    """Return ``{script: checksum}`` from the history, empty before the first migration."""
+    cursor.execute(f"SELECT OBJECT_ID('{HISTORY_TABLE}')")
+    if cursor.fetchone()[0] is None:
+        return {}
+    cursor.execute(f'SELECT script, checksum FROM {HISTORY_TABLE}')
+    return {script: value for script, value in cursor.fetchall()}
+
+
+def pending_migrations(files: list, applied: dict) -> list:
+    """Return ``(path, 'new' | 'changed', checksum)`` for the scripts that must run, in order."""
+    pending = []
+    for path in sorted(files, key=lambda p: p.name):
+        value = checksum(path.read_text(encoding='utf-8'))
+        if path.name not in applied:
+            pending.append((path, 'new', value))
+        elif applied[path.name] != value:
+            pending.append((path, 'changed', value))
+    return pending
+
+
+def record_migration(cursor: pyodbc.Cursor, script: str, value: str, duration_ms: int, batches: int) -> None:
+    cursor.execute(HISTORY_DDL)
+    cursor.execute(RECORD_MIGRATION_SQL, script, value, duration_ms, batches)
+
+
+def migrate(sql_dir: Path = SQL_DIR, dry_run: bool = False, baseline: bool = False) -> list:
+    """Apply new or changed scripts and record them in the history table.
+
+    With ``baseline`` the pending scripts are only recorded, for databases
+    built before the history existed.
+    """
+    with connect() as conn:
+        cursor = conn.cursor()
+        pending = pending_migrations(list(sql_dir.glob('*.sql')), applied_migrations(cursor))
+        if not pending:
+            print('Database is up to date.')
+        for path, status, value in pending:
+            if dry_run:
+                print(f'Pending: {path.name} ({status})')
+                continue
+            if baseline:
+                record_migration(cursor, path.name, value, 0, 0)
+                print(f'Recorded {path.name} as applied ({status})')
+                continue
+            print(f'Applying {path.name} ({status})...')
+            started = time.perf_counter()
+            batches = execute_sql_file(cursor, path, verbose=True)
+            duration_ms = round((time.perf_counter() - started) * 1000)
+            record_migration(cursor, path.name, value, duration_ms, batches)
+            print(f'  {batches} batch(es) in {duration_ms} ms')
+    return pending
+
+
+MOVEMENT_TOTALS = """
+    SELECT produto_id,
+           SUM(CASE WHEN tipo = 'entrada' THEN quantidade
+                    WHEN tipo = 'saida'  THEN -quantidade
+                    ELSE 0 END) AS total
+    FROM MovimentacaoEstoque {hint}
+    GROUP BY produto_id
+"""
+
+STOCK_DRIFT_SQL = f"""
+    SELECT p.produto_id, p.nome, p.stock_atual, ISNULL(m.total, 0)
+    FROM Produto p
+    LEFT JOIN ({MOVEMENT_TOTALS.format(hint='')}) m ON m.produto_id = p.produto_id
+    WHERE p.stock_atual <> ISNULL(m.total, 0)
+    ORDER BY p.produto_id
+"""
+
+# A shared table lock held for the statement keeps sales from inserting
+# movements between the sum and the update
+STOCK_REPAIR_SQL = f"""
+    UPDATE p
+    SET stock_atual = ISNULL(m.total, 0)
+    OUTPUT inserted.produto_id, inserted.nome, deleted.stock_atual, inserted.stock_atual
+    FROM Produto p
+    LEFT JOIN ({MOVEMENT_TOTALS.format(hint='WITH (TABLOCK, HOLDLOCK)')}) m ON m.produto_id = p.produto_id
+    WHERE p.stock_atual <> ISNULL(m.total, 0)
+"""
+
+
+def reconcile_stock(cursor: pyodbc.Cursor, fix: bool = True) -> list:
+    """Compare Produto.stock_atual with the sum of its movements.
+
+    Returns ``(produto_id, nome, stock_atual, soma_movimentacoes)`` for every
+    product that drifted; with ``fix`` the stock is set to the sum.
+    """
+    cursor.execute(STOCK_REPAIR_SQL if fix else STOCK_DRIFT_SQL)
+    return [tuple(row) for row in cursor.fetchall()]
+
+
+def reconcile(fix: bool = True) -> int:
+    with connect() as conn:
+        drift = reconcile_stock(conn.cursor(), fix)
+    for produto_id, nome, stock_atual, total in drift:
+        print(f'{produto_id:>6} {nome:<30} stock_atual={stock_atual} movimentacoes={total}')
+    action = 'repaired' if fix else 'found'
+    print(f'{len(drift)} product(s) with stock drift {action}.')
+    return len(drift)
+
+
+def generate_reorders(cursor: pyodbc.Cursor) -> list:
+    """Run the batch reorder; returns ``(encomenda_id, fornecedor_id, itens, quantidade)``."""
+    cursor.execute('EXEC sp_gerar_encomendas_reposicao')
+    return [tuple(row) for row in cursor.fetchall()]
+
+
+def reorder(interval: float | None = None) -> None:
+    while True:
+        try:
+            with connect() as conn:
+                orders = generate_reorders(conn.cursor())
+        except pyodbc.Error as e:
+            if not interval:
+                raise
+            # A scheduled run just tries again on the next tick
+            print(f'Reorder failed: {e}')
+            orders = []
+        for encomenda_id, fornecedor_id, itens, quantidade in orders:
+            print(f'Encomenda {encomenda_id} (fornecedor {fornecedor_id}): '
+                  f'{itens} item(s), {quantidade} unidade(s)')
+        print(f'{len(orders)} pending order(s) created or updated.')
+        if not interval:
+            return
+        time.sleep(interval)
+
+
+# Impact follows the DMV documentation: how often the index would have been
+# used times the average cost of those queries times the expected gain
+MISSING_INDEXES_SQL = """
+    SELECT TOP (?)
+           OBJECT_SCHEMA_NAME(d.object_id, d.database_id),
+           OBJECT_NAME(d.object_id, d.database_id),
+           d.equality_columns,
+           d.inequality_columns,
+           d.included_columns,
+           s.user_seeks + s.user_scans,
+           (s.user_seeks + s.user_scans) * s.avg_total_user_cost * s.avg_user_impact / 100.0 AS impacto
+    FROM sys.dm_db_missing_index_details d
+    JOIN sys.dm_db_missing_index_groups g ON g.index_handle = d.index_handle
+    JOIN sys.dm_db_missing_index_group_stats s ON s.group_handle = g.index_group_handle
+    WHERE d.database_id = DB_ID()
+    ORDER BY impacto DESC
+"""
+
+# Nonclustered indexes that enforce nothing and were never read since the
+# last restart, with the writes they cost
+UNUSED_INDEXES_SQL = """
+    SELECT OBJECT_SCHEMA_NAME(i.object_id),
+           OBJECT_NAME(i.object_id),
+           i.name,
+           ISNULL(u.user_updates, 0)
+    FROM sys.indexes i
+    JOIN sys.objects o ON o.object_id = i.object_id
+    LEFT JOIN sys.dm_db_index_usage_stats u
+        ON u.database_id = DB_ID() AND u.object_id = i.object_id AND u.index_id = i.index_id
+    WHERE o.type = 'U'
+      AND o.is_ms_shipped = 0
+      AND i.type_desc = 'NONCLUSTERED'
+      AND i.is_primary_key = 0
+      AND i.is_unique = 0
+      AND ISNULL(u.user_seeks + u.user_scans + u.user_lookups, 0) = 0
+    ORDER BY ISNULL(u.user_updates, 0) DESC, OBJECT_NAME(i.object_id), i.name
+"""
+
+
+def missing_indexes(cursor: pyodbc.Cursor, limit: int = 20) -> list:
+    """Return ``(schema, table, equality, inequality, included, uses, impact)`` ranked by impact."""
+    cursor.execute(MISSING_INDEXES_SQL, limit)
+    return [tuple(row) for row in cursor.fetchall()]
+
+
+def unused_indexes(cursor: pyodbc.Cursor) -> list:
+    """Return ``(schema, table, index, writes)`` for indexes nobody reads."""
+    cursor.execute(UNUSED_INDEXES_SQL)
+    return [tuple(row) for row in cursor.fetchall()]
+
+
+def index_name(table: str, columns: str) -> str:
+    names = re.findall(r'\[([^\]]+)\]', columns)
+    return f"idx_{table}_{'_'.join(names)}".lower()[:128]
+
+
+def render_advice(missing: list, unused: list, since: datetime | None = None,
+                  database: str = DATABASE) -> str:
+    """Build the reviewable script: suggested CREATEs, and DROPs left commented out."""
+    lines = [
+        f'USE [{database}];',
+        'GO',
+        '-- =========================================================================',
+        f"-- Sugestões de índices geradas por service.py advise em {datetime.now():%Y-%m-%d %H:%M}",
+        '-- Estatísticas acumuladas desde o último arranque do SQL Server'
+        + (f' ({since:%Y-%m-%d %H:%M}).' if since else '.'),
+        '-- Rever antes de aplicar; os índices aceites passam para 07_create_indices.sql (EXEC #garantir_indice).',
+        '-- =========================================================================',
+        '',
+        '/* ------------------------------------------------',
+        '   1. Índices em falta (por impacto estimado)',
+        '   ------------------------------------------------ */',
+    ]
+    if not missing:
+        lines.append('-- Nenhuma sugestão.')
+    for schema, table, equality, inequality, included, uses, impact in missing:
+        keys = ', '.join(c for c in (equality, inequality) if c)
+        lines.append(f'-- impacto {impact:,.0f}; {uses} consulta(s) teriam usado este índice')
+        lines.append(f'CREATE NONCLUSTERED INDEX {index_name(table, keys)}')
+        lines.append(f'    ON [{schema}].[{table}] ({keys})' + (f'\n    INCLUDE ({included});' if included else ';'))
+        lines.append('GO')
+    lines += [
+        '',
+        '/* ------------------------------------------------',
+        '   2. Índices sem leituras (só custam escritas)',
+        '   ------------------------------------------------ */',
+    ]
+    if not unused:
+        lines.append('-- Nenhum.')
+    for schema, table, index, writes in unused:
+        lines.append(f'-- {writes} escrita(s), 0 leituras')
+        lines.append(f'-- DROP INDEX [{index}] ON [{schema}].[{table}];')
+    return '\n'.join(lines) + '\n'
+
+
+def advise(output: Path | None = None, limit: int = 20, database: str = DATABASE) -> Path:
+    with connect() as conn:
+        cursor = conn.cursor()
+        cursor.execute(f'USE [{database}]')
+        cursor.execute('SELECT sqlserver_start_time FROM sys.dm_os_sys_info')
+        since = cursor.fetchone()[0]
+        missing = missing_indexes(cursor, limit)
+        unused = unused_indexes(cursor)
+    if output is None:
+        output = ADVISOR_DIR / f'indices_sugeridos_{datetime.now():%Y%m%d_%H%M%S}.sql'
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(render_advice(missing, unused, since, database), encoding='utf-8')
+    print(f'{len(missing)} missing index suggestion(s), {len(unused)} unused index(es).')
+    print(f'Script written to {output}')
+    return output
+
+
+# ---------------------------------------------------------------------------
+# Synthetic data for load and plan testing
+# ---------------------------------------------------------------------------
+
+FIRST_NAMES = ('Ana', 'João', 'Maria', 'Pedro', 'Inês', 'Rui', 'Carla', 'Tiago', 'Sofia', 'Miguel',
+               'Beatriz', 'Nuno', 'Rita', 'Paulo', 'Marta', 'Luís', 'Catarina', 'Bruno', 'Joana', 'Hugo')
+LAST_NAMES = ('Silva', 'Santos', 'Ferreira', 'Pereira', 'Oliveira', 'Costa', 'Rodrigues', 'Martins',
+              'Sousa', 'Fernandes', 'Gonçalves', 'Gomes', 'Lopes', 'Marques', 'Alves', 'Almeida')
+CITIES = (('Lisboa', '1000'), ('Porto', '4000'), ('Évora', '7000'), ('Coimbra', '3000'),
+          ('Braga', '4700'), ('Faro', '8000'), ('Setúbal', '2900'), ('Beja', '7800'))
+# Share of a day's orders by weekday, Monday first
+WEEKDAY_WEIGHTS = (0.7, 0.75, 0.8, 0.9, 1.25, 1.45, 1.15)
+ITEMS_PER_ORDER = ((1, 2, 3, 4, 5, 6), (15, 30, 25, 15, 10, 5))
+QUANTITIES = ((1, 2, 3), (80, 15, 5))
+PARTY_SIZES = ((2, 3, 4, 5, 6, 8), (40, 15, 25, 8, 8, 4))
+RESERVATION_TIMES = tuple(dtime(h, m) for h, m in ((12, 30), (13, 0), (13, 30), (19, 30), (20, 0), (20, 30), (21, 0)))
+# Triggers whose work the generator does in bulk itself (see generate_data)
+GENERATOR_DISABLED_TRIGGERS = (
+    ('trg_abatimento_estoque_quando_inserir_pedidoitem', 'PedidoItem'),
+    ('trg_resumo_faturacao_diaria', 'FaturaItem'),
+    ('trg_resumo_faturacao_data_emissao', 'Fatura'),
+)
+
+# Same deduction as sp_abatimento_estoque_pedidoitem, dated when the order was placed
+GENERATED_SAIDAS_SQL = """
+    INSERT INTO MovimentacaoEstoque (produto_id, data_movimentacao, tipo, quantidade, preco_unitario, pedido_id)
+    SELECT pi.produto_id, p.data_pedido, 'saida', pi.quantidade_necessaria * it.quantidade,
+           pr.custo_unitario, it.pedido_id
+    FROM PedidoItem it
+    JOIN Pedido p ON p.pedido_id = it.pedido_id
+    JOIN PratoIngrediente pi ON pi.prato_id = it.prato_id
+    JOIN Produto pr ON pr.produto_id = pi.produto_id
+    WHERE it.pedido_id BETWEEN ? AND ? AND p.status <> 'cancelado'
+    UNION ALL
+    SELECT it.produto_id, p.data_pedido, 'saida', it.quantidade, it.preco_unitario, it.pedido_id
+    FROM PedidoItem it
+    JOIN Pedido p ON p.pedido_id = it.pedido_id
+    WHERE it.pedido_id BETWEEN ? AND ? AND p.status <> 'cancelado'
+      AND it.prato_id IS NULL AND it.produto_id IS NOT NULL
+"""
+
+# One delivery per product and week, at the start of the week, covering what
+# the orders of that week consumed
+GENERATED_ENTRADAS_SQL = """
+    INSERT INTO MovimentacaoEstoque (produto_id, data_movimentacao, tipo, quantidade, preco_unitario)
+    SELECT me.produto_id, DATEADD(WEEK, DATEDIFF(WEEK, 0, me.data_movimentacao), 0), 'entrada',
+           SUM(me.quantidade), MAX(p.custo_unitario)
+    FROM MovimentacaoEstoque me
+    JOIN Produto p ON p.produto_id = me.produto_id
+    WHERE me.pedido_id BETWEEN ? AND ? AND me.tipo = 'saida'
+    GROUP BY me.produto_id, DATEADD(WEEK, DATEDIFF(WEEK, 0, me.data_movimentacao), 0)
+"""
+
+INVOICE_DATES_SQL = """
+    UPDATE fa
+    SET data_emissao = DATEADD(MINUTE, 30 + fa.pedido_id % 90, p.data_pedido)
+    FROM Fatura fa
+    JOIN Pedido p ON p.pedido_id = fa.pedido_id
+    WHERE fa.pedido_id BETWEEN ? AND ?
+"""
+
+
+def _next_id(cursor: pyodbc.Cursor, table: str, column: str) -> int:
+    cursor.execute(f'SELECT ISNULL(MAX({column}), 0) + 1 FROM {table}')
+    return cursor.fetchone()[0]
+
+
+def _bulk_insert(cursor: pyodbc.Cursor, sql: str, rows: list, batch_size: int,
+                 identity_table: str | None = None) -> None:
+    """Insert ``rows`` in fast_executemany batches, with explicit identity values if asked."""
+    if identity_table:
+        cursor.execute(f'SET IDENTITY_INSERT {identity_table} ON')
+    try:
+        for start in range(0, len(rows), batch_size):
+            cursor.executemany(sql, rows[start:start + batch_size])
+    finally:
+        if identity_table:
+            cursor.execute(f'SET IDENTITY_INSERT {identity_table} OFF')
+
+
+def _skewed(rng, values: list):
+    """Pick from ``values`` with a long tail: the first entries come up far more often."""
+    return values[min(int(rng.paretovariate(1.2)) - 1, len(values) - 1)]
+
+
+def _order_time(rng, day: date) -> datetime:
+    # Lunch and dinner peaks
+    if rng.random() < 0.55:
+        minutes = min(max(rng.gauss(13.25 * 60, 40), 12 * 60), 15.5 * 60)
+    else:
+        minutes = min(max(rng.gauss(20.5 * 60, 60), 19 * 60), 23.5 * 60)
+    return datetime.combine(day, datetime.min.time()) + timedelta(minutes=int(minutes))
+
+
+def orders_for_day(rng, day: date, per_day: int) -> int:
+    """Orders on ``day``: weekday pattern, a summer peak and day-to-day noise."""
+    season = 1 + 0.15 * math.sin(2 * math.pi * (day.timetuple().tm_yday - 100) / 365)
+    return max(0, round(per_day * WEEKDAY_WEIGHTS[day.weekday()] * season * rng.gauss(1, 0.1)))
+
+
+def generate_data(cursor: pyodbc.Cursor, days: int = 730, orders_per_day: int = 300,
+                  clients: int = 5000, reservations: int = 20000, seed: int = 42,
+                  batch_size: int = 10000, verbose: bool = False) -> dict:
+    """Add ``days`` of synthetic orders ending yesterday, plus clients and reservations.
+
+    Rows are bulk loaded with fast_executemany. The per-row stock deduction
+    and billing summary triggers are disabled meanwhile: stock movements are
+    written set-based per month, dated when each order was placed, and the
+    summary is rebuilt at the end. Orders are finalised through the normal
+    invoice trigger and their invoices re-dated.
+
+    Everything, the disabled triggers included, happens in the caller's
+    transaction, so a failure rolls it all back; the cursor must not be in
+    autocommit mode, and the caller commits. Refuses to write to the
+    application database.
+    """
+    if cursor.connection.autocommit:
+        raise RuntimeError('generate_data must run in a transaction; open the connection with autocommit=False')
+    cursor.execute('SELECT DB_NAME()')
+    if cursor.fetchone()[0].lower() == DATABASE.lower():
+        raise RuntimeError(f'Refusing to generate data in {DATABASE}; use a dedicated or test database')
+    rng = random.Random(seed)
+    cursor.fast_executemany = True
+    counts = dict.fromkeys(('clientes', 'pedidos', 'itens', 'movimentacoes', 'faturas', 'reservas'), 0)
+
+    cursor.execute('SELECT mesa_id FROM Mesa')
+    mesas = [row[0] for row in cursor.fetchall()]
+    cursor.execute('SELECT funcionario_id FROM Funcionario')
+    funcionarios = [row[0] for row in cursor.fetchall()]
+    cursor.execute(
+        "SELECT p.prato_id, p.preco_base, CASE WHEN ci.grupo_iva = 'bebida' THEN 23.00 ELSE 13.00 END "
+        "FROM Prato p LEFT JOIN CategoriaIva ci ON ci.categoria_id = p.categoria_id"
+    )
+    pratos = [tuple(row) for row in cursor.fetchall()]
+    cursor.execute(
+        "SELECT produto_id, preco_venda, CASE WHEN tipo = 'bebida' THEN 23.00 ELSE 13.00 END "
+        "FROM Produto WHERE tipo <> 'ingrediente'"
+    )
+    produtos = [tuple(row) for row in cursor.fetchall()]
+    if not (mesas and funcionarios and pratos):
+        raise RuntimeError('Mesa, Funcionario and Prato need seed rows before generating data')
+    # A few dishes sell far more than the rest
+    rng.shuffle(pratos)
+    prato_weights = list(accumulate(1 / rank for rank in range(1, len(pratos) + 1)))
+
+    for trigger, table in GENERATOR_DISABLED_TRIGGERS:
+        cursor.execute(f'DISABLE TRIGGER {trigger} ON {table}')
+    try:
+        first_cliente = _next_id(cursor, 'Cliente', 'cliente_id')
+        rows = []
+        for cliente_id in range(first_cliente, first_cliente + clients):
+            first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+            cidade, postal = rng.choice(CITIES)
+            rows.append((
+                cliente_id, f'{first} {last}', f'9{rng.randrange(10 ** 8):08d}',
+                f'{first}.{last}.{cliente_id}@example.pt'.lower(),
+                f'Rua {rng.choice(LAST_NAMES)}, {rng.randint(1, 200)}', cidade,
+                f'{postal}-{rng.randrange(1000):03d}', f'{rng.randrange(10 ** 8, 10 ** 9)}',
+            ))
+        _bulk_insert(cursor,
+                     'INSERT INTO Cliente (cliente_id, nome, telefone, email, morada, cidade, codigo_postal, '
+                     'contribuinte) VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                     rows, batch_size, identity_table='Cliente')
+        counts['clientes'] = clients
+        # Regulars: the head of this shuffled list gets most visits
+        cliente_ids = list(range(first_cliente, first_cliente + clients))
+        rng.shuffle(cliente_ids)
+
+        start = date.today() - timedelta(days=days)
+        for month_start in range(0, days, 31):
+            started = time.perf_counter()
+            first_pedido = pedido_id = _next_id(cursor, 'Pedido', 'pedido_id')
+            pedidos, itens = [], []
+            for offset in range(month_start, min(month_start + 31, days)):
+                day = start + timedelta(days=offset)
+                for _ in range(orders_for_day(rng, day, orders_per_day)):
+                    cliente_id = _skewed(rng, cliente_ids) if cliente_ids and rng.random() < 0.3 else None
+                    # Finalised ones are switched over below so the invoice trigger runs
+                    status = 'cancelado' if rng.random() < 0.03 else 'pendente'
+                    pedidos.append((pedido_id, rng.choice(mesas), rng.choice(funcionarios), cliente_id,
+                                    _order_time(rng, day), status))
+                    for _ in range(rng.choices(*ITEMS_PER_ORDER)[0]):
+                        quantidade = rng.choices(*QUANTITIES)[0]
+                        if produtos and rng.random() < 0.3:
+                            produto_id, preco, iva = rng.choice(produtos)
+                            itens.append((pedido_id, None, produto_id, quantidade, preco, iva))
+                        else:
+                            prato_id, preco, iva = rng.choices(pratos, cum_weights=prato_weights)[0]
+                            itens.append((pedido_id, prato_id, None, quantidade, preco, iva))
+                    pedido_id += 1
+            if not pedidos:
+                continue
+            last_pedido = pedido_id - 1
+
+            _bulk_insert(cursor,
+                         'INSERT INTO Pedido (pedido_id, mesa_id, funcionario_id, cliente_id, data_pedido, status) '
+                         'VALUES (?, ?, ?, ?, ?, ?)',
+                         pedidos, batch_size, identity_table='Pedido')
+            _bulk_insert(cursor,
+                         'INSERT INTO PedidoItem (pedido_id, prato_id, produto_id, quantidade, preco_unitario, iva) '
+                         'VALUES (?, ?, ?, ?, ?, ?)',
+                         itens, batch_size)
+            cursor.execute(GENERATED_SAIDAS_SQL, first_pedido, last_pedido, first_pedido, last_pedido)
+            saidas = cursor.rowcount
+            cursor.execute(GENERATED_ENTRADAS_SQL, first_pedido, last_pedido)
+            entradas = cursor.rowcount
+            cursor.execute(
+                "UPDATE Pedido SET status = 'finalizado' WHERE pedido_id BETWEEN ? AND ? AND status = 'pendente'",
+                first_pedido, last_pedido,
+            )
+            finalizados = cursor.rowcount
+            cursor.execute(INVOICE_DATES_SQL, first_pedido, last_pedido)
+
+            counts['pedidos'] += len(pedidos)
+            counts['itens'] += len(itens)
+            counts['movimentacoes'] += saidas + entradas
+            counts['faturas'] += finalizados
+            if verbose:
+                print(f'{start + timedelta(days=month_start)}: {len(pedidos)} pedido(s), {len(itens)} item(s), '
+                      f'{saidas + entradas} movimentação(ões) in {time.perf_counter() - started:.1f} s')
+
+        rows = []
+        for _ in range(reservations if cliente_ids else 0):
+            day = start + timedelta(days=rng.randrange(days + 30))
+            if day >= date.today():
+                status = 'ativa'
+            else:
+                status = 'cancelada' if rng.random() < 0.15 else 'confirmada'
+            rows.append((_skewed(rng, cliente_ids), rng.choice(mesas), day, rng.choice(RESERVATION_TIMES),
+                         rng.choices(*PARTY_SIZES)[0], status))
+        _bulk_insert(cursor,
+                     'INSERT INTO Reserva (cliente_id, mesa_id, data_reserva, hora_reserva, quantidade_pessoas, '
+                     'status) VALUES (?, ?, ?, ?, ?, ?)',
+                     rows, batch_size)
+        counts['reservas'] = len(rows)
+    finally:
+        for trigger, table in GENERATOR_DISABLED_TRIGGERS:
+            cursor.execute(f'ENABLE TRIGGER {trigger} ON {table}')
+
+    cursor.execute('EXEC sp_reconstruir_resumo_faturacao')
+    cursor.fetchall()
+    return counts
+
+
+def generate(database: str, **volumes) -> dict:
+    started = time.perf_counter()
+    # One transaction: if the load fails or is interrupted, the triggers come
+    # back enabled with the rollback instead of staying disabled
+    conn = pyodbc.connect(get_connection_string(), autocommit=False)
+    try:
+        cursor = conn.cursor()
+        cursor.execute(f'USE [{database}]')
+        counts = generate_data(cursor, verbose=True, **volumes)
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+    with connect() as conn:
+        cursor = conn.cursor()
+        cursor.execute(f'USE [{database}]')
+        for table in ('Cliente', 'Reserva', 'Pedido', 'PedidoItem', 'MovimentacaoEstoque', 'Fatura', 'FaturaItem'):
+            cursor.execute(f'UPDATE STATISTICS {table}')
+    print(', '.join(f'{count} {name}' for name, count in counts.items()))
+    print(f'Generated in {time.perf_counter() - started:.1f} s')
+    return counts
+
+
 def test_connection() -> None:
     try:
         with connect() as conn:
@@ -62,6 +683,47 @@ def main() -> None:
 
     sub.add_parser('test', help='Test connection to the database')
     sub.add_parser('run', help='Execute all SQL scripts in sequence')
+    migrate_parser = sub.add_parser(
+        'migrate', help='Apply only new or changed SQL scripts and record them in the history table'
+    )
+    migrate_parser.add_argument('--dry-run', action='store_true',
+                                help='list the scripts that would be applied')
+    migrate_parser.add_argument('--baseline', action='store_true',
+                                help='record pending scripts as applied without running them')
+    reconcile_parser = sub.add_parser(
+        'reconcile', help='Check Produto.stock_atual against the movement history and repair drift'
+    )
+    reconcile_parser.add_argument('--check', action='store_true',
+                                  help='only report drift; exit with status 1 if any is found')
+    reorder_parser = sub.add_parser(
+        'reorder', help='Group products below minimum stock into one pending order per supplier'
+    )
+    reorder_parser.add_argument('--interval', type=float, metavar='SECONDS',
+                                help='keep running, repeating the reorder every SECONDS')
+
+    advise_parser = sub.add_parser(
+        'advise', help='Write a reviewable script with missing and unused index suggestions'
+    )
+    advise_parser.add_argument('--output', type=Path, metavar='FILE',
+                               help=f'script to write (default: a timestamped file in {ADVISOR_DIR})')
+    advise_parser.add_argument('--limit', type=int, default=20,
+                               help='maximum number of missing index suggestions (default: 20)')
+    advise_parser.add_argument('--database', default=DATABASE, help=f'database to analyse (default: {DATABASE})')
+
+    generate_parser = sub.add_parser(
+        'generate', help='Bulk load synthetic orders, stock movements, clients and reservations'
+    )
+    generate_parser.add_argument('--days', type=int, default=730,
+                                 help='days of order history, ending yesterday (default: 730)')
+    generate_parser.add_argument('--orders-per-day', type=int, default=300,
+                                 help='average orders on a typical day (default: 300)')
+    generate_parser.add_argument('--clients', type=int, default=5000, help='clients to create (default: 5000)')
+    generate_parser.add_argument('--reservations', type=int, default=20000,
+                                 help='reservations to create (default: 20000)')
+    generate_parser.add_argument('--seed', type=int, default=42, help='random seed, for repeatable data')
+    generate_parser.add_argument('--batch-size', type=int, default=10000, help='rows per executemany batch')
+    generate_parser.add_argument('--database', required=True,
+                                 help=f'dedicated or test database to fill (never {DATABASE})')
 
     args = parser.parse_args()
 
@@ -69,6 +731,19 @@ def main() -> None:
         test_connection()
     elif args.command == 'run':
         run_all_scripts()
+    elif args.command == 'migrate':
+        migrate(dry_run=args.dry_run, baseline=args.baseline)
+    elif args.command == 'reconcile':
+        drift = reconcile(fix=not args.check)
+        if args.check and drift:
+            raise SystemExit(1)
+    elif args.command == 'reorder':
+        reorder(args.interval)
+    elif args.command == 'advise':
+        advise(args.output, args.limit, args.database)
+    elif args.command == 'generate':
+        generate(args.database, days=args.days, orders_per_day=args.orders_per_day, clients=args.clients,
+                 reservations=args.reservations, seed=args.seed, batch_size=args.batch_size)
 
 
 if __name__ == '__main__':
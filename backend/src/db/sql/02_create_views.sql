@@ -49,16 +49,19 @@ GO
 
 /* ------------------------------------------------
    4. View: Faturamento por Período (Ano/Mês)
-   ------------------------------------------------ */
+   ------------------------------------------------
+   Lê do resumo diário (ResumoFaturacaoDiaria), com poucas linhas por dia,
+   em vez de percorrer todas as faturas.
+*/
 CREATE OR ALTER VIEW view_faturamento_periodo AS
 SELECT
-    YEAR(f.data_emissao) AS ano,
-    MONTH(f.data_emissao) AS mes,
-    SUM(f.total) AS total_faturado
-FROM Fatura f
+    YEAR(r.data) AS ano,
+    MONTH(r.data) AS mes,
+    SUM(r.valor_total) AS total_faturado
+FROM ResumoFaturacaoDiaria r
 GROUP BY
-    YEAR(f.data_emissao),
-    MONTH(f.data_emissao);
+    YEAR(r.data),
+    MONTH(r.data);
 GO
 
 
@@ -25,9 +25,11 @@ AS
     GROUP BY me.produto_id;
 GO
 
--- Índice clusterizado na Indexed View (chave única em produto_id)
-CREATE UNIQUE CLUSTERED INDEX idx_mv_estoque_saida_agregado
-    ON mv_estoque_saida_agregado (produto_id);
+-- Índice clusterizado na Indexed View (chave única em produto_id).
+-- Alterar a view apaga o índice, por isso é recriado sempre que falta.
+IF INDEXPROPERTY(OBJECT_ID(N'dbo.mv_estoque_saida_agregado'), N'idx_mv_estoque_saida_agregado', 'IndexID') IS NULL
+    CREATE UNIQUE CLUSTERED INDEX idx_mv_estoque_saida_agregado
+        ON mv_estoque_saida_agregado (produto_id);
 GO
 
 
@@ -37,6 +39,10 @@ GO
    Une a Indexed View (que contém a soma de quantidades e COUNT_BIG)
    à tabela Produto, e usa subqueries para obter datas mínima e máxima
    de movimentação para cada produto. Essa view não é indexada.
+   NOEXPAND obriga a ler o índice da Indexed View (sem ele, edições que não
+   a Enterprise voltam a agregar MovimentacaoEstoque), e as datas vêm de
+   idx_movimentacao_produto_tipo_data (07_create_indices.sql): cada
+   MIN/MAX é um seek de uma linha em vez de percorrer as movimentações.
 */
 CREATE OR ALTER VIEW view_estoque_utilizado_detalhado AS
 SELECT
@@ -55,7 +61,7 @@ SELECT
         WHERE me3.tipo = 'saida'
           AND me3.produto_id = agg.produto_id
     ) AS data_fim
-FROM mv_estoque_saida_agregado AS agg
+FROM dbo.mv_estoque_saida_agregado AS agg WITH (NOEXPAND)
 JOIN dbo.Produto AS p
     ON agg.produto_id = p.produto_id;
 GO
@@ -8,20 +8,30 @@ GO
 -- =========================================================================
 
 /* ------------------------------------------------
-   1. Scalar Function: fn_calcular_vencimentos_mes_ano
-   ------------------------------------------------ */
-CREATE FUNCTION fn_calcular_vencimentos_mes_ano
+   1. Table-Valued Function: fn_vencimentos_funcionario_mes_ano
+   ------------------------------------------------
+   NOTA: as funções por ano/mês filtram por um intervalo semiaberto
+   [primeiro dia do mês, primeiro dia do mês seguinte), calculado uma vez,
+   para que a coluna de data fique livre de funções e os índices
+   idx_reghoras_data, idx_movimentacao_data e idx_fatura_data façam seek.
+   NOTA: os totais são TVFs inline (expandidas no plano da consulta que as
+   usa, como uma view); as funções escalares fn_calcular_* ficam apenas
+   como invólucros para compatibilidade.
+*/
+CREATE OR ALTER FUNCTION fn_vencimentos_funcionario_mes_ano
 (
     @ano  INT,
     @mes  INT
 )
-RETURNS DECIMAL(14,2)
+RETURNS TABLE
 AS
-BEGIN
-    DECLARE @total_vencimentos DECIMAL(14,2);
-
+RETURN
+(
     SELECT
-        @total_vencimentos = SUM(
+        r.funcionario_id,
+        SUM(r.horas_normais) AS horas_normais,
+        SUM(r.horas_extra)   AS horas_extra,
+        SUM(
             -- cálculo das horas normais e extra proporcional ao salário base
             ( (c.salario_mensal / 160.0) * r.horas_normais )
             +
@@ -36,23 +46,40 @@ BEGIN
                     + (c.salario_mensal / 160.0) * 1.5 * 5
                     + (c.salario_mensal / 160.0) * 2 * (r.horas_extra - 7)
               END)
-        )
+        ) AS valor_vencimentos
     FROM RegistroHoras r
     JOIN Funcionario f
         ON r.funcionario_id = f.funcionario_id
     JOIN Carreira c
         ON f.carreira_id = c.carreira_id
-    WHERE YEAR(r.data_registro) = @ano
-      AND MONTH(r.data_registro) = @mes;
+    WHERE r.data_registro >= DATEFROMPARTS(@ano, @mes, 1)
+      AND r.data_registro <  DATEADD(MONTH, 1, DATEFROMPARTS(@ano, @mes, 1))
+    GROUP BY r.funcionario_id
+);
+GO
 
-    RETURN ISNULL(@total_vencimentos, 0.00);
+/* ------------------------------------------------
+   1.1. Scalar Function: fn_calcular_vencimentos_mes_ano
+   ------------------------------------------------ */
+CREATE OR ALTER FUNCTION fn_calcular_vencimentos_mes_ano
+(
+    @ano  INT,
+    @mes  INT
+)
+RETURNS DECIMAL(14,2)
+AS
+BEGIN
+    RETURN ISNULL((
+        SELECT SUM(v.valor_vencimentos)
+        FROM dbo.fn_vencimentos_funcionario_mes_ano(@ano, @mes) v
+    ), 0.00);
 END;
 GO
 
 /* ------------------------------------------------
    2. Table-Valued Function: fn_valores_gastos_stock_mes_ano
    ------------------------------------------------ */
-CREATE FUNCTION fn_valores_gastos_stock_mes_ano
+CREATE OR ALTER FUNCTION fn_valores_gastos_stock_mes_ano
 (
     @ano INT,
     @mes INT
@@ -69,16 +96,54 @@ RETURN
     JOIN Produto p
         ON me.produto_id = p.produto_id
     WHERE me.tipo = 'saida'
-      AND YEAR(me.data_movimentacao) = @ano
-      AND MONTH(me.data_movimentacao) = @mes
+      AND me.data_movimentacao >= DATEFROMPARTS(@ano, @mes, 1)
+      AND me.data_movimentacao <  DATEADD(MONTH, 1, DATEFROMPARTS(@ano, @mes, 1))
     GROUP BY me.produto_id, p.nome
 );
 GO
 
 /* ------------------------------------------------
-   3. Scalar Function: fn_calcular_total_faturado
+   3. Table-Valued Function: fn_faturado_por_dia
+   ------------------------------------------------
+   O total vem de ResumoFaturacaoDiaria, a mesma fonte dos relatórios de
+   faturação; o número de faturas é contado em Fatura (idx_fatura_data).
+*/
+CREATE OR ALTER FUNCTION fn_faturado_por_dia
+(
+    @data_inicio DATE,
+    @data_fim    DATE
+)
+RETURNS TABLE
+AS
+RETURN
+(
+    SELECT
+        r.data,
+        ISNULL(f.faturas, 0) AS faturas,
+        r.total_faturado
+    FROM (
+        SELECT data, SUM(valor_total) AS total_faturado
+        FROM ResumoFaturacaoDiaria
+        WHERE data >= @data_inicio
+          AND data <= @data_fim
+        GROUP BY data
+    ) r
+    LEFT JOIN (
+        SELECT CAST(data_emissao AS DATE) AS data, COUNT(*) AS faturas
+        FROM Fatura
+        -- Inclui todo o dia @data_fim
+        WHERE data_emissao >= @data_inicio
+          AND data_emissao <  DATEADD(DAY, 1, @data_fim)
+        GROUP BY CAST(data_emissao AS DATE)
+    ) f
+        ON f.data = r.data
+);
+GO
+
+/* ------------------------------------------------
+   3.1. Scalar Function: fn_calcular_total_faturado
    ------------------------------------------------ */
-CREATE FUNCTION fn_calcular_total_faturado
+CREATE OR ALTER FUNCTION fn_calcular_total_faturado
 (
     @data_inicio DATE,
     @data_fim    DATE
@@ -86,21 +151,17 @@ CREATE FUNCTION fn_calcular_total_faturado
 RETURNS DECIMAL(14,2)
 AS
 BEGIN
-    DECLARE @total DECIMAL(14,2);
-
-    SELECT
-        @total = SUM(f.total)
-    FROM Fatura f
-    WHERE CAST(f.data_emissao AS DATE) BETWEEN @data_inicio AND @data_fim;
-
-    RETURN ISNULL(@total, 0.00);
+    RETURN ISNULL((
+        SELECT SUM(d.total_faturado)
+        FROM dbo.fn_faturado_por_dia(@data_inicio, @data_fim) d
+    ), 0.00);
 END;
 GO
 
 /* ------------------------------------------------
    4. Table-Valued Function: fn_produtos_abaixo_stock_minimo
    ------------------------------------------------ */
-CREATE FUNCTION fn_produtos_abaixo_stock_minimo()
+CREATE OR ALTER FUNCTION fn_produtos_abaixo_stock_minimo()
 RETURNS TABLE
 AS
 RETURN
@@ -116,9 +177,36 @@ RETURN
 GO
 
 /* ------------------------------------------------
-   5. Scalar Function: fn_calcular_horas_trabalhadas
+   5. Table-Valued Function: fn_horas_trabalhadas_periodo
+   ------------------------------------------------
+   Horas por funcionário entre as duas datas, inclusive. Para um só
+   funcionário basta filtrar o resultado: o filtro é aplicado antes da
+   agregação, como numa view.
+*/
+CREATE OR ALTER FUNCTION fn_horas_trabalhadas_periodo
+(
+    @data_inicio DATE,
+    @data_fim    DATE
+)
+RETURNS TABLE
+AS
+RETURN
+(
+    SELECT
+        r.funcionario_id,
+        SUM(r.horas_normais)                 AS horas_normais,
+        SUM(r.horas_extra)                   AS horas_extra,
+        SUM(r.horas_normais + r.horas_extra) AS total_horas
+    FROM RegistroHoras r
+    WHERE r.data_registro BETWEEN @data_inicio AND @data_fim
+    GROUP BY r.funcionario_id
+);
+GO
+
+/* ------------------------------------------------
+   5.1. Scalar Function: fn_calcular_horas_trabalhadas
    ------------------------------------------------ */
-CREATE FUNCTION fn_calcular_horas_trabalhadas
+CREATE OR ALTER FUNCTION fn_calcular_horas_trabalhadas
 (
     @funcionario_id INT,
     @data_inicio    DATE,
@@ -127,14 +215,10 @@ CREATE FUNCTION fn_calcular_horas_trabalhadas
 RETURNS DECIMAL(10,2)
 AS
 BEGIN
-    DECLARE @total_horas DECIMAL(10,2);
-
-    SELECT
-        @total_horas = SUM(r.horas_normais + r.horas_extra)
-    FROM RegistroHoras r
-    WHERE r.funcionario_id = @funcionario_id
-      AND r.data_registro BETWEEN @data_inicio AND @data_fim;
-
-    RETURN ISNULL(@total_horas, 0.00);
+    RETURN ISNULL((
+        SELECT h.total_horas
+        FROM dbo.fn_horas_trabalhadas_periodo(@data_inicio, @data_fim) h
+        WHERE h.funcionario_id = @funcionario_id
+    ), 0.00);
 END;
 GO
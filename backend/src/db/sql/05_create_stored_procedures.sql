@@ -8,7 +8,7 @@ GO
 /* ------------------------------------------------
    1. SP: sp_obter_mesas_disponiveis
    ------------------------------------------------ */
-CREATE PROCEDURE sp_obter_mesas_disponiveis
+CREATE OR ALTER PROCEDURE sp_obter_mesas_disponiveis
 AS
 BEGIN
     SET NOCOUNT ON;
@@ -20,7 +20,7 @@ GO
 /* ------------------------------------------------
    2. SP: sp_obter_pedidos_por_funcionario
    ------------------------------------------------ */
-CREATE PROCEDURE sp_obter_pedidos_por_funcionario
+CREATE OR ALTER PROCEDURE sp_obter_pedidos_por_funcionario
     @funcionario_id INT
 AS
 BEGIN
@@ -39,7 +39,7 @@ GO
 /* ------------------------------------------------
    3. SP: sp_obter_estoque_ingrediente
    ------------------------------------------------ */
-CREATE PROCEDURE sp_obter_estoque_ingrediente
+CREATE OR ALTER PROCEDURE sp_obter_estoque_ingrediente
     @ingrediente_id INT
 AS
 BEGIN
@@ -58,15 +58,21 @@ GO
 
 /* ------------------------------------------------
    4. SP: sp_obter_faturamento_por_periodo
-   ------------------------------------------------ */
-CREATE PROCEDURE sp_obter_faturamento_por_periodo
+   ------------------------------------------------
+   Soma o resumo diário (ResumoFaturacaoDiaria) entre as duas datas, inclusive.
+*/
+CREATE OR ALTER PROCEDURE sp_obter_faturamento_por_periodo
     @data_inicio DATE,
     @data_fim    DATE
 AS
 BEGIN
     SET NOCOUNT ON;
     DECLARE @total DECIMAL(14,2);
-    SET @total = dbo.fn_calcular_total_faturado(@data_inicio, @data_fim);
+
+    SELECT @total = ISNULL(SUM(r.valor_total), 0.00)
+    FROM ResumoFaturacaoDiaria r
+    WHERE r.data >= @data_inicio
+      AND r.data <= @data_fim;
 
     SELECT
         @data_inicio AS data_inicio,
@@ -78,7 +84,7 @@ GO
 /* ------------------------------------------------
    5. SP: sp_obter_horas_trabalhadas
    ------------------------------------------------ */
-CREATE PROCEDURE sp_obter_horas_trabalhadas
+CREATE OR ALTER PROCEDURE sp_obter_horas_trabalhadas
     @funcionario_id INT,
     @data_inicio    DATE,
     @data_fim       DATE
@@ -86,20 +92,23 @@ AS
 BEGIN
     SET NOCOUNT ON;
     DECLARE @total_horas DECIMAL(10,2);
-    SET @total_horas = dbo.fn_calcular_horas_trabalhadas(@funcionario_id, @data_inicio, @data_fim);
+
+    SELECT @total_horas = h.total_horas
+    FROM dbo.fn_horas_trabalhadas_periodo(@data_inicio, @data_fim) h
+    WHERE h.funcionario_id = @funcionario_id;
 
     SELECT
-        @funcionario_id AS funcionario_id,
-        @data_inicio    AS data_inicio,
-        @data_fim       AS data_fim,
-        @total_horas    AS total_horas;
+        @funcionario_id              AS funcionario_id,
+        @data_inicio                 AS data_inicio,
+        @data_fim                    AS data_fim,
+        ISNULL(@total_horas, 0.00)   AS total_horas;
 END;
 GO
 
 /* ------------------------------------------------
    6. SP: sp_obter_clientes_frequentes
    ------------------------------------------------ */
-CREATE PROCEDURE sp_obter_clientes_frequentes
+CREATE OR ALTER PROCEDURE sp_obter_clientes_frequentes
 AS
 BEGIN
     SET NOCOUNT ON;
@@ -111,7 +120,7 @@ GO
 /* ------------------------------------------------
    7. SP: sp_obter_pratos_populares
    ------------------------------------------------ */
-CREATE PROCEDURE sp_obter_pratos_populares
+CREATE OR ALTER PROCEDURE sp_obter_pratos_populares
 AS
 BEGIN
     SET NOCOUNT ON;
@@ -123,7 +132,7 @@ GO
 /* ------------------------------------------------
    8. SP: sp_obter_entregas_fornecedor
    ------------------------------------------------ */
-CREATE PROCEDURE sp_obter_entregas_fornecedor
+CREATE OR ALTER PROCEDURE sp_obter_entregas_fornecedor
     @fornecedor_id INT
 AS
 BEGIN
@@ -142,7 +151,7 @@ GO
 /* ------------------------------------------------
    9. SP: sp_obter_promocoes_ativas
    ------------------------------------------------ */
-CREATE PROCEDURE sp_obter_promocoes_ativas
+CREATE OR ALTER PROCEDURE sp_obter_promocoes_ativas
 AS
 BEGIN
     SET NOCOUNT ON;
@@ -154,7 +163,7 @@ GO
 /* ------------------------------------------------
    10. SP: sp_obter_reservas_ativas (Opcional)
    ------------------------------------------------ */
-CREATE PROCEDURE sp_obter_reservas_ativas
+CREATE OR ALTER PROCEDURE sp_obter_reservas_ativas
 AS
 BEGIN
     SET NOCOUNT ON;
@@ -165,19 +174,24 @@ GO
 
 /* ------------------------------------------------
    11. SP: sp_obter_faturamento_por_categoria
-   ------------------------------------------------ */
-CREATE PROCEDURE sp_obter_faturamento_por_categoria
+   ------------------------------------------------
+   Valor líquido faturado por categoria de prato, a partir do resumo diário.
+   Sem datas, considera todo o histórico.
+*/
+CREATE OR ALTER PROCEDURE sp_obter_faturamento_por_categoria
+    @data_inicio DATE = NULL,
+    @data_fim    DATE = NULL
 AS
 BEGIN
     SET NOCOUNT ON;
     SELECT
         c.nome         AS categoria,
-        SUM(pi.quantidade * pi.preco_unitario) AS total_faturado
-    FROM PedidoItem pi
-    JOIN Prato p
-        ON pi.prato_id = p.prato_id
+        SUM(r.valor_liquido) AS total_faturado
+    FROM ResumoFaturacaoDiaria r
     JOIN Categoria c
-        ON p.categoria_id = c.categoria_id
+        ON r.categoria_id = c.categoria_id
+    WHERE r.data >= ISNULL(@data_inicio, '19000101')
+      AND r.data <= ISNULL(@data_fim, '99991231')
     GROUP BY c.nome;
 END;
 GO
\ No newline at end of file
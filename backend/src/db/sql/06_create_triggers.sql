@@ -8,82 +8,89 @@ GO
 
 /* ------------------------------------------------
    6.1. Procedimento Auxiliar: sp_abatimento_estoque_pedidoitem
-   ------------------------------------------------ */
-CREATE PROCEDURE sp_abatimento_estoque_pedidoitem
-    @pedido_item_id INT
+   ------------------------------------------------
+   Recebe a lista de itens inseridos (tipo tabela PedidoItemIdLista) e gera
+   todas as saídas de estoque numa única instrução: os pratos são expandidos
+   pelos seus ingredientes em PratoIngrediente e os produtos genéricos saem
+   diretamente.
+*/
+IF TYPE_ID(N'dbo.PedidoItemIdLista') IS NULL
+    CREATE TYPE dbo.PedidoItemIdLista AS TABLE (
+        pedido_item_id INT NOT NULL PRIMARY KEY
+    );
+GO
+
+CREATE OR ALTER PROCEDURE sp_abatimento_estoque_pedidoitem
+    @itens dbo.PedidoItemIdLista READONLY
 AS
 BEGIN
     SET NOCOUNT ON;
 
-    DECLARE @prato_id       INT,
-            @produto_id     INT,
-            @quantidade     INT,
-            @preco_unitario DECIMAL(10,2),
-            @pedido_id      INT;
-
+    INSERT INTO MovimentacaoEstoque (produto_id, data_movimentacao, tipo, quantidade, preco_unitario, pedido_id)
+    -- Ingredientes de cada prato, multiplicados pela quantidade do item
     SELECT
-        @prato_id       = prato_id,
-        @produto_id     = produto_id,
-        @quantidade     = quantidade,
-        @preco_unitario = preco_unitario,
-        @pedido_id      = pedido_id
-    FROM PedidoItem
-    WHERE pedido_item_id = @pedido_item_id;
-
-    IF @prato_id IS NOT NULL
-    BEGIN
-        -- Para cada ingrediente do prato, abater no estoque
-        INSERT INTO MovimentacaoEstoque (produto_id, data_movimentacao, tipo, quantidade, preco_unitario, pedido_id)
-        SELECT 
-            pi.produto_id,
-            GETDATE(),
-            'saida',
-            pi.quantidade_necessaria * @quantidade,
-            p.custo_unitario,
-            @pedido_id
-        FROM PratoIngrediente pi
-        JOIN Produto p
-            ON pi.produto_id = p.produto_id
-        WHERE pi.prato_id = @prato_id;
-    END
-    ELSE IF @produto_id IS NOT NULL
-    BEGIN
-        -- Se for produto genérico (bebida ou sobremesa)
-        INSERT INTO MovimentacaoEstoque (produto_id, data_movimentacao, tipo, quantidade, preco_unitario, pedido_id)
-        VALUES
-        (
-            @produto_id,
-            GETDATE(),
-            'saida',
-            @quantidade,
-            @preco_unitario,
-            @pedido_id
-        );
-    END;
+        pi.produto_id,
+        GETDATE(),
+        'saida',
+        pi.quantidade_necessaria * it.quantidade,
+        p.custo_unitario,
+        it.pedido_id
+    FROM @itens ids
+    JOIN PedidoItem it
+        ON it.pedido_item_id = ids.pedido_item_id
+    JOIN PratoIngrediente pi
+        ON pi.prato_id = it.prato_id
+    JOIN Produto p
+        ON pi.produto_id = p.produto_id
+    WHERE it.prato_id IS NOT NULL
+
+    UNION ALL
+
+    -- Produtos genéricos (bebida ou sobremesa)
+    SELECT
+        it.produto_id,
+        GETDATE(),
+        'saida',
+        it.quantidade,
+        it.preco_unitario,
+        it.pedido_id
+    FROM @itens ids
+    JOIN PedidoItem it
+        ON it.pedido_item_id = ids.pedido_item_id
+    WHERE it.prato_id IS NULL
+      AND it.produto_id IS NOT NULL;
 END;
 GO
 
 /* ------------------------------------------------
    6.2. Trigger: trg_abatimento_estoque_quando_inserir_pedidoitem
    ------------------------------------------------ */
-CREATE TRIGGER trg_abatimento_estoque_quando_inserir_pedidoitem
+CREATE OR ALTER TRIGGER trg_abatimento_estoque_quando_inserir_pedidoitem
 ON PedidoItem
 AFTER INSERT
 AS
 BEGIN
     SET NOCOUNT ON;
 
-    DECLARE @new_id INT;
-    SELECT @new_id = i.pedido_item_id FROM inserted i;
+    -- Todas as linhas do INSERT são tratadas de uma vez
+    DECLARE @itens dbo.PedidoItemIdLista;
+
+    INSERT INTO @itens (pedido_item_id)
+    SELECT pedido_item_id FROM inserted;
 
-    EXEC sp_abatimento_estoque_pedidoitem @new_id;
+    IF @@ROWCOUNT > 0
+        EXEC sp_abatimento_estoque_pedidoitem @itens;
 END;
 GO
 
 /* ------------------------------------------------
    6.3. Procedimento Auxiliar: sp_atualizar_stock_produto
-   ------------------------------------------------ */
-CREATE PROCEDURE sp_atualizar_stock_produto
+   ------------------------------------------------
+   Recalcula stock_atual a partir de todo o histórico de movimentações.
+   O trigger 6.4 já mantém o stock de forma incremental; este procedimento
+   fica para correções pontuais (ver `service.py reconcile`).
+*/
+CREATE OR ALTER PROCEDURE sp_atualizar_stock_produto
     @produto_id INT
 AS
 BEGIN
@@ -110,269 +117,532 @@ GO
 
 /* ------------------------------------------------
    6.4. Trigger: trg_atualizar_stock_e_verificar_minimo
-   ------------------------------------------------ */
-CREATE TRIGGER trg_atualizar_stock_e_verificar_minimo
+   ------------------------------------------------
+   Mantém Produto.stock_atual. A verificação do stock mínimo já não corre
+   aqui, dentro da venda: é feita em lote por sp_gerar_encomendas_reposicao
+   (6.7), executado periodicamente por `service.py reorder`.
+*/
+CREATE OR ALTER TRIGGER trg_atualizar_stock_e_verificar_minimo
 ON MovimentacaoEstoque
 AFTER INSERT
 AS
 BEGIN
     SET NOCOUNT ON;
 
-    DECLARE @produto_id    INT,
-            @tipo          VARCHAR(20),
-            @stock_minimo  INT,
-            @stock_atual   INT,
-            @stock_encom   INT,
-            @fornecedor_id INT,
-            @quantidade_a_encomendar INT;
-
-    SELECT
-        @produto_id = i.produto_id,
-        @tipo       = i.tipo
-    FROM inserted i;
-
-    -- 1. Recalcular stock
-    EXEC sp_atualizar_stock_produto @produto_id;
-
-    -- 2. Obter valores atuais de stock e parâmetros
-    SELECT
-        @stock_atual   = p.stock_atual,
-        @stock_minimo  = p.stock_minimo,
-        @stock_encom   = p.stock_encomenda,
-        @fornecedor_id = p.fornecedor_id
+    -- Aplicar ao stock apenas a variação trazida pelas linhas inseridas,
+    -- numa única instrução para todos os produtos afetados
+    UPDATE p
+    SET stock_atual = p.stock_atual + d.variacao
     FROM Produto p
-    WHERE p.produto_id = @produto_id;
-
-    -- 3. Se type = 'saida' e estoque abaixo do mínimo, gerar encomenda
-    IF @tipo = 'saida' AND @stock_atual < @stock_minimo
-    BEGIN
-        SET @quantidade_a_encomendar = @stock_encom - @stock_atual;
-        IF @quantidade_a_encomendar > 0
-        BEGIN
-            DECLARE @nova_encomenda_id INT;
-            INSERT INTO Encomenda (fornecedor_id, data_encomenda, status, valor_total)
-            VALUES (@fornecedor_id, GETDATE(), 'pendente', 0.00);
-
-            SET @nova_encomenda_id = SCOPE_IDENTITY();
-
-            DECLARE @custo_unitario DECIMAL(10,2);
-            SELECT @custo_unitario = custo_unitario
-            FROM Produto
-            WHERE produto_id = @produto_id;
-
-            INSERT INTO EncomendaItem (encomenda_id, produto_id, quantidade, preco_unitario)
-            VALUES (@nova_encomenda_id, @produto_id, @quantidade_a_encomendar, @custo_unitario);
-
-            UPDATE Encomenda
-            SET valor_total = (@quantidade_a_encomendar * @custo_unitario)
-            WHERE encomenda_id = @nova_encomenda_id;
-        END
-    END
+    JOIN (
+        SELECT
+            i.produto_id,
+            SUM(
+                CASE WHEN i.tipo = 'entrada' THEN i.quantidade
+                     WHEN i.tipo = 'saida'  THEN -i.quantidade
+                     ELSE 0
+                END
+            ) AS variacao
+        FROM inserted i
+        GROUP BY i.produto_id
+    ) d
+        ON d.produto_id = p.produto_id;
 END;
 GO
 
 /* ------------------------------------------------
    6.5. Trigger: trg_receber_encomenda (Entrada de Estoque)
-   ------------------------------------------------ */
-CREATE TRIGGER trg_receber_encomenda
+   ------------------------------------------------
+   Trata todas as encomendas que passaram a 'recebida' no mesmo UPDATE.
+   As entradas são inseridas numa única instrução e o trigger de
+   MovimentacaoEstoque atualiza o stock de todos os produtos de uma vez.
+*/
+CREATE OR ALTER TRIGGER trg_receber_encomenda
 ON Encomenda
 AFTER UPDATE
 AS
 BEGIN
     SET NOCOUNT ON;
 
-    DECLARE @encomenda_id INT,
-            @novo_status   VARCHAR(20);
+    IF NOT UPDATE(status)
+        RETURN;
 
+    INSERT INTO MovimentacaoEstoque (produto_id, data_movimentacao, tipo, quantidade, preco_unitario)
     SELECT
-        @encomenda_id = i.encomenda_id,
-        @novo_status   = i.status
-    FROM inserted i;
-
-    IF @novo_status = 'recebida'
-    BEGIN
-        -- Inserir movimentação de entrada para cada item da encomenda
-        INSERT INTO MovimentacaoEstoque (produto_id, data_movimentacao, tipo, quantidade, preco_unitario)
-        SELECT
-            ei.produto_id,
-            GETDATE(),
-            'entrada',
-            ei.quantidade,
-            ei.preco_unitario
-        FROM EncomendaItem ei
-        WHERE ei.encomenda_id = @encomenda_id;
-
-        -- Recalcular estoque para cada produto
-        DECLARE @produto_id INT;
-        DECLARE itens_cursor CURSOR FOR
-            SELECT produto_id
-            FROM EncomendaItem
-            WHERE encomenda_id = @encomenda_id;
-
-        OPEN itens_cursor;
-        FETCH NEXT FROM itens_cursor INTO @produto_id;
-
-        WHILE @@FETCH_STATUS = 0
-        BEGIN
-            EXEC sp_atualizar_stock_produto @produto_id;
-            FETCH NEXT FROM itens_cursor INTO @produto_id;
-        END
-
-        CLOSE itens_cursor;
-        DEALLOCATE itens_cursor;
-    END
+        ei.produto_id,
+        GETDATE(),
+        'entrada',
+        ei.quantidade,
+        ei.preco_unitario
+    FROM inserted i
+    JOIN deleted d
+        ON d.encomenda_id = i.encomenda_id
+    JOIN EncomendaItem ei
+        ON ei.encomenda_id = i.encomenda_id
+    -- Só na transição para 'recebida', para não dar entrada duas vezes
+    WHERE i.status = 'recebida'
+      AND d.status <> 'recebida';
 END;
 GO
 
 /* ------------------------------------------------
    6.6. Trigger: trg_gerar_fatura_ao_finalizar_pedido
-   ------------------------------------------------ */
-CREATE TRIGGER trg_gerar_fatura_ao_finalizar_pedido
+   ------------------------------------------------
+   Gera a fatura e as linhas de FaturaItem de todos os pedidos que passaram a
+   'finalizado' no mesmo UPDATE. O grupo de IVA (comida/bebida) de cada linha
+   vem de CategoriaIva; o IVA é arredondado por linha e os totais da fatura
+   são a soma das linhas.
+*/
+CREATE OR ALTER TRIGGER trg_gerar_fatura_ao_finalizar_pedido
 ON Pedido
 AFTER UPDATE
 AS
 BEGIN
     SET NOCOUNT ON;
 
-    DECLARE @pedido_id     INT,
-            @status_antigo VARCHAR(20),
-            @status_novo   VARCHAR(20),
-            @cliente_id    INT,
-            @tipo_fatura   VARCHAR(20);
+    IF NOT UPDATE(status)
+        RETURN;
+
+    DECLARE @finalizados TABLE (
+        pedido_id   INT NOT NULL PRIMARY KEY,
+        cliente_id  INT NULL
+    );
+
+    INSERT INTO @finalizados (pedido_id, cliente_id)
+    SELECT i.pedido_id, i.cliente_id
+    FROM inserted i
+    JOIN deleted d
+        ON d.pedido_id = i.pedido_id
+    WHERE i.status = 'finalizado'
+      AND d.status <> 'finalizado';
+
+    IF @@ROWCOUNT = 0
+        RETURN;
+
+    -- 1. Linhas de todos os pedidos, com valores calculados uma única vez
+    DECLARE @linhas TABLE (
+        pedido_id       INT           NOT NULL,
+        descricao       VARCHAR(255)  NOT NULL,
+        quantidade      INT           NOT NULL,
+        preco_unitario  DECIMAL(10,2) NOT NULL,
+        percentual_iva  DECIMAL(5,2)  NOT NULL,
+        grupo_iva       VARCHAR(10)   NOT NULL,
+        categoria_id    INT           NULL,
+        valor_liquido   DECIMAL(12,2) NOT NULL,
+        valor_iva       DECIMAL(10,2) NOT NULL
+    );
+
+    INSERT INTO @linhas (
+        pedido_id, descricao, quantidade, preco_unitario, percentual_iva,
+        grupo_iva, categoria_id, valor_liquido, valor_iva
+    )
+    SELECT
+        pi.pedido_id,
+        COALESCE(pr.nome, prod.nome, 'Item'),
+        pi.quantidade,
+        pi.preco_unitario,
+        pi.iva,
+        ISNULL(ci.grupo_iva, 'comida'),
+        pr.categoria_id,
+        pi.quantidade * pi.preco_unitario,
+        pi.quantidade * pi.preco_unitario * (pi.iva / 100.0)
+    FROM @finalizados f
+    JOIN PedidoItem pi
+        ON pi.pedido_id = f.pedido_id
+    LEFT JOIN Prato pr
+        ON pi.prato_id = pr.prato_id
+    LEFT JOIN Produto prod
+        ON pi.produto_id = prod.produto_id
+    LEFT JOIN CategoriaIva ci
+        ON ci.categoria_id = pr.categoria_id;
+
+    -- 2. Uma fatura por pedido, com os totais agregados por grupo de IVA
+    INSERT INTO Fatura (
+        pedido_id,
+        cliente_id,
+        data_emissao,
+        tipo_fatura,
+        nome_cliente,
+        morada_cliente,
+        cidade_cliente,
+        codigo_postal,
+        contribuinte,
+        subtotal_comida,
+        subtotal_bebida,
+        iva_comida,
+        iva_bebida,
+        total
+    )
+    SELECT
+        f.pedido_id,
+        f.cliente_id,
+        GETDATE(),
+        CASE WHEN f.cliente_id IS NULL THEN 'consumidor_final' ELSE 'empresa' END,
+        c.nome,
+        c.morada,
+        c.cidade,
+        c.codigo_postal,
+        c.contribuinte,
+        ISNULL(t.subtotal_comida, 0.00),
+        ISNULL(t.subtotal_bebida, 0.00),
+        ISNULL(t.iva_comida, 0.00),
+        ISNULL(t.iva_bebida, 0.00),
+        ISNULL(t.subtotal_comida + t.subtotal_bebida + t.iva_comida + t.iva_bebida, 0.00)
+    FROM @finalizados f
+    LEFT JOIN Cliente c
+        ON c.cliente_id = f.cliente_id
+    LEFT JOIN (
+        SELECT
+            pedido_id,
+            SUM(CASE WHEN grupo_iva = 'comida' THEN valor_liquido ELSE 0 END) AS subtotal_comida,
+            SUM(CASE WHEN grupo_iva = 'bebida' THEN valor_liquido ELSE 0 END) AS subtotal_bebida,
+            SUM(CASE WHEN grupo_iva = 'comida' THEN valor_iva     ELSE 0 END) AS iva_comida,
+            SUM(CASE WHEN grupo_iva = 'bebida' THEN valor_iva     ELSE 0 END) AS iva_bebida
+        FROM @linhas
+        GROUP BY pedido_id
+    ) t
+        ON t.pedido_id = f.pedido_id;
+
+    -- 3. Linhas da fatura (pedido_id é único em Fatura)
+    INSERT INTO FaturaItem (
+        fatura_id, descricao, quantidade, preco_unitario, valor_liquido,
+        percentual_iva, valor_iva, valor_total_linha, categoria_id
+    )
+    SELECT
+        fa.fatura_id,
+        l.descricao,
+        l.quantidade,
+        l.preco_unitario,
+        l.valor_liquido,
+        l.percentual_iva,
+        l.valor_iva,
+        l.valor_liquido + l.valor_iva,
+        l.categoria_id
+    FROM @linhas l
+    JOIN Fatura fa
+        ON fa.pedido_id = l.pedido_id;
+END;
+GO
+
+/* ------------------------------------------------
+   6.7. Procedimento: sp_gerar_encomendas_reposicao
+   ------------------------------------------------
+   Reposição em lote dos produtos abaixo do stock mínimo.
+   Implementação:
+     - A quantidade a encomendar é stock_encomenda - stock_atual, descontando
+       o que já está em encomendas pendentes do produto.
+     - Agrupa por fornecedor: junta os itens à encomenda pendente mais recente
+       do fornecedor (somando à linha do produto, se existir) ou cria uma
+       nova encomenda quando não há nenhuma pendente.
+     - Um applock impede que duas execuções simultâneas encomendem a dobrar.
+   Retorna: uma linha por encomenda criada ou atualizada.
+*/
+CREATE OR ALTER PROCEDURE sp_gerar_encomendas_reposicao
+AS
+BEGIN
+    SET NOCOUNT ON;
+    SET XACT_ABORT ON;
+
+    DECLARE @necessidades TABLE (
+        produto_id      INT           NOT NULL PRIMARY KEY,
+        fornecedor_id   INT           NOT NULL,
+        quantidade      INT           NOT NULL,
+        custo_unitario  DECIMAL(10,2) NOT NULL
+    );
+    DECLARE @destino TABLE (
+        fornecedor_id   INT NOT NULL PRIMARY KEY,
+        encomenda_id    INT NOT NULL
+    );
+
+    BEGIN TRANSACTION;
+
+    EXEC sp_getapplock
+        @Resource  = 'sp_gerar_encomendas_reposicao',
+        @LockMode  = 'Exclusive',
+        @LockOwner = 'Transaction';
+
+    -- 1. Produtos abaixo do mínimo e quantidade ainda por encomendar
+    INSERT INTO @necessidades (produto_id, fornecedor_id, quantidade, custo_unitario)
+    SELECT
+        p.produto_id,
+        p.fornecedor_id,
+        p.stock_encomenda - p.stock_atual - ISNULL(pend.quantidade, 0),
+        p.custo_unitario
+    FROM Produto p
+    LEFT JOIN (
+        SELECT ei.produto_id, SUM(ei.quantidade) AS quantidade
+        FROM EncomendaItem ei
+        JOIN Encomenda e
+            ON e.encomenda_id = ei.encomenda_id
+        WHERE e.status = 'pendente'
+        GROUP BY ei.produto_id
+    ) pend
+        ON pend.produto_id = p.produto_id
+    WHERE p.stock_atual < p.stock_minimo
+      AND p.stock_encomenda - p.stock_atual - ISNULL(pend.quantidade, 0) > 0;
+
+    -- 2. Uma encomenda pendente por fornecedor (nova só se não existir)
+    INSERT INTO Encomenda (fornecedor_id, data_encomenda, status, valor_total)
+    SELECT DISTINCT n.fornecedor_id, GETDATE(), 'pendente', 0.00
+    FROM @necessidades n
+    WHERE NOT EXISTS (
+        SELECT 1 FROM Encomenda e
+        WHERE e.fornecedor_id = n.fornecedor_id AND e.status = 'pendente'
+    );
+
+    INSERT INTO @destino (fornecedor_id, encomenda_id)
+    SELECT e.fornecedor_id, MAX(e.encomenda_id)
+    FROM Encomenda e
+    WHERE e.status = 'pendente'
+      AND e.fornecedor_id IN (SELECT fornecedor_id FROM @necessidades)
+    GROUP BY e.fornecedor_id;
+
+    -- 3. Somar às linhas existentes e inserir as que faltam
+    UPDATE ei
+    SET quantidade = ei.quantidade + n.quantidade
+    FROM EncomendaItem ei
+    JOIN @destino d
+        ON d.encomenda_id = ei.encomenda_id
+    JOIN @necessidades n
+        ON n.fornecedor_id = d.fornecedor_id
+       AND n.produto_id = ei.produto_id;
+
+    INSERT INTO EncomendaItem (encomenda_id, produto_id, quantidade, preco_unitario)
+    SELECT d.encomenda_id, n.produto_id, n.quantidade, n.custo_unitario
+    FROM @necessidades n
+    JOIN @destino d
+        ON d.fornecedor_id = n.fornecedor_id
+    WHERE NOT EXISTS (
+        SELECT 1 FROM EncomendaItem ei
+        WHERE ei.encomenda_id = d.encomenda_id AND ei.produto_id = n.produto_id
+    );
+
+    -- 4. Recalcular o valor das encomendas tocadas
+    UPDATE e
+    SET valor_total = ISNULL((
+        SELECT SUM(ei.quantidade * ei.preco_unitario)
+        FROM EncomendaItem ei
+        WHERE ei.encomenda_id = e.encomenda_id
+    ), 0.00)
+    FROM Encomenda e
+    JOIN @destino d
+        ON d.encomenda_id = e.encomenda_id;
+
+    COMMIT TRANSACTION;
+
+    SELECT d.encomenda_id, d.fornecedor_id, COUNT(*) AS itens, SUM(n.quantidade) AS quantidade
+    FROM @destino d
+    JOIN @necessidades n
+        ON n.fornecedor_id = d.fornecedor_id
+    GROUP BY d.encomenda_id, d.fornecedor_id
+    ORDER BY d.encomenda_id;
+END;
+GO
+
+/* ------------------------------------------------
+   6.8. Procedimento Auxiliar: sp_aplicar_variacao_resumo_faturacao
+   ------------------------------------------------
+   Recebe variações (positivas ou negativas) por dia de emissão, categoria e
+   taxa de IVA (tipo tabela ResumoFaturacaoVariacao), soma-as a
+   ResumoFaturacaoDiaria e apaga as entradas que ficam sem linhas.
+*/
+IF TYPE_ID(N'dbo.ResumoFaturacaoVariacao') IS NULL
+    CREATE TYPE dbo.ResumoFaturacaoVariacao AS TABLE (
+        data            DATE          NOT NULL,
+        categoria_id    INT           NULL,
+        percentual_iva  DECIMAL(5,2)  NOT NULL,
+        linhas          INT           NOT NULL,
+        quantidade      INT           NOT NULL,
+        valor_liquido   DECIMAL(14,2) NOT NULL,
+        valor_iva       DECIMAL(14,2) NOT NULL,
+        valor_total     DECIMAL(14,2) NOT NULL
+    );
+GO
+
+CREATE OR ALTER PROCEDURE sp_aplicar_variacao_resumo_faturacao
+    @variacao dbo.ResumoFaturacaoVariacao READONLY
+AS
+BEGIN
+    SET NOCOUNT ON;
+
+    -- HOLDLOCK evita que duas faturas do mesmo dia criem a mesma entrada
+    MERGE ResumoFaturacaoDiaria WITH (HOLDLOCK) AS r
+    USING (
+        SELECT data, categoria_id, percentual_iva,
+               SUM(linhas) AS linhas, SUM(quantidade) AS quantidade,
+               SUM(valor_liquido) AS valor_liquido, SUM(valor_iva) AS valor_iva,
+               SUM(valor_total) AS valor_total
+        FROM @variacao
+        GROUP BY data, categoria_id, percentual_iva
+    ) AS v
+        ON r.data = v.data
+       AND r.percentual_iva = v.percentual_iva
+       AND (r.categoria_id = v.categoria_id
+            OR (r.categoria_id IS NULL AND v.categoria_id IS NULL))
+    WHEN MATCHED THEN
+        UPDATE SET
+            linhas        = r.linhas        + v.linhas,
+            quantidade    = r.quantidade    + v.quantidade,
+            valor_liquido = r.valor_liquido + v.valor_liquido,
+            valor_iva     = r.valor_iva     + v.valor_iva,
+            valor_total   = r.valor_total   + v.valor_total
+    WHEN NOT MATCHED AND v.linhas > 0 THEN
+        INSERT (data, categoria_id, percentual_iva, linhas, quantidade,
+                valor_liquido, valor_iva, valor_total)
+        VALUES (v.data, v.categoria_id, v.percentual_iva, v.linhas, v.quantidade,
+                v.valor_liquido, v.valor_iva, v.valor_total);
+
+    DELETE r
+    FROM ResumoFaturacaoDiaria r
+    JOIN @variacao v
+        ON r.data = v.data
+       AND r.percentual_iva = v.percentual_iva
+       AND (r.categoria_id = v.categoria_id
+            OR (r.categoria_id IS NULL AND v.categoria_id IS NULL))
+    WHERE r.linhas <= 0;
+END;
+GO
+
+/* ------------------------------------------------
+   6.9. Trigger: trg_resumo_faturacao_diaria
+   ------------------------------------------------
+   Mantém ResumoFaturacaoDiaria a partir das linhas de fatura inseridas,
+   alteradas ou removidas: subtrai as linhas antigas (deleted) e soma as
+   novas (inserted), por dia de emissão, categoria e taxa de IVA.
+*/
+CREATE OR ALTER TRIGGER trg_resumo_faturacao_diaria
+ON FaturaItem
+AFTER INSERT, UPDATE, DELETE
+AS
+BEGIN
+    SET NOCOUNT ON;
+
+    DECLARE @variacao dbo.ResumoFaturacaoVariacao;
+
+    INSERT INTO @variacao (
+        data, categoria_id, percentual_iva, linhas, quantidade,
+        valor_liquido, valor_iva, valor_total
+    )
+    SELECT
+        CAST(fa.data_emissao AS DATE),
+        l.categoria_id,
+        l.percentual_iva,
+        SUM(l.sinal),
+        SUM(l.sinal * l.quantidade),
+        SUM(l.sinal * l.valor_liquido),
+        SUM(l.sinal * l.valor_iva),
+        SUM(l.sinal * l.valor_total_linha)
+    FROM (
+        SELECT 1 AS sinal, fatura_id, categoria_id, percentual_iva,
+               quantidade, valor_liquido, valor_iva, valor_total_linha
+        FROM inserted
+        UNION ALL
+        SELECT -1, fatura_id, categoria_id, percentual_iva,
+               quantidade, valor_liquido, valor_iva, valor_total_linha
+        FROM deleted
+    ) l
+    JOIN Fatura fa
+        ON fa.fatura_id = l.fatura_id
+    GROUP BY CAST(fa.data_emissao AS DATE), l.categoria_id, l.percentual_iva;
+
+    IF @@ROWCOUNT = 0
+        RETURN;
+
+    EXEC sp_aplicar_variacao_resumo_faturacao @variacao;
+END;
+GO
+
+/* ------------------------------------------------
+   6.10. Trigger: trg_resumo_faturacao_data_emissao
+   ------------------------------------------------
+   Quando a data de emissão de uma fatura muda de dia, as suas linhas passam
+   no resumo do dia antigo para o novo.
+*/
+CREATE OR ALTER TRIGGER trg_resumo_faturacao_data_emissao
+ON Fatura
+AFTER UPDATE
+AS
+BEGIN
+    SET NOCOUNT ON;
+
+    IF NOT UPDATE(data_emissao)
+        RETURN;
+
+    DECLARE @variacao dbo.ResumoFaturacaoVariacao;
+
+    INSERT INTO @variacao (
+        data, categoria_id, percentual_iva, linhas, quantidade,
+        valor_liquido, valor_iva, valor_total
+    )
+    SELECT
+        d.data,
+        fi.categoria_id,
+        fi.percentual_iva,
+        SUM(d.sinal),
+        SUM(d.sinal * fi.quantidade),
+        SUM(d.sinal * fi.valor_liquido),
+        SUM(d.sinal * fi.valor_iva),
+        SUM(d.sinal * fi.valor_total_linha)
+    FROM inserted i
+    JOIN deleted o
+        ON o.fatura_id = i.fatura_id
+    CROSS APPLY (VALUES
+        (-1, CAST(o.data_emissao AS DATE)),
+        (1,  CAST(i.data_emissao AS DATE))
+    ) d (sinal, data)
+    JOIN FaturaItem fi
+        ON fi.fatura_id = i.fatura_id
+    WHERE CAST(o.data_emissao AS DATE) <> CAST(i.data_emissao AS DATE)
+    GROUP BY d.data, fi.categoria_id, fi.percentual_iva;
+
+    IF @@ROWCOUNT = 0
+        RETURN;
+
+    EXEC sp_aplicar_variacao_resumo_faturacao @variacao;
+END;
+GO
+
+/* ------------------------------------------------
+   6.11. Procedimento: sp_reconstruir_resumo_faturacao
+   ------------------------------------------------
+   Recalcula ResumoFaturacaoDiaria a partir de FaturaItem. Usado para
+   preencher o resumo numa base já existente ou corrigi-lo após alterações
+   feitas com o trigger desativado. Não altera as faturas nem as suas linhas.
+*/
+CREATE OR ALTER PROCEDURE sp_reconstruir_resumo_faturacao
+AS
+BEGIN
+    SET NOCOUNT ON;
+    SET XACT_ABORT ON;
+
+    DECLARE @linhas_resumo INT;
+
+    BEGIN TRANSACTION;
+
+    DELETE FROM ResumoFaturacaoDiaria WITH (TABLOCKX);
 
+    INSERT INTO ResumoFaturacaoDiaria (
+        data, categoria_id, percentual_iva, linhas, quantidade,
+        valor_liquido, valor_iva, valor_total
+    )
     SELECT
-        @pedido_id     = i.pedido_id,
-        @status_novo   = i.status
-    FROM inserted i;
-
-    SELECT @status_antigo = d.status
-    FROM deleted d
-    WHERE d.pedido_id = @pedido_id;
-
-    IF @status_antigo <> 'finalizado' AND @status_novo = 'finalizado'
-    BEGIN
-        SELECT @cliente_id = p.cliente_id
-        FROM Pedido p
-        WHERE p.pedido_id = @pedido_id;
-
-        IF @cliente_id IS NULL
-            SET @tipo_fatura = 'consumidor_final';
-        ELSE
-            SET @tipo_fatura = 'empresa';
-
-        DECLARE @subtotal_comida DECIMAL(12,2) = 0.00,
-                @subtotal_bebida DECIMAL(12,2) = 0.00,
-                @iva_comida      DECIMAL(10,2) = 0.00,
-                @iva_bebida      DECIMAL(10,2) = 0.00,
-                @total_linha     DECIMAL(12,2);
-
-        DECLARE itens_cursor CURSOR FOR
-            SELECT
-                pi.quantidade,
-                pi.preco_unitario,
-                pi.iva,
-                CASE
-                    WHEN pr.categoria_id IN (
-                        SELECT categoria_id FROM Categoria WHERE nome IN ('Bebidas','Café','Sobremesa')
-                    )
-                    THEN 'bebida'
-                    ELSE 'comida'
-                END AS tipo_item
-            FROM PedidoItem pi
-            LEFT JOIN Prato pr
-                ON pi.prato_id = pr.prato_id
-            WHERE pi.pedido_id = @pedido_id;
-
-        OPEN itens_cursor;
-        DECLARE @qtd       INT,
-                @preco     DECIMAL(10,2),
-                @perc_iva  DECIMAL(5,2),
-                @tipo_item VARCHAR(10);
-
-        FETCH NEXT FROM itens_cursor
-        INTO @qtd, @preco, @perc_iva, @tipo_item;
-
-        WHILE @@FETCH_STATUS = 0
-        BEGIN
-            SET @total_linha = @qtd * @preco;
-            IF @tipo_item = 'comida'
-            BEGIN
-                SET @subtotal_comida += @total_linha;
-                SET @iva_comida += (@total_linha * (@perc_iva / 100.0));
-            END
-            ELSE
-            BEGIN
-                SET @subtotal_bebida += @total_linha;
-                SET @iva_bebida += (@total_linha * (@perc_iva / 100.0));
-            END
-            FETCH NEXT FROM itens_cursor
-            INTO @qtd, @preco, @perc_iva, @tipo_item;
-        END
-
-        CLOSE itens_cursor;
-        DEALLOCATE itens_cursor;
-
-        DECLARE @total_geral DECIMAL(14,2) = @subtotal_comida + @subtotal_bebida + @iva_comida + @iva_bebida;
-
-        -- Inserir fatura
-        IF @cliente_id IS NOT NULL
-        BEGIN
-            INSERT INTO Fatura (
-                pedido_id,
-                cliente_id,
-                data_emissao,
-                tipo_fatura,
-                nome_cliente,
-                morada_cliente,
-                cidade_cliente,
-                codigo_postal,
-                contribuinte,
-                subtotal_comida,
-                subtotal_bebida,
-                iva_comida,
-                iva_bebida,
-                total
-            )
-            SELECT
-                @pedido_id,
-                c.cliente_id,
-                GETDATE(),
-                'empresa',
-                c.nome,
-                c.morada,
-                c.cidade,
-                c.codigo_postal,
-                c.contribuinte,
-                @subtotal_comida,
-                @subtotal_bebida,
-                @iva_comida,
-                @iva_bebida,
-                @total_geral
-            FROM Cliente c
-            WHERE c.cliente_id = @cliente_id;
-        END
-        ELSE
-        BEGIN
-            INSERT INTO Fatura (
-                pedido_id,
-                data_emissao,
-                tipo_fatura,
-                subtotal_comida,
-                subtotal_bebida,
-                iva_comida,
-                iva_bebida,
-                total
-            ) VALUES (
-                @pedido_id,
-                GETDATE(),
-                'consumidor_final',
-                @subtotal_comida,
-                @subtotal_bebida,
-                @iva_comida,
-                @iva_bebida,
-                @total_geral
-            );
-        END
-    END
+        CAST(fa.data_emissao AS DATE),
+        fi.categoria_id,
+        fi.percentual_iva,
+        COUNT(*),
+        SUM(fi.quantidade),
+        SUM(fi.valor_liquido),
+        SUM(fi.valor_iva),
+        SUM(fi.valor_total_linha)
+    FROM FaturaItem fi
+    JOIN Fatura fa
+        ON fa.fatura_id = fi.fatura_id
+    GROUP BY CAST(fa.data_emissao AS DATE), fi.categoria_id, fi.percentual_iva;
+
+    SET @linhas_resumo = @@ROWCOUNT;
+
+    COMMIT TRANSACTION;
+
+    SELECT @linhas_resumo AS linhas_resumo;
 END;
 GO
@@ -3,75 +3,195 @@ GO
 -- =========================================================================
 -- Script: 07_create_indices.sql
 -- Objetivo: Criação de índices adicionais para otimização de consultas
+-- Cada índice é criado só se faltar, e reconstruído (DROP_EXISTING) só se a
+-- chave ou as colunas incluídas mudaram, para que o script possa ser
+-- reaplicado (service.py migrate) sem reconstruir os índices que não mudaram.
 -- =========================================================================
 
+/* ------------------------------------------------
+   Procedimento temporário: #garantir_indice
+   ------------------------------------------------
+   Cria dbo.<@tabela>(<@chave>) INCLUDE (<@incluidas>) com o nome @indice.
+   Se o índice já existe com a mesma chave (pela ordem) e as mesmas colunas
+   incluídas (por qualquer ordem), não faz nada. Existe só durante a
+   execução deste script.
+*/
+DROP PROCEDURE IF EXISTS #garantir_indice;
+GO
+
+CREATE PROCEDURE #garantir_indice
+    @tabela    SYSNAME,
+    @indice    SYSNAME,
+    @chave     NVARCHAR(1000),
+    @incluidas NVARCHAR(1000) = NULL
+AS
+BEGIN
+    SET NOCOUNT ON;
+
+    DECLARE @object_id INT = OBJECT_ID(N'dbo.' + QUOTENAME(@tabela));
+    DECLARE @index_id INT = (
+        SELECT index_id FROM sys.indexes WHERE object_id = @object_id AND name = @indice
+    );
+    DECLARE @sql NVARCHAR(MAX) =
+        N'CREATE NONCLUSTERED INDEX ' + QUOTENAME(@indice)
+        + N' ON dbo.' + QUOTENAME(@tabela) + N' (' + @chave + N')'
+        + ISNULL(N' INCLUDE (' + @incluidas + N')', N'');
+
+    IF @index_id IS NOT NULL
+    BEGIN
+        DECLARE @chave_atual NVARCHAR(1000) = STUFF((
+            SELECT N',' + c.name
+            FROM sys.index_columns ic
+            JOIN sys.columns c
+                ON c.object_id = ic.object_id
+               AND c.column_id = ic.column_id
+            WHERE ic.object_id = @object_id
+              AND ic.index_id = @index_id
+              AND ic.is_included_column = 0
+            ORDER BY ic.key_ordinal
+            FOR XML PATH('')
+        ), 1, 1, N'');
+        DECLARE @incluidas_atuais NVARCHAR(1000) = STUFF((
+            SELECT N',' + c.name
+            FROM sys.index_columns ic
+            JOIN sys.columns c
+                ON c.object_id = ic.object_id
+               AND c.column_id = ic.column_id
+            WHERE ic.object_id = @object_id
+              AND ic.index_id = @index_id
+              AND ic.is_included_column = 1
+            ORDER BY c.name
+            FOR XML PATH('')
+        ), 1, 1, N'');
+        DECLARE @incluidas_pedidas NVARCHAR(1000) = STUFF((
+            SELECT N',' + LTRIM(RTRIM(value))
+            FROM STRING_SPLIT(@incluidas, N',')
+            ORDER BY LTRIM(RTRIM(value))
+            FOR XML PATH('')
+        ), 1, 1, N'');
+
+        IF @chave_atual = REPLACE(@chave, N' ', N'')
+           AND ISNULL(@incluidas_atuais, N'') = ISNULL(@incluidas_pedidas, N'')
+            RETURN;
+
+        SET @sql = @sql + N' WITH (DROP_EXISTING = ON)';
+    END;
+
+    EXEC sp_executesql @sql;
+END;
+GO
+
 /* ------------------------------------------------
    1. Índice em Produto(stock_atual) para alertas
    ------------------------------------------------ */
-CREATE NONCLUSTERED INDEX idx_produto_stock_atual
-    ON Produto (stock_atual);
+EXEC #garantir_indice N'Produto', N'idx_produto_stock_atual', N'stock_atual';
 GO
 
 /* ------------------------------------------------
    2. Índice em MovimentacaoEstoque(data_movimentacao)
+      Cobre fn_valores_gastos_stock_mes_ano (sem key lookups)
    ------------------------------------------------ */
-CREATE NONCLUSTERED INDEX idx_movimentacao_data
-    ON MovimentacaoEstoque (data_movimentacao);
+EXEC #garantir_indice N'MovimentacaoEstoque', N'idx_movimentacao_data', N'data_movimentacao',
+    N'produto_id, tipo, quantidade, preco_unitario';
 GO
 
 /* ------------------------------------------------
    3. Índice em Pedido(status) para filtrar estado
    ------------------------------------------------ */
-CREATE NONCLUSTERED INDEX idx_pedido_status
-    ON Pedido (status);
+EXEC #garantir_indice N'Pedido', N'idx_pedido_status', N'status';
 GO
 
 /* ------------------------------------------------
    4. Índice em Fatura(data_emissao) para relatórios
+      Conta as faturas por dia em fn_faturado_por_dia
    ------------------------------------------------ */
-CREATE NONCLUSTERED INDEX idx_fatura_data
-    ON Fatura (data_emissao);
+EXEC #garantir_indice N'Fatura', N'idx_fatura_data', N'data_emissao', N'total';
 GO
 
 /* ------------------------------------------------
    5. Índice em RegistroHoras(data_registro) para relatórios
+      Cobre fn_vencimentos_funcionario_mes_ano e fn_horas_trabalhadas_periodo
    ------------------------------------------------ */
-CREATE NONCLUSTERED INDEX idx_reghoras_data
-    ON RegistroHoras (data_registro);
+EXEC #garantir_indice N'RegistroHoras', N'idx_reghoras_data', N'data_registro',
+    N'funcionario_id, horas_normais, horas_extra';
 GO
 
 /* ------------------------------------------------
    6. Índice em Mesa(status) para busca de mesas
    ------------------------------------------------ */
-CREATE NONCLUSTERED INDEX idx_mesa_status
-    ON Mesa (status);
+EXEC #garantir_indice N'Mesa', N'idx_mesa_status', N'status';
 GO
 
 /* ------------------------------------------------
    7. Índice em Fornecedor(nome) para buscas rápidas
    ------------------------------------------------ */
-CREATE NONCLUSTERED INDEX idx_fornecedor_nome
-    ON Fornecedor (nome);
+EXEC #garantir_indice N'Fornecedor', N'idx_fornecedor_nome', N'nome';
 GO
 
 /* ------------------------------------------------
    8. Índice em Prato(categoria_id) para agrupar por categoria
    ------------------------------------------------ */
-CREATE NONCLUSTERED INDEX idx_prato_categoria
-    ON Prato (categoria_id);
+EXEC #garantir_indice N'Prato', N'idx_prato_categoria', N'categoria_id';
 GO
 
 /* ------------------------------------------------
    9. Índice em PedidoItem(prato_id) para relatórios de venda
    ------------------------------------------------ */
-CREATE NONCLUSTERED INDEX idx_pedidoitem_prato
-    ON PedidoItem (prato_id);
+EXEC #garantir_indice N'PedidoItem', N'idx_pedidoitem_prato', N'prato_id';
 GO
 
 /* ------------------------------------------------
    10. Índice em PedidoItem(produto_id) para relatórios de venda
    ------------------------------------------------ */
-CREATE NONCLUSTERED INDEX idx_pedidoitem_produto
-    ON PedidoItem (produto_id);
+EXEC #garantir_indice N'PedidoItem', N'idx_pedidoitem_produto', N'produto_id';
+GO
+
+/* ------------------------------------------------
+   11. Índice em MovimentacaoEstoque(produto_id, tipo, data_movimentacao)
+       Primeira e última saída por produto em view_estoque_utilizado_detalhado;
+       com quantidade incluída cobre também as somas por produto e tipo
+       (sp_atualizar_stock_produto, service.py reconcile)
+   ------------------------------------------------ */
+EXEC #garantir_indice N'MovimentacaoEstoque', N'idx_movimentacao_produto_tipo_data', N'produto_id, tipo, data_movimentacao',
+    N'quantidade';
+GO
+
+/* ------------------------------------------------
+   12. Índice em PedidoItem(pedido_id) para os itens de um pedido
+       Abatimento de estoque, fatura ao finalizar, cancelamento e exclusão
+       do pedido leem todas estas colunas (sem key lookups)
+   ------------------------------------------------ */
+EXEC #garantir_indice N'PedidoItem', N'idx_pedidoitem_pedido', N'pedido_id',
+    N'prato_id, produto_id, quantidade, preco_unitario, iva';
+GO
+
+/* ------------------------------------------------
+   13. Índice em Pedido(funcionario_id, status)
+       Cobre sp_obter_pedidos_por_funcionario e a verificação de pedidos
+       abertos em sp_excluir_funcionario
+   ------------------------------------------------ */
+EXEC #garantir_indice N'Pedido', N'idx_pedido_funcionario_status', N'funcionario_id, status',
+    N'mesa_id, data_pedido';
+GO
+
+/* ------------------------------------------------
+   14. Índice em EncomendaItem(encomenda_id) para os itens de uma encomenda
+       Receção da encomenda e reposição (sp_gerar_encomendas_reposicao)
+   ------------------------------------------------ */
+EXEC #garantir_indice N'EncomendaItem', N'idx_encomendaitem_encomenda', N'encomenda_id',
+    N'produto_id, quantidade, preco_unitario';
+GO
+
+/* ------------------------------------------------
+   15. Índice em RegistroHoras(funcionario_id, data_registro)
+       Horas de um funcionário num período (sp_obter_horas_trabalhadas)
+   ------------------------------------------------ */
+EXEC #garantir_indice N'RegistroHoras', N'idx_reghoras_funcionario_data', N'funcionario_id, data_registro',
+    N'horas_normais, horas_extra';
 GO
 
+-- PratoIngrediente(prato_id) não precisa de índice próprio: é a primeira
+-- coluna da chave primária (clusterizada) PK_PratoIngrediente.
+
+DROP PROCEDURE #garantir_indice;
+GO
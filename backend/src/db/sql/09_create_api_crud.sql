@@ -30,7 +30,7 @@ GO
      @nome, @telefone, @email, @morada, @cidade,
      @codigo_postal, @contribuinte (NULL se não houver).
 */
-CREATE PROCEDURE sp_cadastrar_cliente
+CREATE OR ALTER PROCEDURE sp_cadastrar_cliente
     @nome           VARCHAR(150),
     @telefone       VARCHAR(20)    = NULL,
     @email          VARCHAR(100)   = NULL,
@@ -67,7 +67,7 @@ GO
      @cliente_id, @nome, @telefone, @email, @morada, @cidade,
      @codigo_postal, @contribuinte.
 */
-CREATE PROCEDURE sp_atualizar_cliente
+CREATE OR ALTER PROCEDURE sp_atualizar_cliente
     @cliente_id     INT,
     @nome           VARCHAR(150),
     @telefone       VARCHAR(20)    = NULL,
@@ -112,7 +112,7 @@ GO
      @numero INT, @capacidade INT.
    Retorno: novo mesa_id.
 */
-CREATE PROCEDURE sp_cadastrar_mesa
+CREATE OR ALTER PROCEDURE sp_cadastrar_mesa
     @numero      INT,
     @capacidade  INT
 AS
@@ -146,7 +146,7 @@ GO
    Parâmetros:
      @mesa_id INT, @numero INT, @capacidade INT, @status VARCHAR(20).
 */
-CREATE PROCEDURE sp_atualizar_mesa
+CREATE OR ALTER PROCEDURE sp_atualizar_mesa
     @mesa_id     INT,
     @numero      INT        = NULL,
     @capacidade  INT        = NULL,
@@ -184,7 +184,7 @@ GO
      @nome, @data_nascimento, @telefone, @email,
      @cargo, @carreira_id, @data_admissao.
 */
-CREATE PROCEDURE sp_cadastrar_funcionario
+CREATE OR ALTER PROCEDURE sp_cadastrar_funcionario
     @nome             VARCHAR(150),
     @data_nascimento  DATE             = NULL,
     @telefone         VARCHAR(20)      = NULL,
@@ -228,7 +228,7 @@ GO
      @funcionario_id, @nome, @data_nascimento, @telefone, @email,
      @cargo, @carreira_id.
 */
-CREATE PROCEDURE sp_atualizar_funcionario
+CREATE OR ALTER PROCEDURE sp_atualizar_funcionario
     @funcionario_id   INT,
     @nome             VARCHAR(150)     = NULL,
     @data_nascimento  DATE             = NULL,
@@ -277,7 +277,7 @@ GO
    Parâmetros:
      @nome VARCHAR(100), @salario_mensal DECIMAL(12,2).
 */
-CREATE PROCEDURE sp_cadastrar_carreira
+CREATE OR ALTER PROCEDURE sp_cadastrar_carreira
     @nome             VARCHAR(100),
     @salario_mensal   DECIMAL(12,2)
 AS
@@ -305,7 +305,7 @@ GO
    Parâmetros:
      @carreira_id INT, @nome VARCHAR(100), @salario_mensal DECIMAL(12,2).
 */
-CREATE PROCEDURE sp_atualizar_carreira
+CREATE OR ALTER PROCEDURE sp_atualizar_carreira
     @carreira_id      INT,
     @nome             VARCHAR(100)      = NULL,
     @salario_mensal   DECIMAL(12,2)     = NULL
@@ -340,7 +340,7 @@ GO
    Parâmetros:
      @nome, @telefone, @email, @endereco, @cidade, @codigo_postal, @pais.
 */
-CREATE PROCEDURE sp_cadastrar_fornecedor
+CREATE OR ALTER PROCEDURE sp_cadastrar_fornecedor
     @nome           VARCHAR(150),
     @telefone       VARCHAR(20)   = NULL,
     @email          VARCHAR(100)  = NULL,
@@ -376,7 +376,7 @@ GO
    Parâmetros:
      @fornecedor_id, @nome, @telefone, @email, @endereco, @cidade, @codigo_postal, @pais.
 */
-CREATE PROCEDURE sp_atualizar_fornecedor
+CREATE OR ALTER PROCEDURE sp_atualizar_fornecedor
     @fornecedor_id  INT,
     @nome           VARCHAR(150)  = NULL,
     @telefone       VARCHAR(20)   = NULL,
@@ -417,8 +417,10 @@ GO
    Parâmetros:
      @nome, @tipo, @custo_unitario, @preco_venda,
      @stock_atual, @stock_minimo, @stock_encomenda, @fornecedor_id.
+   NOTA: o stock inicial entra como movimentação de entrada, para que
+         stock_atual seja sempre a soma das movimentações do produto.
 */
-CREATE PROCEDURE sp_cadastrar_produto
+CREATE OR ALTER PROCEDURE sp_cadastrar_produto
     @nome             VARCHAR(150),
     @tipo             VARCHAR(50),
     @custo_unitario   DECIMAL(10,2),
@@ -451,10 +453,16 @@ BEGIN
         stock_atual, stock_minimo, stock_encomenda, fornecedor_id
     ) VALUES (
         @nome, @tipo, @custo_unitario, @preco_venda,
-        @stock_atual, @stock_minimo, @stock_encomenda, @fornecedor_id
+        0, @stock_minimo, @stock_encomenda, @fornecedor_id
     );
 
     DECLARE @novo_produto_id INT = SCOPE_IDENTITY();
+
+    -- O trigger de MovimentacaoEstoque leva stock_atual até @stock_atual
+    IF @stock_atual <> 0
+        INSERT INTO MovimentacaoEstoque (produto_id, data_movimentacao, tipo, quantidade, preco_unitario)
+        VALUES (@novo_produto_id, GETDATE(), 'entrada', @stock_atual, @custo_unitario);
+
     SELECT @novo_produto_id AS produto_id;
 END;
 GO
@@ -468,7 +476,7 @@ GO
      @stock_minimo, @stock_encomenda, @fornecedor_id.
    NOTA: stock_atual é recalculado via trigger; não atualizado manualmente aqui.
 */
-CREATE PROCEDURE sp_atualizar_produto
+CREATE OR ALTER PROCEDURE sp_atualizar_produto
     @produto_id        INT,
     @nome              VARCHAR(150)    = NULL,
     @tipo              VARCHAR(50)     = NULL,
@@ -519,7 +527,7 @@ GO
    Parâmetros:
      @nome, @categoria_id, @descricao, @tempo_preparo, @preco_base.
 */
-CREATE PROCEDURE sp_cadastrar_prato
+CREATE OR ALTER PROCEDURE sp_cadastrar_prato
     @nome            VARCHAR(150),
     @categoria_id    INT,
     @descricao        VARCHAR(255)   = NULL,
@@ -559,7 +567,7 @@ GO
    Parâmetros:
      @prato_id, @nome, @categoria_id, @descricao, @tempo_preparo, @preco_base.
 */
-CREATE PROCEDURE sp_atualizar_prato
+CREATE OR ALTER PROCEDURE sp_atualizar_prato
     @prato_id        INT,
     @nome            VARCHAR(150)   = NULL,
     @categoria_id    INT            = NULL,
@@ -603,7 +611,7 @@ GO
      @prato_id, @produto_id, @quantidade_necessaria.
    Retorna erro se já existir combinação.
 */
-CREATE PROCEDURE sp_cadastrar_prato_ingrediente
+CREATE OR ALTER PROCEDURE sp_cadastrar_prato_ingrediente
     @prato_id               INT,
     @produto_id             INT,
     @quantidade_necessaria  DECIMAL(10,3)
@@ -655,7 +663,7 @@ GO
    Parâmetros:
      @prato_id, @produto_id.
 */
-CREATE PROCEDURE sp_remover_prato_ingrediente
+CREATE OR ALTER PROCEDURE sp_remover_prato_ingrediente
     @prato_id    INT,
     @produto_id  INT
 AS
@@ -689,7 +697,7 @@ GO
    Parâmetros:
      @nome, @descricao, @data_inicio, @data_fim, @preco_total.
 */
-CREATE PROCEDURE sp_cadastrar_menu_especial
+CREATE OR ALTER PROCEDURE sp_cadastrar_menu_especial
     @nome         VARCHAR(150),
     @descricao    VARCHAR(255)   = NULL,
     @data_inicio  DATE,
@@ -729,7 +737,7 @@ GO
    Parâmetros:
      @menu_especial_id, @nome, @descricao, @data_inicio, @data_fim, @preco_total.
 */
-CREATE PROCEDURE sp_atualizar_menu_especial
+CREATE OR ALTER PROCEDURE sp_atualizar_menu_especial
     @menu_especial_id INT,
     @nome             VARCHAR(150)   = NULL,
     @descricao        VARCHAR(255)   = NULL,
@@ -772,7 +780,7 @@ GO
    Parâmetros:
      @menu_especial_id, @prato_id, @ordem.
 */
-CREATE PROCEDURE sp_cadastrar_menu_especial_prato
+CREATE OR ALTER PROCEDURE sp_cadastrar_menu_especial_prato
     @menu_especial_id  INT,
     @prato_id          INT,
     @ordem             INT
@@ -824,7 +832,7 @@ GO
    Parâmetros:
      @menu_especial_id, @prato_id.
 */
-CREATE PROCEDURE sp_remover_menu_especial_prato
+CREATE OR ALTER PROCEDURE sp_remover_menu_especial_prato
     @menu_especial_id  INT,
     @prato_id          INT
 AS
@@ -858,7 +866,7 @@ GO
    Parâmetros:
      @cliente_id, @mesa_id, @data_reserva, @hora_reserva, @quantidade_pessoas.
 */
-CREATE PROCEDURE sp_cadastrar_reserva
+CREATE OR ALTER PROCEDURE sp_cadastrar_reserva
     @cliente_id         INT,
     @mesa_id            INT,
     @data_reserva       DATE,
@@ -905,7 +913,7 @@ GO
    Parâmetros:
      @reserva_id, @mesa_id, @data_reserva, @hora_reserva, @quantidade_pessoas, @status.
 */
-CREATE PROCEDURE sp_atualizar_reserva
+CREATE OR ALTER PROCEDURE sp_atualizar_reserva
     @reserva_id         INT,
     @mesa_id            INT          = NULL,
     @data_reserva       DATE         = NULL,
@@ -953,7 +961,7 @@ GO
      @mesa_id, @funcionario_id, @cliente_id (NULL se consumidor final).
    Retorna o novo pedido_id.
 */
-CREATE PROCEDURE sp_cadastrar_pedido
+CREATE OR ALTER PROCEDURE sp_cadastrar_pedido
     @mesa_id           INT,
     @funcionario_id    INT,
     @cliente_id        INT           = NULL
@@ -1005,7 +1013,7 @@ GO
      @produto_id (NULL se for prato), @quantidade, @preco_unitario, @iva.
    Retorna: 0 em sucesso; trigger cuidará do abatimento de estoque.
 */
-CREATE PROCEDURE sp_adicionar_item_pedido
+CREATE OR ALTER PROCEDURE sp_adicionar_item_pedido
     @pedido_id         INT,
     @prato_id          INT           = NULL,
     @produto_id        INT           = NULL,
@@ -1069,7 +1077,7 @@ GO
      @pedido_id, @status VARCHAR(20) (ex: 'em_preparo', 'pronto', 'entregue', 'finalizado', 'cancelado').
    NOTA: se for 'finalizado', trigger gerará fatura automaticamente.
 */
-CREATE PROCEDURE sp_atualizar_status_pedido
+CREATE OR ALTER PROCEDURE sp_atualizar_status_pedido
     @pedido_id  INT,
     @status     VARCHAR(20)
 AS
@@ -1100,9 +1108,9 @@ GO
      - Atualiza status para 'cancelado'.
      - Percorre PedidoItem associados e insere MovimentacaoEstoque(tipo='entrada') 
        para reverter o abatimento (usando quantidade de Ingredientes × quantidade do item).
-     - Atualiza Produto.stock_atual via sp_atualizar_stock_produto para cada produto afetado.
+     - Produto.stock_atual é ajustado pelo trigger de MovimentacaoEstoque.
 */
-CREATE PROCEDURE sp_cancelar_pedido
+CREATE OR ALTER PROCEDURE sp_cancelar_pedido
     @pedido_id INT
 AS
 BEGIN
@@ -1175,7 +1183,6 @@ BEGIN
                     @ingred_id, GETDATE(), 'entrada', @qtd_ingred, @prod_custo, @pedido_id
                 );
 
-                EXEC sp_atualizar_stock_produto @ingred_id;
                 FETCH NEXT FROM cursor_ingr INTO @ingred_id, @qtd_ingred;
             END
 
@@ -1192,8 +1199,6 @@ BEGIN
             ) VALUES (
                 @produto_id, GETDATE(), 'entrada', @qtd_item, @custo_unit, @pedido_id
             );
-
-            EXEC sp_atualizar_stock_produto @produto_id;
         END
 
         FETCH NEXT FROM cursor_itens INTO @item_id, @prato_id, @produto_id, @qtd_item;
@@ -1206,6 +1211,93 @@ BEGIN
 END;
 GO
 
+/* ------------------------------------------------
+   9.5. sp_adicionar_itens_pedido
+   ------------------------------------------------
+   Adiciona vários itens ao mesmo pedido numa única chamada.
+   Parâmetros:
+     @pedido_id, @itens (tipo tabela ItemPedidoLista com prato_id, produto_id,
+     quantidade, preco_unitario, iva — uma linha por item).
+   Implementação:
+     - Valida todas as linhas de uma vez; uma linha inválida rejeita o lote inteiro.
+     - Insere tudo num único INSERT ... SELECT, por isso o trigger de abatimento
+       de estoque dispara uma só vez para o lote.
+   Retorna: 0 e o número de itens inseridos.
+*/
+IF TYPE_ID(N'dbo.ItemPedidoLista') IS NULL
+    CREATE TYPE dbo.ItemPedidoLista AS TABLE (
+        prato_id        INT           NULL,
+        produto_id      INT           NULL,
+        quantidade      INT           NOT NULL,
+        preco_unitario  DECIMAL(10,2) NOT NULL,
+        iva             DECIMAL(5,2)  NOT NULL
+    );
+GO
+
+CREATE OR ALTER PROCEDURE sp_adicionar_itens_pedido
+    @pedido_id  INT,
+    @itens      dbo.ItemPedidoLista READONLY
+AS
+BEGIN
+    SET NOCOUNT ON;
+
+    IF @pedido_id IS NULL
+    BEGIN
+        RAISERROR('Pedido é obrigatório.', 16, 1);
+        RETURN;
+    END
+
+    IF NOT EXISTS (SELECT 1 FROM @itens)
+    BEGIN
+        RAISERROR('A lista de itens está vazia.', 16, 1);
+        RETURN;
+    END
+
+    IF NOT EXISTS (SELECT 1 FROM Pedido WHERE pedido_id = @pedido_id AND status NOT IN ('finalizado','cancelado'))
+    BEGIN
+        RAISERROR('Pedido não existe ou já finalizado/cancelado.', 16, 1);
+        RETURN;
+    END
+
+    IF EXISTS (SELECT 1 FROM @itens WHERE prato_id IS NULL AND produto_id IS NULL)
+    BEGIN
+        RAISERROR('Deve especificar prato_id ou produto_id.', 16, 1);
+        RETURN;
+    END
+
+    IF EXISTS (
+        SELECT 1
+        FROM @itens i
+        WHERE i.prato_id IS NOT NULL
+          AND NOT EXISTS (SELECT 1 FROM Prato p WHERE p.prato_id = i.prato_id)
+    )
+    BEGIN
+        RAISERROR('Prato não encontrado.', 16, 1);
+        RETURN;
+    END
+
+    IF EXISTS (
+        SELECT 1
+        FROM @itens i
+        WHERE i.prato_id IS NULL
+          AND NOT EXISTS (SELECT 1 FROM Produto p WHERE p.produto_id = i.produto_id)
+    )
+    BEGIN
+        RAISERROR('Produto não encontrado.', 16, 1);
+        RETURN;
+    END
+
+    INSERT INTO PedidoItem (
+        pedido_id, prato_id, produto_id, quantidade, preco_unitario, iva
+    )
+    SELECT
+        @pedido_id, prato_id, produto_id, quantidade, preco_unitario, iva
+    FROM @itens;
+
+    SELECT 0 AS status, (SELECT COUNT(*) FROM @itens) AS itens_inseridos;
+END;
+GO
+
 /* =========================================================================
    10. CRUD Encomendas Manuais
    ========================================================================= */
@@ -1218,7 +1310,7 @@ GO
      @fornecedor_id INT.
    Retorna: novo encomenda_id.
 */
-CREATE PROCEDURE sp_cadastrar_encomenda
+CREATE OR ALTER PROCEDURE sp_cadastrar_encomenda
     @fornecedor_id INT
 AS
 BEGIN
@@ -1255,7 +1347,7 @@ GO
      @encomenda_id, @produto_id, @quantidade, @preco_unitario.
    Atualiza valor_total da encomenda.
 */
-CREATE PROCEDURE sp_adicionar_item_encomenda
+CREATE OR ALTER PROCEDURE sp_adicionar_item_encomenda
     @encomenda_id     INT,
     @produto_id       INT,
     @quantidade       INT,
@@ -1308,7 +1400,7 @@ GO
    Parâmetros:
      @encomenda_id INT.
 */
-CREATE PROCEDURE sp_cancelar_encomenda
+CREATE OR ALTER PROCEDURE sp_cancelar_encomenda
     @encomenda_id INT
 AS
 BEGIN
@@ -1345,7 +1437,7 @@ GO
    Parâmetros:
      @funcionario_id, @data_registro, @horas_normais, @horas_extra.
 */
-CREATE PROCEDURE sp_registrar_horas
+CREATE OR ALTER PROCEDURE sp_registrar_horas
     @funcionario_id   INT,
     @data_registro    DATE,
     @horas_normais    DECIMAL(4,2),
@@ -1383,7 +1475,7 @@ GO
    Parâmetros:
      @registro_horas_id, @data_registro, @horas_normais, @horas_extra.
 */
-CREATE PROCEDURE sp_atualizar_registro_horas
+CREATE OR ALTER PROCEDURE sp_atualizar_registro_horas
     @registro_horas_id INT,
     @data_registro     DATE            = NULL,
     @horas_normais     DECIMAL(4,2)    = NULL,
@@ -1420,9 +1512,14 @@ GO
    Parâmetros:
      @pedido_id, @cliente_id (NULL se consumidor final),
      @nome_cliente, @morada_cliente, @cidade_cliente, @codigo_postal,
-     @contribuinte, @subtotal_comida, @subtotal_bebida, @iva_comida, @iva_bebida, @total.
+     @contribuinte, @subtotal_comida, @subtotal_bebida, @iva_comida, @iva_bebida,
+     @total (opcional).
+   Cada grupo de IVA com valores gera uma linha em FaturaItem, para que a
+   fatura conte nos relatórios (ResumoFaturacaoDiaria). O total gravado é
+   sempre a soma dessas linhas; um @total indicado que não coincida é
+   rejeitado.
 */
-CREATE PROCEDURE sp_cadastrar_fatura_manual
+CREATE OR ALTER PROCEDURE sp_cadastrar_fatura_manual
     @pedido_id        INT,
     @cliente_id       INT            = NULL,
     @nome_cliente     VARCHAR(150)   = NULL,
@@ -1434,15 +1531,24 @@ CREATE PROCEDURE sp_cadastrar_fatura_manual
     @subtotal_bebida  DECIMAL(12,2),
     @iva_comida       DECIMAL(10,2),
     @iva_bebida       DECIMAL(10,2),
-    @total            DECIMAL(14,2)
+    @total            DECIMAL(14,2)  = NULL
 AS
 BEGIN
     SET NOCOUNT ON;
 
     IF @pedido_id IS NULL OR @subtotal_comida IS NULL OR @subtotal_bebida IS NULL 
-       OR @iva_comida IS NULL OR @iva_bebida IS NULL OR @total IS NULL
+       OR @iva_comida IS NULL OR @iva_bebida IS NULL
     BEGIN
-        RAISERROR('Pedido, subtotais, IVAs e total são obrigatórios.', 16, 1);
+        RAISERROR('Pedido, subtotais e IVAs são obrigatórios.', 16, 1);
+        RETURN;
+    END
+
+    -- O total é o das linhas em FaturaItem, para bater com o resumo diário
+    DECLARE @total_linhas DECIMAL(14,2) = @subtotal_comida + @subtotal_bebida + @iva_comida + @iva_bebida;
+
+    IF @total IS NOT NULL AND @total <> @total_linhas
+    BEGIN
+        RAISERROR('Total não corresponde à soma dos subtotais e IVAs.', 16, 1);
         RETURN;
     END
 
@@ -1488,10 +1594,22 @@ BEGIN
         @subtotal_bebida,
         @iva_comida,
         @iva_bebida,
-        @total
+        @total_linhas
     );
 
     DECLARE @novo_fatura_id INT = SCOPE_IDENTITY();
+
+    INSERT INTO FaturaItem (
+        fatura_id, descricao, quantidade, preco_unitario, valor_liquido,
+        percentual_iva, valor_iva, valor_total_linha
+    )
+    SELECT @novo_fatura_id, g.descricao, 1, g.subtotal, g.subtotal, g.percentual_iva, g.iva, g.subtotal + g.iva
+    FROM (VALUES
+        ('Comida (fatura manual)', 13.00, @subtotal_comida, @iva_comida),
+        ('Bebida (fatura manual)', 23.00, @subtotal_bebida, @iva_bebida)
+    ) g (descricao, percentual_iva, subtotal, iva)
+    WHERE g.subtotal <> 0 OR g.iva <> 0;
+
     SELECT @novo_fatura_id AS fatura_id;
 END;
 GO
@@ -12,8 +12,13 @@ GO
    Execute este script após ter carregado todos os objetos (tabelas, SPs, etc.).
    Cada seção testa uma entidade diferente via suas SPs de CRUD.
    Remova/Comente os GO internos conforme indicado para evitar perda de variáveis.
+   Tudo corre numa transação desfeita no fim, para que o script possa ser
+   reexecutado (service.py migrate) sem deixar dados de teste na base.
    ========================================================================= */
 
+BEGIN TRANSACTION;
+GO
+
 ----------------------------------------
 -- 1. Teste CRUD de Cliente
 ----------------------------------------
@@ -598,6 +603,23 @@ BEGIN CATCH
     PRINT 'Erro esperado: ' + ERROR_MESSAGE();
 END CATCH;
 
+-- 13.3. Tentar cadastrar fatura com total diferente da soma das linhas
+BEGIN TRY
+    EXEC sp_cadastrar_fatura_manual
+        @pedido_id = @pedido_cancelar_id,
+        @subtotal_comida = 1.00,
+        @subtotal_bebida = 0.50,
+        @iva_comida = 0.13,
+        @iva_bebida = 0.12,
+        @total = 2.00;
+END TRY
+BEGIN CATCH
+    PRINT 'Erro esperado: ' + ERROR_MESSAGE();
+END CATCH;
+
+GO
+
+ROLLBACK TRANSACTION;
 GO
 
 -- =========================================================================
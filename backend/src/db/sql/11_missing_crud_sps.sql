@@ -404,7 +404,6 @@ BEGIN
                 @qtd_ingred, @custo_unit, @pedido_id
             );
 
-            EXEC sp_atualizar_stock_produto @ingred_id;
             FETCH NEXT FROM cursor_ingr INTO @ingred_id, @qtd_ingred;
         END
 
@@ -426,8 +425,6 @@ BEGIN
             @produto_id, GETDATE(), 'entrada',
             @qtd_item, @custo_unit, @pedido_id
         );
-
-        EXEC sp_atualizar_stock_produto @produto_id;
     END
 
     DELETE FROM PedidoItem WHERE pedido_item_id = @pedido_item_id;
@@ -0,0 +1,39 @@
+USE botecopro_db;
+GO
+
+-- =========================================================================
+-- Script: 12_backfill_fatura_item.sql
+-- Objetivo: Migração única das faturas emitidas antes de existirem
+--           FaturaItem e ResumoFaturacaoDiaria
+-- Numa base nova ou já migrada não faz nada, por isso pode ser reaplicado.
+-- =========================================================================
+
+/* ------------------------------------------------
+   1. Resumo das linhas de fatura que já existiam
+      O trigger trg_resumo_faturacao_diaria só conta as linhas inseridas
+      depois de criado; o resumo vazio é preenchido uma vez.
+   ------------------------------------------------ */
+IF NOT EXISTS (SELECT 1 FROM ResumoFaturacaoDiaria)
+   AND EXISTS (SELECT 1 FROM FaturaItem)
+    EXEC sp_reconstruir_resumo_faturacao;
+GO
+
+/* ------------------------------------------------
+   2. Linhas das faturas sem FaturaItem
+      Uma linha por grupo de IVA com os subtotais da fatura (como as faturas
+      manuais), para que continuem a contar nos relatórios. O trigger
+      acrescenta-as ao resumo.
+   ------------------------------------------------ */
+INSERT INTO FaturaItem (
+    fatura_id, descricao, quantidade, preco_unitario, valor_liquido,
+    percentual_iva, valor_iva, valor_total_linha
+)
+SELECT fa.fatura_id, g.descricao, 1, g.subtotal, g.subtotal, g.percentual_iva, g.iva, g.subtotal + g.iva
+FROM Fatura fa
+CROSS APPLY (VALUES
+    ('Comida (fatura sem linhas)', 13.00, fa.subtotal_comida, fa.iva_comida),
+    ('Bebida (fatura sem linhas)', 23.00, fa.subtotal_bebida, fa.iva_bebida)
+) g (descricao, percentual_iva, subtotal, iva)
+WHERE NOT EXISTS (SELECT 1 FROM FaturaItem fi WHERE fi.fatura_id = fa.fatura_id)
+  AND (g.subtotal <> 0 OR g.iva <> 0);
+GO
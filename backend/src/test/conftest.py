@@ -0,0 +1,157 @@
+"""Test database provisioning.
+
+The complete schema and seeds are built once into a template database and
+kept as a backup on the SQL Server (tagged with a checksum of the scripts).
+Each pytest session, or each pytest-xdist worker, restores its own copy of
+that backup and drops it at the end, so tests never share or rebuild state.
+The template is rebuilt only when a script in db/sql changes.
+"""
+import hashlib
+import os
+import sys
+from contextlib import contextmanager
+from pathlib import Path
+
+import pytest
+import pyodbc
+
+# Ensure db package is in path
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+import db.service as service
+
+TEMPLATE_DB = 'botecopro_template'
+TEMPLATE_BACKUP = 'botecopro_template.bak'
+
+
+def scripts_checksum(sql_dir: Path = service.SQL_DIR) -> str:
+    digest = hashlib.sha256()
+    for path in sorted(sql_dir.glob('*.sql')):
+        digest.update(f'{path.name}:{service.checksum(path.read_text(encoding="utf-8"))}\n'.encode())
+    return digest.hexdigest()
+
+
+def server_path(cursor, prop: str, name: str) -> str:
+    """Join ``name`` to a directory reported by SERVERPROPERTY, with the server's separator."""
+    cursor.execute(f"SELECT CAST(SERVERPROPERTY('{prop}') AS NVARCHAR(4000))")
+    directory = cursor.fetchone()[0]
+    separator = '\\' if '\\' in directory else '/'
+    return directory.rstrip('\\/') + separator + name
+
+
+def backup_checksum(cursor, path: str):
+    """Checksum stored in the template backup, or None when there is no usable backup."""
+    try:
+        cursor.execute('RESTORE HEADERONLY FROM DISK = ?', path)
+    except pyodbc.Error:
+        return None
+    columns = [column[0] for column in cursor.description]
+    row = cursor.fetchone()
+    return row[columns.index('BackupDescription')]
+
+
+def drop_database(cursor, name: str) -> None:
+    cursor.execute(
+        f"IF DB_ID('{name}') IS NOT NULL BEGIN "
+        f"ALTER DATABASE [{name}] SET SINGLE_USER WITH ROLLBACK IMMEDIATE; "
+        f"DROP DATABASE [{name}]; END"
+    )
+
+
+def build_template(cursor, path: str, checksum: str) -> None:
+    drop_database(cursor, TEMPLATE_DB)
+    # The scripts name the database explicitly; build under the template name
+    # so a developer's botecopro_db on the same server is left alone
+    for script in sorted(service.SQL_DIR.glob('*.sql')):
+        text = script.read_text(encoding='utf-8').replace(service.DATABASE, TEMPLATE_DB)
+        service.execute_sql(cursor, text, script.name)
+    cursor.execute('USE master')
+    cursor.execute(
+        f'BACKUP DATABASE [{TEMPLATE_DB}] TO DISK = ? WITH INIT, COPY_ONLY, DESCRIPTION = ?',
+        path, checksum,
+    )
+    while cursor.nextset():
+        pass
+    drop_database(cursor, TEMPLATE_DB)
+
+
+def restore_database(cursor, path: str, name: str) -> None:
+    cursor.execute('RESTORE FILELISTONLY FROM DISK = ?', path)
+    columns = [column[0] for column in cursor.description]
+    files = [(row[columns.index('LogicalName')], row[columns.index('Type')]) for row in cursor.fetchall()]
+
+    moves, params = [], [path]
+    for logical, kind in files:
+        prop = 'InstanceDefaultLogPath' if kind == 'L' else 'InstanceDefaultDataPath'
+        extension = 'ldf' if kind == 'L' else 'mdf'
+        moves.append('MOVE ? TO ?')
+        params += [logical, server_path(cursor, prop, f'{name}_{logical}.{extension}')]
+    drop_database(cursor, name)
+    cursor.execute(
+        f'RESTORE DATABASE [{name}] FROM DISK = ? WITH REPLACE, {", ".join(moves)}',
+        *params,
+    )
+    while cursor.nextset():
+        pass
+
+
+@pytest.fixture(scope='session')
+def database():
+    """Name of a freshly restored copy of the seeded schema for this session or xdist worker."""
+    dsn = os.getenv('BOTECOPRO_DB_DSN')
+    if not dsn:
+        pytest.skip('BOTECOPRO_DB_DSN not configured')
+    # Run against an existing database instead of provisioning one
+    existing = os.getenv('BOTECOPRO_TEST_DATABASE')
+    if existing:
+        yield existing
+        return
+
+    name = f"botecopro_test_{os.getenv('PYTEST_XDIST_WORKER', 'main')}"
+    connection = pyodbc.connect(dsn, autocommit=True)
+    cursor = connection.cursor()
+    cursor.execute('USE master')
+    path = server_path(cursor, 'InstanceDefaultBackupPath', TEMPLATE_BACKUP)
+    # Only one worker builds the template; the others wait and reuse it
+    cursor.execute(
+        "EXEC sp_getapplock @Resource = 'botecopro_test_template', @LockMode = 'Exclusive', "
+        "@LockOwner = 'Session', @LockTimeout = -1"
+    )
+    try:
+        checksum = scripts_checksum()
+        if backup_checksum(cursor, path) != checksum:
+            build_template(cursor, path, checksum)
+    finally:
+        cursor.execute("EXEC sp_releaseapplock @Resource = 'botecopro_test_template', @LockOwner = 'Session'")
+    restore_database(cursor, path, name)
+    yield name
+    cursor.execute('USE master')
+    drop_database(cursor, name)
+    connection.close()
+
+
+@contextmanager
+def rolled_back_cursor(database: str):
+    connection = pyodbc.connect(os.environ['BOTECOPRO_DB_DSN'], autocommit=False)
+    cursor = connection.cursor()
+    cursor.execute(f'USE [{database}]')
+    try:
+        yield cursor
+    finally:
+        # Everything the test writes is discarded
+        connection.rollback()
+        connection.close()
+
+
+@pytest.fixture()
+def cur(database):
+    """Cursor on the test database in a transaction rolled back after the test."""
+    with rolled_back_cursor(database) as cursor:
+        yield cursor
+
+
+@pytest.fixture(scope='module')
+def module_cur(database):
+    """Like ``cur``, but shared by a module's tests, for data seeded once per module."""
+    with rolled_back_cursor(database) as cursor:
+        yield cursor
+
@@ -0,0 +1,27 @@
+"""Test data helpers shared by the database tests (fixtures live in conftest.py)."""
+
+ROWS = 20000
+
+# CTE n with ROWS rows, i = 0..ROWS-1, for set-based test data
+NUMBERS = (
+    f"WITH n AS (SELECT TOP ({ROWS}) ROW_NUMBER() OVER (ORDER BY (SELECT NULL)) - 1 AS i "
+    "FROM sys.all_objects a CROSS JOIN sys.all_objects b) "
+)
+
+
+def new_pedido(cur, itens=()) -> int:
+    """Insert a pending order with ``(prato_id, produto_id, quantidade, preco, iva)`` items."""
+    cur.execute(
+        "INSERT INTO Pedido (mesa_id, funcionario_id, data_pedido, status) "
+        "SELECT TOP 1 m.mesa_id, f.funcionario_id, GETDATE(), 'pendente' "
+        "FROM Mesa m CROSS JOIN Funcionario f"
+    )
+    cur.execute('SELECT CAST(SCOPE_IDENTITY() AS INT)')
+    pedido_id = cur.fetchone()[0]
+    for prato_id, produto_id, quantidade, preco, iva in itens:
+        cur.execute(
+            'INSERT INTO PedidoItem (pedido_id, prato_id, produto_id, quantidade, preco_unitario, iva) '
+            'VALUES (?, ?, ?, ?, ?, ?)',
+            pedido_id, prato_id, produto_id, quantidade, preco, iva,
+        )
+    return pedido_id
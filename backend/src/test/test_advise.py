@@ -0,0 +1,58 @@
+import os
+import sys
+from datetime import datetime
+from decimal import Decimal
+from pathlib import Path
+
+import pyodbc
+
+# Ensure db package is in path
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+import db.service as service
+
+
+def test_render_advice_creates_missing_and_comments_out_unused():
+    missing = [
+        ('dbo', 'Reserva', '[cliente_id], [data_reserva]', '[hora_reserva]', '[mesa_id]', 42, Decimal('1234.5')),
+        ('dbo', 'Mesa', '[status]', None, None, 3, Decimal('10')),
+    ]
+    unused = [('dbo', 'Fornecedor', 'idx_fornecedor_nome', 17)]
+
+    script = service.render_advice(missing, unused, datetime(2025, 6, 1, 9, 30))
+
+    assert script.startswith('USE [botecopro_db];\nGO\n')
+    assert '(2025-06-01 09:30)' in script
+    assert (
+        '-- impacto 1,234; 42 consulta(s) teriam usado este índice\n'
+        'CREATE NONCLUSTERED INDEX idx_reserva_cliente_id_data_reserva_hora_reserva\n'
+        '    ON [dbo].[Reserva] ([cliente_id], [data_reserva], [hora_reserva])\n'
+        '    INCLUDE ([mesa_id]);\nGO\n'
+    ) in script
+    assert 'CREATE NONCLUSTERED INDEX idx_mesa_status\n    ON [dbo].[Mesa] ([status]);\nGO\n' in script
+    assert '-- 17 escrita(s), 0 leituras\n-- DROP INDEX [idx_fornecedor_nome] ON [dbo].[Fornecedor];\n' in script
+    # Missing suggestions come first, in the order given (already ranked)
+    assert script.index('idx_reserva_') < script.index('idx_mesa_status') < script.index('DROP INDEX')
+
+
+def test_render_advice_uses_the_given_database():
+    assert service.render_advice([], [], database='botecopro_carga').startswith('USE [botecopro_carga];\nGO\n')
+
+
+def test_render_advice_without_suggestions():
+    script = service.render_advice([], [])
+    assert '-- Nenhuma sugestão.' in script
+    assert '-- Nenhum.' in script
+    assert 'CREATE' not in script and 'DROP' not in script
+
+
+def test_index_dmv_queries_run(database):
+    with pyodbc.connect(os.environ['BOTECOPRO_DB_DSN'], autocommit=True) as connection:
+        cursor = connection.cursor()
+        cursor.execute(f'USE [{database}]')
+        missing = service.missing_indexes(cursor, 5)
+        unused = service.unused_indexes(cursor)
+    assert len(missing) <= 5
+    assert all(len(row) == 7 for row in missing)
+    assert all(len(row) == 4 for row in unused)
+    impacts = [row[6] for row in missing]
+    assert impacts == sorted(impacts, reverse=True)
@@ -0,0 +1,111 @@
+import contextlib
+import sys
+from pathlib import Path
+
+import pytest
+
+# Ensure api package is in path
+sys.path.append(str(Path(__file__).resolve().parents[1] / 'api'))
+from boteco import batch
+from boteco.batch import BatchError, Ref, exec_batch, parse_batch
+from boteco.catalog import CallError, Catalog, Parameter, Procedure
+
+
+def make_catalog():
+    return Catalog({}, {
+        'sp_cadastrar_pedido': Procedure('sp_cadastrar_pedido', [
+            Parameter('mesa_id', 'int'),
+            Parameter('funcionario_id', 'int'),
+            Parameter('cliente_id', 'int', default='NULL'),
+        ]),
+        'sp_adicionar_item_pedido': Procedure('sp_adicionar_item_pedido', [
+            Parameter('pedido_id', 'int'),
+            Parameter('produto_id', 'int', default='NULL'),
+            Parameter('quantidade', 'int'),
+        ]),
+    })
+
+
+ORDER = [
+    {'procedure': 'sp_cadastrar_pedido', 'params': {'mesa_id': 1, 'funcionario_id': 2}, 'as': 'pedido'},
+    {'procedure': 'sp_adicionar_item_pedido',
+     'params': {'pedido_id': {'$ref': 'pedido.pedido_id'}, 'produto_id': 7, 'quantidade': 2}},
+    {'procedure': 'sp_adicionar_item_pedido',
+     'params': {'pedido_id': {'$ref': '0.pedido_id'}, 'produto_id': 8, 'quantidade': 1}},
+]
+
+
+def test_parse_batch_resolves_aliases_and_indexes():
+    calls = parse_batch(ORDER, make_catalog())
+    assert [call.procedure for call in calls] == [
+        'sp_cadastrar_pedido', 'sp_adicionar_item_pedido', 'sp_adicionar_item_pedido',
+    ]
+    for call in calls[1:]:
+        ref = dict(call.args)['pedido_id']
+        assert isinstance(ref, Ref) and (ref.call, ref.column) == (0, 'pedido_id')
+
+
+@pytest.mark.parametrize('calls, message', [
+    ([], 'batch is empty'),
+    ([{'procedure': 'sp_nao_existe'}], 'call 0: unknown procedure'),
+    ([{'procedure': 'sp_cadastrar_pedido', 'params': {'mesa_id': 1}}], 'call 0: missing parameters'),
+    ([{'procedure': 'sp_adicionar_item_pedido',
+       'params': {'pedido_id': {'$ref': '0.pedido_id'}, 'quantidade': 1}}], 'earlier call'),
+    ([{'procedure': 'sp_adicionar_item_pedido',
+       'params': {'pedido_id': {'$ref': 'pedido.pedido_id'}, 'quantidade': 1}}], "unknown call 'pedido'"),
+])
+def test_parse_batch_rejects_invalid_calls(calls, message):
+    with pytest.raises(CallError, match=message):
+        parse_batch(calls, make_catalog())
+
+
+class FakeCursor:
+    def __init__(self, fail_on=None):
+        self.fail_on = fail_on
+        self.executed = []
+        self.committed = False
+        self.rolled_back = False
+        self.description = None
+
+    def execute(self, query, *params):
+        self.executed.append((query, params))
+        if self.fail_on is not None and len(self.executed) - 1 == self.fail_on:
+            raise RuntimeError('Produto não encontrado.')
+        if 'sp_cadastrar_pedido' in query:
+            self.description = [('pedido_id',)]
+            self._rows = [(42,)]
+        else:
+            self.description = None
+
+    def fetchall(self):
+        return self._rows
+
+    def commit(self):
+        self.committed = True
+
+    def rollback(self):
+        self.rolled_back = True
+
+
+def run(monkeypatch, cursor):
+    monkeypatch.setattr(batch, 'get_cursor', lambda: contextlib.nullcontext(cursor))
+    return exec_batch(parse_batch(ORDER, make_catalog()))
+
+
+def test_exec_batch_runs_on_one_cursor_and_commits_once(monkeypatch):
+    cursor = FakeCursor()
+    results = run(monkeypatch, cursor)
+    assert results == [[{'pedido_id': 42}], [], []]
+    assert cursor.committed and not cursor.rolled_back
+    assert cursor.executed[1] == (
+        'EXEC [sp_adicionar_item_pedido] @pedido_id = ?, @produto_id = ?, @quantidade = ?', (42, 7, 2),
+    )
+    assert cursor.executed[2][1] == (42, 8, 1)
+
+
+def test_exec_batch_rolls_back_and_reports_failing_call(monkeypatch):
+    cursor = FakeCursor(fail_on=2)
+    with pytest.raises(BatchError, match='Produto não encontrado') as info:
+        run(monkeypatch, cursor)
+    assert info.value.index == 2
+    assert cursor.rolled_back and not cursor.committed
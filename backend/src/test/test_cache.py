@@ -0,0 +1,59 @@
+import sys
+from pathlib import Path
+
+# Ensure api package is in path
+sys.path.append(str(Path(__file__).resolve().parents[1] / 'api'))
+import boteco.cache
+from boteco.cache import ResultCache, get_result_cache, parse_ttls
+
+
+def test_hits_and_misses_are_counted_per_view():
+    cache = ResultCache()
+    assert cache.get('view_mesas_disponiveis', 'a') is None
+    cache.put('view_mesas_disponiveis', 'a', b'[]', 2, cache.generation('view_mesas_disponiveis'))
+    assert cache.get('view_mesas_disponiveis', 'a') == b'[]'
+    counters = cache.stats()['views']['view_mesas_disponiveis']
+    assert (counters['hits'], counters['misses'], counters['entries']) == (1, 1, 1)
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = ResultCache(max_bytes=10)
+    cache.put('v', 'a', 'a', 4, 0)
+    cache.put('v', 'b', 'b', 4, 0)
+    cache.get('v', 'a')
+    cache.put('v', 'c', 'c', 4, 0)
+    assert cache.get('v', 'b') is None
+    assert cache.get('v', 'a') == 'a'
+    assert cache.stats()['bytes'] == 8
+
+
+def test_invalidation_drops_entries_and_blocks_stale_puts():
+    cache = ResultCache()
+    generation = cache.generation('view_mesas_disponiveis')
+    cache.put('view_mesas_disponiveis', 'a', 'old', 3, generation)
+    cache.put('view_pratos_populares', 'a', 'keep', 4, 0)
+    cache.invalidate({'view_mesas_disponiveis'})
+    assert cache.get('view_mesas_disponiveis', 'a') is None
+    assert cache.get('view_pratos_populares', 'a') == 'keep'
+    # A read that started before the invalidation must not be stored
+    cache.put('view_mesas_disponiveis', 'a', 'stale', 5, generation)
+    assert cache.get('view_mesas_disponiveis', 'a') is None
+
+
+def test_per_view_ttls():
+    cache = ResultCache(default_ttl=5, ttls=parse_ttls('view_promocoes_ativas=60, view_mesas_disponiveis=0'))
+    assert cache.ttl_for('view_promocoes_ativas') == 60
+    assert cache.ttl_for('view_pratos_populares') == 5
+    cache.put('view_mesas_disponiveis', 'a', 'x', 1, 0)
+    assert cache.get('view_mesas_disponiveis', 'a') is None
+
+
+def test_settings_are_read_when_the_cache_is_first_used(monkeypatch):
+    # app.py loads .env after importing boteco.cache
+    monkeypatch.setattr(boteco.cache, '_cache', None)
+    monkeypatch.setenv('BOTECOPRO_CACHE_TTL', '0')
+    monkeypatch.setenv('BOTECOPRO_CACHE_TTLS', 'view_promocoes_ativas=60')
+    monkeypatch.setenv('BOTECOPRO_CACHE_MAX_BYTES', '1024')
+    cache = get_result_cache()
+    assert (cache.default_ttl, cache.ttl_for('view_promocoes_ativas'), cache.max_bytes) == (0, 60, 1024)
+    assert get_result_cache() is cache
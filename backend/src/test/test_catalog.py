@@ -0,0 +1,132 @@
+import sys
+from decimal import Decimal
+from pathlib import Path
+
+import pytest
+
+# Ensure api package is in path
+sys.path.append(str(Path(__file__).resolve().parents[1] / 'api'))
+import boteco.catalog
+from boteco.catalog import (CallError, Catalog, CatalogCache, Parameter, Procedure, get_catalog_cache,
+                            parameter_defaults, resolve_dependencies)
+
+SP_CADASTRAR_PEDIDO = """
+/* 9.1. sp_cadastrar_pedido */
+CREATE PROCEDURE sp_cadastrar_pedido
+    @mesa_id           INT,
+    @funcionario_id    INT,
+    @cliente_id        INT           = NULL,   -- consumidor final
+    @preco             DECIMAL(10,2) = 0.00,
+    @nota              VARCHAR(20)   = 'a, b'
+AS
+BEGIN
+    SET NOCOUNT ON;
+END;
+"""
+
+
+def test_parameter_defaults_are_read_from_definition():
+    assert parameter_defaults(SP_CADASTRAR_PEDIDO) == {
+        'cliente_id': 'NULL',
+        'preco': '0.00',
+        'nota': "'a, b'",
+    }
+    assert parameter_defaults('CREATE PROCEDURE sp_obter_mesas_disponiveis AS SELECT 1') == {}
+
+
+def make_procedure():
+    return Procedure('sp_cadastrar_pedido', [
+        Parameter('mesa_id', 'int'),
+        Parameter('funcionario_id', 'int'),
+        Parameter('cliente_id', 'int', default='NULL'),
+    ])
+
+
+def test_bind_matches_names_in_declaration_order():
+    bound = make_procedure().bind({'funcionario_id': 3, '@Mesa_Id': 1})
+    assert bound == [('mesa_id', 1), ('funcionario_id', 3)]
+
+
+def test_procedure_lookup_ignores_case():
+    procedure = make_procedure()
+    catalog = Catalog({}, {procedure.name: procedure})
+    assert catalog.procedure('sp_cadastrar_pedido') is procedure
+    assert catalog.procedure('SP_Cadastrar_Pedido') is procedure
+    assert catalog.procedure('sp_cadastrar') is None
+    assert catalog.procedure(None) is None
+
+
+def test_bind_rejects_unknown_and_missing_parameters():
+    with pytest.raises(CallError):
+        make_procedure().bind({'mesa_id': 1, 'funcionario_id': 3, 'mesa': 2})
+    with pytest.raises(CallError):
+        make_procedure().bind({'mesa_id': 1})
+
+
+def test_bind_converts_table_parameter_rows():
+    itens = Parameter('itens', 'ItemPedidoLista', is_table=True, columns=[
+        ('prato_id', 'int'), ('produto_id', 'int'), ('quantidade', 'int'),
+        ('preco_unitario', 'decimal'), ('iva', 'decimal'),
+    ])
+    procedure = Procedure('sp_adicionar_itens_pedido', [Parameter('pedido_id', 'int'), itens])
+    bound = dict(procedure.bind({'pedido_id': 5, 'itens': [
+        {'prato_id': 2, 'quantidade': 1, 'preco_unitario': 12.5, 'iva': 13},
+        {'Produto_Id': 7, 'quantidade': 3, 'preco_unitario': '2.10', 'iva': 23},
+    ]}))
+    assert bound['itens'] == [
+        'ItemPedidoLista', 'dbo',
+        (2, None, 1, Decimal('12.5'), Decimal('13')),
+        (None, 7, 3, Decimal('2.10'), Decimal('23')),
+    ]
+    with pytest.raises(CallError, match="unknown column 'preco'"):
+        procedure.bind({'pedido_id': 5, 'itens': [{'preco': 1}]})
+    with pytest.raises(CallError, match='quantidade'):
+        procedure.bind({'pedido_id': 5, 'itens': [{'quantidade': 'duas'}]})
+    with pytest.raises(CallError, match='list of rows'):
+        procedure.bind({'pedido_id': 5, 'itens': {'quantidade': 1}})
+
+
+def test_cache_reloads_only_after_ttl():
+    loads = []
+    cache = CatalogCache(loader=lambda: loads.append(1) or object(), ttl=60)
+    assert cache.fresh() is None
+    first = cache.get()
+    assert cache.get() is first
+    assert len(loads) == 1
+    assert cache.refresh() is not first
+    assert len(loads) == 2
+
+
+def test_writes_follow_procedure_calls_and_triggers():
+    dependencies = [
+        ('view_mesas_disponiveis', 'V', 'Mesa', 'U'),
+        ('view_estoque_utilizado_detalhado', 'V', 'mv_estoque_saida_agregado', 'V'),
+        ('mv_estoque_saida_agregado', 'V', 'MovimentacaoEstoque', 'U'),
+        ('sp_obter_mesas_disponiveis', 'P', 'view_mesas_disponiveis', 'V'),
+        ('sp_adicionar_item_pedido', 'P', 'PedidoItem', 'U'),
+        ('trg_abatimento_estoque_quando_inserir_pedidoitem', 'TR', 'MovimentacaoEstoque', 'U'),
+    ]
+    triggers = {'trg_abatimento_estoque_quando_inserir_pedidoitem': 'PedidoItem'}
+    definitions = {
+        'sp_obter_mesas_disponiveis': 'CREATE PROCEDURE sp_obter_mesas_disponiveis AS SELECT 1',
+        'sp_adicionar_item_pedido': 'CREATE PROCEDURE sp_adicionar_item_pedido AS INSERT INTO PedidoItem',
+        'sp_dinamica': "CREATE PROCEDURE sp_dinamica AS EXEC sp_executesql N'DELETE FROM Mesa'",
+    }
+    views = ['view_mesas_disponiveis', 'view_estoque_utilizado_detalhado']
+    view_tables, writes = resolve_dependencies(dependencies, triggers, definitions, views)
+    assert view_tables['view_estoque_utilizado_detalhado'] == {'MovimentacaoEstoque'}
+    assert writes['sp_obter_mesas_disponiveis'] == set()
+    assert writes['sp_adicionar_item_pedido'] == {'PedidoItem', 'MovimentacaoEstoque'}
+    assert writes['sp_dinamica'] is None
+
+    catalog = Catalog({view: {} for view in views}, {}, view_tables, writes)
+    assert catalog.views_written_by('sp_adicionar_item_pedido') == {'view_estoque_utilizado_detalhado'}
+    assert catalog.views_written_by('sp_dinamica') == set(views)
+
+
+def test_catalog_ttl_is_read_when_the_cache_is_first_used(monkeypatch):
+    # app.py loads .env after importing boteco.catalog
+    monkeypatch.setattr(boteco.catalog, '_cache', None)
+    monkeypatch.setenv('BOTECOPRO_CATALOG_TTL', '7')
+    assert get_catalog_cache().ttl == 7
+    assert get_catalog_cache() is get_catalog_cache()
@@ -0,0 +1,185 @@
+import pytest
+
+from .helpers import NUMBERS
+
+# Spreads the i = 0..ROWS-1 of NUMBERS over 60 months from 2020-01
+SPREAD_DATE = "DATEADD(MINUTE, i * 37 % 1440, DATEADD(DAY, i % 28, DATEADD(MONTH, i % 60, '2020-01-01')))"
+
+
+@pytest.fixture(scope='module', autouse=True)
+def seeded(module_cur):
+    seed(module_cur)
+    for ddl in ORIGINAL_FUNCTIONS:
+        module_cur.execute(ddl)
+
+
+def seed(cur):
+    cur.execute('CREATE TABLE #pedidos (pedido_id INT, data_pedido DATETIME)')
+    cur.execute(
+        NUMBERS +
+        "INSERT INTO Pedido (mesa_id, funcionario_id, data_pedido, status) "
+        "OUTPUT inserted.pedido_id, inserted.data_pedido INTO #pedidos "
+        f"SELECT m.mesa_id, f.funcionario_id, {SPREAD_DATE}, 'finalizado' "
+        "FROM n CROSS JOIN (SELECT TOP 1 mesa_id FROM Mesa) m "
+        "CROSS JOIN (SELECT TOP 1 funcionario_id FROM Funcionario) f"
+    )
+    cur.execute(
+        "INSERT INTO Fatura (pedido_id, data_emissao, tipo_fatura, subtotal_comida, total) "
+        "SELECT pedido_id, data_pedido, 'consumidor_final', 10.00 + pedido_id % 7, 10.00 + pedido_id % 7 "
+        "FROM #pedidos"
+    )
+    # One line per invoice; the trigger adds them to the billing summary
+    cur.execute(
+        "INSERT INTO FaturaItem (fatura_id, descricao, quantidade, preco_unitario, valor_liquido, "
+        "percentual_iva, valor_iva, valor_total_linha) "
+        "SELECT fa.fatura_id, 'Teste', 1, fa.total, fa.total, 0.00, 0.00, fa.total "
+        "FROM Fatura fa JOIN #pedidos p ON p.pedido_id = fa.pedido_id"
+    )
+    cur.execute(
+        NUMBERS +
+        "INSERT INTO MovimentacaoEstoque (produto_id, data_movimentacao, tipo, quantidade, preco_unitario) "
+        f"SELECT p.produto_id, {SPREAD_DATE}, 'saida', 1, 1.00 "
+        "FROM n CROSS JOIN (SELECT TOP 1 produto_id FROM Produto ORDER BY produto_id) p"
+    )
+    cur.execute(
+        NUMBERS +
+        "INSERT INTO RegistroHoras (funcionario_id, data_registro, horas_normais, horas_extra) "
+        f"SELECT f.funcionario_id, CAST({SPREAD_DATE} AS DATE), 8.00, i % 4 "
+        "FROM n CROSS JOIN (SELECT TOP 1 funcionario_id FROM Funcionario) f"
+    )
+
+
+# The definitions before the rewrite, created next to the current ones for the
+# length of the module's transaction
+ORIGINAL_FUNCTIONS = (
+    """
+    CREATE FUNCTION fn_calcular_vencimentos_mes_ano_original (@ano INT, @mes INT)
+    RETURNS DECIMAL(14,2)
+    AS
+    BEGIN
+        DECLARE @total_vencimentos DECIMAL(14,2);
+        SELECT @total_vencimentos = SUM(
+            ((c.salario_mensal / 160.0) * r.horas_normais)
+            + (CASE
+                WHEN r.horas_extra <= 2 THEN (c.salario_mensal / 160.0) * r.horas_extra
+                WHEN r.horas_extra <= 7 THEN (c.salario_mensal / 160.0) * 2
+                     + (c.salario_mensal / 160.0) * 1.5 * (r.horas_extra - 2)
+                ELSE (c.salario_mensal / 160.0) * 2 + (c.salario_mensal / 160.0) * 1.5 * 5
+                     + (c.salario_mensal / 160.0) * 2 * (r.horas_extra - 7)
+               END))
+        FROM RegistroHoras r
+        JOIN Funcionario f ON r.funcionario_id = f.funcionario_id
+        JOIN Carreira c ON f.carreira_id = c.carreira_id
+        WHERE YEAR(r.data_registro) = @ano AND MONTH(r.data_registro) = @mes;
+        RETURN ISNULL(@total_vencimentos, 0.00);
+    END
+    """,
+    """
+    CREATE FUNCTION fn_valores_gastos_stock_mes_ano_original (@ano INT, @mes INT)
+    RETURNS TABLE
+    AS
+    RETURN (
+        SELECT me.produto_id, p.nome AS nome_produto, SUM(me.quantidade * me.preco_unitario) AS valor_gasto
+        FROM MovimentacaoEstoque me
+        JOIN Produto p ON me.produto_id = p.produto_id
+        WHERE me.tipo = 'saida' AND YEAR(me.data_movimentacao) = @ano AND MONTH(me.data_movimentacao) = @mes
+        GROUP BY me.produto_id, p.nome
+    )
+    """,
+    """
+    CREATE FUNCTION fn_calcular_total_faturado_original (@data_inicio DATE, @data_fim DATE)
+    RETURNS DECIMAL(14,2)
+    AS
+    BEGIN
+        DECLARE @total DECIMAL(14,2);
+        SELECT @total = SUM(f.total)
+        FROM Fatura f
+        WHERE CAST(f.data_emissao AS DATE) BETWEEN @data_inicio AND @data_fim;
+        RETURN ISNULL(@total, 0.00);
+    END
+    """,
+)
+
+
+def session_reads(cur, sql, *params):
+    """Run ``sql`` and return its rows and the logical reads it added to the session.
+
+    Unlike STATISTICS IO, the session counters include the reads done inside
+    scalar UDFs. The query runs once beforehand so compilation is not counted.
+    """
+    cur.execute(sql, *params)
+    cur.fetchall()
+    cur.execute('SELECT logical_reads FROM sys.dm_exec_sessions WHERE session_id = @@SPID')
+    started = cur.fetchone()[0]
+    cur.execute(sql, *params)
+    rows = [tuple(row) for row in cur.fetchall()]
+    cur.execute('SELECT logical_reads FROM sys.dm_exec_sessions WHERE session_id = @@SPID')
+    return rows, cur.fetchone()[0] - started
+
+
+# Original and current function, their arguments and how many times fewer
+# reads the current one must do
+CASES = {
+    'vencimentos_mes_ano': (
+        'SELECT dbo.fn_calcular_vencimentos_mes_ano_original(?, ?)',
+        'SELECT dbo.fn_calcular_vencimentos_mes_ano(?, ?)',
+        (2023, 5), 5,
+    ),
+    'valores_gastos_stock_mes_ano': (
+        'SELECT produto_id, valor_gasto FROM fn_valores_gastos_stock_mes_ano_original(?, ?)',
+        'SELECT produto_id, valor_gasto FROM fn_valores_gastos_stock_mes_ano(?, ?)',
+        (2023, 5), 5,
+    ),
+    # The original could already seek idx_fatura_data through CAST(... AS DATE);
+    # the current one reads a row per day from ResumoFaturacaoDiaria instead
+    'total_faturado': (
+        'SELECT dbo.fn_calcular_total_faturado_original(?, ?)',
+        'SELECT dbo.fn_calcular_total_faturado(?, ?)',
+        ('2023-01-01', '2023-12-31'), 1,
+    ),
+}
+
+
+@pytest.mark.parametrize('name', list(CASES))
+def test_rewritten_functions_read_less(module_cur, name):
+    original_sql, current_sql, params, factor = CASES[name]
+    original, original_reads = session_reads(module_cur, original_sql, *params)
+    current, current_reads = session_reads(module_cur, current_sql, *params)
+    assert sorted(current) == sorted(original)
+    assert original and original != [(None,)] and original != [(0,)]
+    assert current_reads * factor <= original_reads, (original_reads, current_reads)
+
+
+def test_scalar_wrappers_match_inline_functions(module_cur):
+    module_cur.execute(
+        'SELECT dbo.fn_calcular_total_faturado(?, ?), '
+        '(SELECT SUM(total) FROM Fatura WHERE CAST(data_emissao AS DATE) BETWEEN ? AND ?)',
+        '2023-05-01', '2023-05-31', '2023-05-01', '2023-05-31',
+    )
+    scalar, direct = module_cur.fetchone()
+    assert scalar == direct
+    module_cur.execute('SELECT SUM(total_faturado), SUM(faturas) FROM fn_faturado_por_dia(?, ?)', '2023-05-01', '2023-05-31')
+    total, faturas = module_cur.fetchone()
+    assert total == scalar and faturas > 0
+
+    module_cur.execute(
+        'SELECT dbo.fn_calcular_vencimentos_mes_ano(2023, 5), '
+        '(SELECT CAST(SUM(valor_vencimentos) AS DECIMAL(14,2)) FROM fn_vencimentos_funcionario_mes_ano(2023, 5))'
+    )
+    scalar, summed = module_cur.fetchone()
+    assert scalar == summed and scalar > 0
+
+    module_cur.execute(
+        'SELECT funcionario_id, SUM(horas_normais + horas_extra) FROM RegistroHoras '
+        'WHERE data_registro BETWEEN ? AND ? GROUP BY funcionario_id',
+        '2023-05-01', '2023-05-31',
+    )
+    direct = dict(module_cur.fetchall())
+    module_cur.execute('SELECT funcionario_id, total_horas FROM fn_horas_trabalhadas_periodo(?, ?)', '2023-05-01', '2023-05-31')
+    assert dict(module_cur.fetchall()) == direct
+    funcionario_id = next(iter(direct))
+    module_cur.execute(
+        'EXEC sp_obter_horas_trabalhadas @funcionario_id = ?, @data_inicio = ?, @data_fim = ?',
+        funcionario_id, '2023-05-01', '2023-05-31',
+    )
+    assert module_cur.fetchone()[3] == direct[funcionario_id]
@@ -0,0 +1,21 @@
+import sys
+from pathlib import Path
+
+# Ensure api package is in path
+sys.path.append(str(Path(__file__).resolve().parents[1] / 'api'))
+from boteco.streaming import etag_for, etag_matches, render_json
+
+
+def test_etag_is_stable_for_identical_content():
+    body = render_json([{'mesa_id': 1, 'numero': 1, 'capacidade': 4}])
+    assert etag_for(body) == etag_for(bytes(body))
+    assert etag_for(body) != etag_for(render_json([]))
+
+
+def test_if_none_match():
+    etag = etag_for(b'[]')
+    assert etag_matches(etag, etag)
+    assert etag_matches(f'"other", W/{etag}', etag)
+    assert etag_matches('*', etag)
+    assert not etag_matches('"other"', etag)
+    assert not etag_matches(None, etag)
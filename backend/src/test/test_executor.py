@@ -0,0 +1,52 @@
+import asyncio
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+# Ensure api package is in path
+sys.path.append(str(Path(__file__).resolve().parents[1] / 'api'))
+from boteco.executor import DBExecutor, ExecutorSaturated
+
+
+def test_calls_overlap_on_worker_threads():
+    executor = DBExecutor(max_workers=2)
+    barrier = threading.Barrier(2, timeout=5)
+
+    def blocking_call(value):
+        barrier.wait()
+        return value
+
+    async def main():
+        return await asyncio.gather(executor.run(blocking_call, 1),
+                                    executor.run(blocking_call, 2))
+
+    assert asyncio.run(main()) == [1, 2]
+    stats = executor.stats()
+    assert stats['completed'] == 2
+    assert stats['queue_depth'] == 0
+    executor.shutdown()
+
+
+def test_full_queue_rejects_new_calls():
+    executor = DBExecutor(max_workers=1, max_queue=1)
+    release = threading.Event()
+    running = threading.Event()
+
+    def blocking_call():
+        running.set()
+        release.wait(5)
+
+    first = executor.submit(blocking_call)
+    running.wait(5)
+    second = executor.submit(blocking_call)
+    with pytest.raises(ExecutorSaturated):
+        executor.submit(blocking_call)
+    release.set()
+    first.result(5)
+    second.result(5)
+    stats = executor.stats()
+    assert stats['rejected'] == 1
+    assert stats['queue_depth_max'] == 1
+    executor.shutdown()
@@ -0,0 +1,224 @@
+import sys
+from datetime import date
+from decimal import Decimal
+from pathlib import Path
+
+import pytest
+import pyodbc
+
+# Ensure db package is in path
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+import db.service as service
+
+from .helpers import new_pedido
+
+
+def finalize_sample_pedidos(cur) -> list:
+    """Finalise, in one UPDATE, an order with a comida and a bebida dish and one with a product."""
+    cur.execute(
+        "INSERT INTO Prato (nome, categoria_id, descricao, tempo_preparo, preco_base) "
+        "SELECT TOP 1 'Pudim Teste', categoria_id, NULL, 5, 3.10 FROM CategoriaIva WHERE grupo_iva = 'bebida'"
+    )
+    cur.execute('SELECT CAST(SCOPE_IDENTITY() AS INT)')
+    prato_bebida = cur.fetchone()[0]
+    cur.execute(
+        "SELECT TOP 1 p.prato_id FROM Prato p "
+        "WHERE NOT EXISTS (SELECT 1 FROM CategoriaIva ci WHERE ci.categoria_id = p.categoria_id)"
+    )
+    prato_comida = cur.fetchone()[0]
+    cur.execute('SELECT TOP 1 produto_id FROM Produto ORDER BY produto_id')
+    produto_id = cur.fetchone()[0]
+
+    pedidos = [
+        new_pedido(cur, [
+            (prato_comida, None, 2, Decimal('12.35'), Decimal('13.00')),
+            (prato_bebida, None, 1, Decimal('3.10'), Decimal('23.00')),
+        ]),
+        new_pedido(cur, [(None, produto_id, 3, Decimal('2.50'), Decimal('23.00'))]),
+    ]
+    marks = ', '.join('?' for _ in pedidos)
+    cur.execute(f"UPDATE Pedido SET status = 'finalizado' WHERE pedido_id IN ({marks})", *pedidos)
+    return pedidos
+
+
+def test_finalizing_several_pedidos_in_one_update(cur):
+    pedidos = finalize_sample_pedidos(cur)
+    marks = ', '.join('?' for _ in pedidos)
+
+    cur.execute(
+        f"SELECT pedido_id, subtotal_comida, subtotal_bebida, iva_comida, iva_bebida, total "
+        f"FROM Fatura WHERE pedido_id IN ({marks}) ORDER BY pedido_id",
+        *pedidos,
+    )
+    faturas = [tuple(row) for row in cur.fetchall()]
+    assert faturas == [
+        # 2 x 12.35 = 24.70 at 13% -> 3.21; 3.10 at 23% -> 0.71
+        (pedidos[0], Decimal('24.70'), Decimal('3.10'), Decimal('3.21'), Decimal('0.71'), Decimal('31.72')),
+        # Product lines have no dish category and are billed as comida
+        (pedidos[1], Decimal('7.50'), Decimal('0.00'), Decimal('1.73'), Decimal('0.00'), Decimal('9.23')),
+    ]
+
+    cur.execute(
+        f"SELECT fa.pedido_id, COUNT(*), SUM(fi.valor_total_linha) FROM FaturaItem fi "
+        f"JOIN Fatura fa ON fa.fatura_id = fi.fatura_id WHERE fa.pedido_id IN ({marks}) "
+        f"GROUP BY fa.pedido_id ORDER BY fa.pedido_id",
+        *pedidos,
+    )
+    assert [tuple(row) for row in cur.fetchall()] == [
+        (pedidos[0], 2, Decimal('31.72')),
+        (pedidos[1], 1, Decimal('9.23')),
+    ]
+
+    # A later status update of a finalised order does not bill it again
+    cur.execute(f"UPDATE Pedido SET status = 'finalizado' WHERE pedido_id IN ({marks})", *pedidos)
+    cur.execute(f'SELECT COUNT(*) FROM Fatura WHERE pedido_id IN ({marks})', *pedidos)
+    assert cur.fetchone()[0] == 2
+
+
+def summary(cur, days_ago: int = 0) -> dict:
+    cur.execute(
+        "SELECT categoria_id, percentual_iva, linhas, quantidade, valor_liquido, valor_iva, valor_total "
+        "FROM ResumoFaturacaoDiaria WHERE data = CAST(DATEADD(DAY, -?, GETDATE()) AS DATE)",
+        days_ago,
+    )
+    return {(row[0], row[1]): tuple(row[2:]) for row in cur.fetchall()}
+
+
+def lines_summary(cur, days_ago: int = 0) -> dict:
+    """``summary`` computed directly from FaturaItem."""
+    cur.execute(
+        "SELECT fi.categoria_id, fi.percentual_iva, COUNT(*), SUM(fi.quantidade), SUM(fi.valor_liquido), "
+        "SUM(fi.valor_iva), SUM(fi.valor_total_linha) FROM FaturaItem fi "
+        "JOIN Fatura fa ON fa.fatura_id = fi.fatura_id "
+        "WHERE CAST(fa.data_emissao AS DATE) = CAST(DATEADD(DAY, -?, GETDATE()) AS DATE) "
+        "GROUP BY fi.categoria_id, fi.percentual_iva",
+        days_ago,
+    )
+    return {(row[0], row[1]): tuple(row[2:]) for row in cur.fetchall()}
+
+
+def total_faturado_hoje(cur) -> Decimal:
+    cur.execute(
+        'EXEC sp_obter_faturamento_por_periodo @data_inicio = ?, @data_fim = ?',
+        date.today(), date.today(),
+    )
+    return cur.fetchone()[2]
+
+
+def test_daily_summary_follows_invoice_lines(cur):
+    before = summary(cur)
+    total_before = total_faturado_hoje(cur)
+    pedidos = finalize_sample_pedidos(cur)
+    marks = ', '.join('?' for _ in pedidos)
+
+    cur.execute(
+        f"SELECT fi.categoria_id, fi.percentual_iva, COUNT(*), SUM(fi.quantidade), SUM(fi.valor_liquido), "
+        f"SUM(fi.valor_iva), SUM(fi.valor_total_linha) FROM FaturaItem fi "
+        f"JOIN Fatura fa ON fa.fatura_id = fi.fatura_id WHERE fa.pedido_id IN ({marks}) "
+        f"GROUP BY fi.categoria_id, fi.percentual_iva",
+        *pedidos,
+    )
+    added = {(row[0], row[1]): tuple(row[2:]) for row in cur.fetchall()}
+    assert len(added) == 3
+    expected = dict(before)
+    for key, values in added.items():
+        expected[key] = tuple(a + b for a, b in zip(expected.get(key, (0,) * 5), values))
+    assert summary(cur) == expected
+    assert total_faturado_hoje(cur) == total_before + Decimal('40.95')
+
+    # Rebuilding from FaturaItem gives the same figures as the trigger
+    cur.execute('EXEC sp_reconstruir_resumo_faturacao')
+    cur.fetchall()
+    assert summary(cur) == expected
+
+    # Deleting the invoices takes them back out of the summary
+    cur.execute(f'SELECT fatura_id FROM Fatura WHERE pedido_id IN ({marks})', *pedidos)
+    for (fatura_id,) in cur.fetchall():
+        cur.execute('EXEC sp_excluir_fatura @fatura_id = ?', fatura_id)
+        cur.fetchall()
+    assert summary(cur) == before
+    assert total_faturado_hoje(cur) == total_before
+
+
+def test_summary_follows_updated_lines_and_invoice_dates(cur):
+    pedidos = finalize_sample_pedidos(cur)
+    marks = ', '.join('?' for _ in pedidos)
+    before = summary(cur)
+
+    # Corrected amounts and quantities, in one UPDATE over both invoices
+    cur.execute(
+        f"UPDATE fi SET quantidade = fi.quantidade + 1, valor_liquido = fi.valor_liquido * 2, "
+        f"valor_iva = fi.valor_iva * 2, valor_total_linha = fi.valor_total_linha * 2 "
+        f"FROM FaturaItem fi JOIN Fatura fa ON fa.fatura_id = fi.fatura_id WHERE fa.pedido_id IN ({marks})",
+        *pedidos,
+    )
+    assert summary(cur) == lines_summary(cur) != before
+
+    # Moving an invoice to another day moves its lines in the summary
+    three_days_ago = summary(cur, 3)
+    cur.execute('UPDATE Fatura SET data_emissao = DATEADD(DAY, -3, data_emissao) WHERE pedido_id = ?', pedidos[0])
+    assert summary(cur) == lines_summary(cur)
+    assert summary(cur, 3) == lines_summary(cur, 3) != three_days_ago
+
+
+def test_backfill_migration_gives_invoices_lines(cur, database):
+    total_before = total_faturado_hoje(cur)
+    pedido_id = new_pedido(cur, [])
+    # An invoice written before FaturaItem existed: totals only
+    cur.execute(
+        "INSERT INTO Fatura (pedido_id, data_emissao, tipo_fatura, subtotal_comida, subtotal_bebida, "
+        "iva_comida, iva_bebida, total) VALUES (?, GETDATE(), 'consumidor_final', 10.00, 4.00, 1.30, 0.92, 16.22)",
+        pedido_id,
+    )
+    cur.execute('SELECT CAST(SCOPE_IDENTITY() AS INT)')
+    fatura_id = cur.fetchone()[0]
+
+    script = service.SQL_DIR / '12_backfill_fatura_item.sql'
+    text = script.read_text(encoding='utf-8').replace(service.DATABASE, database)
+    service.execute_sql(cur, text, script.name)
+    cur.execute(
+        'SELECT percentual_iva, valor_liquido, valor_iva, valor_total_linha FROM FaturaItem '
+        'WHERE fatura_id = ? ORDER BY percentual_iva',
+        fatura_id,
+    )
+    assert [tuple(row) for row in cur.fetchall()] == [
+        (Decimal('13.00'), Decimal('10.00'), Decimal('1.30'), Decimal('11.30')),
+        (Decimal('23.00'), Decimal('4.00'), Decimal('0.92'), Decimal('4.92')),
+    ]
+    # Reports and billing functions now agree and include the invoice
+    assert total_faturado_hoje(cur) == total_before + Decimal('16.22')
+    cur.execute('SELECT dbo.fn_calcular_total_faturado(?, ?)', date.today(), date.today())
+    assert cur.fetchone()[0] == total_faturado_hoje(cur)
+
+    # Applying the migration again does not add the lines twice
+    service.execute_sql(cur, text, script.name)
+    cur.execute('SELECT COUNT(*) FROM FaturaItem WHERE fatura_id = ?', fatura_id)
+    assert cur.fetchone()[0] == 2
+    assert summary(cur) == lines_summary(cur)
+
+    # The rebuild recomputes the summary only
+    cur.execute('EXEC sp_reconstruir_resumo_faturacao')
+    cur.fetchall()
+    assert summary(cur) == lines_summary(cur)
+    cur.execute('SELECT COUNT(*) FROM FaturaItem WHERE fatura_id = ?', fatura_id)
+    assert cur.fetchone()[0] == 2
+
+
+def test_manual_invoice_total_is_the_sum_of_its_lines(cur):
+    pedido_id = new_pedido(cur, [])
+    amounts = dict(pedido_id=pedido_id, subtotal_comida=Decimal('5.00'), subtotal_bebida=Decimal('2.00'),
+                   iva_comida=Decimal('0.65'), iva_bebida=Decimal('0.46'))
+    call = ('EXEC sp_cadastrar_fatura_manual @pedido_id = ?, @subtotal_comida = ?, @subtotal_bebida = ?, '
+            '@iva_comida = ?, @iva_bebida = ?')
+
+    with pytest.raises(pyodbc.Error, match='Total não corresponde'):
+        cur.execute(call + ', @total = ?', *amounts.values(), Decimal('9.00'))
+
+    cur.execute(call, *amounts.values())
+    fatura_id = cur.fetchone()[0]
+    cur.execute(
+        'SELECT fa.total, SUM(fi.valor_total_linha) FROM Fatura fa '
+        'JOIN FaturaItem fi ON fi.fatura_id = fa.fatura_id WHERE fa.fatura_id = ? GROUP BY fa.total',
+        fatura_id,
+    )
+    assert tuple(cur.fetchone()) == (Decimal('8.11'), Decimal('8.11'))
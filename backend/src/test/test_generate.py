@@ -0,0 +1,150 @@
+import random
+import sys
+from datetime import date
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+# Ensure db package is in path
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+import db.service as service
+
+DAYS = 40
+
+
+def test_orders_for_day_follow_the_week():
+    rng = random.Random(1)
+    # Averaged over a year of weeks, Saturday is the busiest day and Monday the quietest
+    totals = [0] * 7
+    for week in range(52):
+        for weekday in range(7):
+            day = date.fromordinal(date(2024, 1, 1).toordinal() + week * 7 + weekday)
+            totals[day.weekday()] += service.orders_for_day(rng, day, 100)
+    assert max(totals) == totals[5]
+    assert min(totals) == totals[0]
+
+
+class FakeCursor:
+    def __init__(self, database, autocommit=False):
+        self.connection = SimpleNamespace(autocommit=autocommit)
+        self.database = database
+        self.executed = []
+
+    def execute(self, sql, *params):
+        self.executed.append(sql)
+
+    def fetchone(self):
+        return (self.database,)
+
+
+def test_generate_data_refuses_the_application_database():
+    cursor = FakeCursor(service.DATABASE.upper())
+    with pytest.raises(RuntimeError, match='Refusing to generate data'):
+        service.generate_data(cursor)
+    assert cursor.executed == ['SELECT DB_NAME()']
+
+
+def test_generate_data_needs_a_transaction():
+    # Under autocommit a failed load would leave the triggers disabled
+    cursor = FakeCursor('botecopro_carga', autocommit=True)
+    with pytest.raises(RuntimeError, match='must run in a transaction'):
+        service.generate_data(cursor)
+    assert cursor.executed == []
+
+
+@pytest.fixture(scope='module')
+def generated(module_cur):
+    module_cur.execute('SELECT COUNT(*), ISNULL(MAX(pedido_id), 0) FROM Pedido')
+    before, last_pedido = module_cur.fetchone()
+    counts = service.generate_data(module_cur, days=DAYS, orders_per_day=20, clients=50, reservations=100,
+                                   seed=3, batch_size=100)
+    return before, last_pedido, counts
+
+
+def test_generated_volumes(module_cur, generated):
+    before, _, counts = generated
+    assert counts['clientes'] == 50 and counts['reservas'] == 100
+    assert counts['pedidos'] > DAYS * 10
+    module_cur.execute('SELECT COUNT(*) FROM Pedido')
+    assert module_cur.fetchone()[0] == before + counts['pedidos']
+    module_cur.execute('SELECT COUNT(*) FROM Reserva WHERE status NOT IN (?, ?, ?)', 'ativa', 'confirmada', 'cancelada')
+    assert module_cur.fetchone()[0] == 0
+
+
+def test_generated_orders_are_invoiced_on_their_own_dates(module_cur, generated):
+    _, _, counts = generated
+    module_cur.execute(
+        "SELECT COUNT(*), SUM(CASE WHEN CAST(fa.data_emissao AS DATE) < CAST(GETDATE() AS DATE) THEN 1 ELSE 0 END) "
+        "FROM Fatura fa JOIN Pedido p ON p.pedido_id = fa.pedido_id "
+        "WHERE p.data_pedido >= DATEADD(DAY, ?, CAST(GETDATE() AS DATE)) "
+        "  AND fa.data_emissao BETWEEN p.data_pedido AND DATEADD(HOUR, 2, p.data_pedido)",
+        -DAYS,
+    )
+    invoiced, in_the_past = module_cur.fetchone()
+    assert invoiced >= counts['faturas'] > 0
+    assert in_the_past == invoiced
+
+
+def test_generated_stock_follows_the_movements(module_cur, generated):
+    _, last_pedido, _ = generated
+    module_cur.execute(
+        "SELECT p.produto_id, p.stock_atual, "
+        "       ISNULL(SUM(CASE me.tipo WHEN 'entrada' THEN me.quantidade WHEN 'saida' THEN -me.quantidade END), 0) "
+        "FROM Produto p LEFT JOIN MovimentacaoEstoque me ON me.produto_id = p.produto_id "
+        "GROUP BY p.produto_id, p.stock_atual"
+    )
+    assert [row for row in module_cur.fetchall() if row[1] != row[2]] == []
+
+    # The bulk saidas stand in for the stock trigger: one per ingredient or product
+    # sold, truncated to MovimentacaoEstoque's INT quantity as the trigger's are
+    module_cur.execute(
+        "SELECT produto_id, SUM(quantidade) FROM ("
+        "  SELECT pi.produto_id, CAST(pi.quantidade_necessaria * it.quantidade AS INT) AS quantidade "
+        "  FROM PedidoItem it JOIN Pedido p ON p.pedido_id = it.pedido_id "
+        "  JOIN PratoIngrediente pi ON pi.prato_id = it.prato_id "
+        "  WHERE it.pedido_id > ? AND p.status <> 'cancelado' "
+        "  UNION ALL "
+        "  SELECT it.produto_id, it.quantidade "
+        "  FROM PedidoItem it JOIN Pedido p ON p.pedido_id = it.pedido_id "
+        "  WHERE it.pedido_id > ? AND p.status <> 'cancelado' AND it.prato_id IS NULL"
+        ") sold GROUP BY produto_id",
+        last_pedido, last_pedido,
+    )
+    sold = dict(module_cur.fetchall())
+    module_cur.execute(
+        "SELECT produto_id, SUM(quantidade) FROM MovimentacaoEstoque "
+        "WHERE pedido_id > ? AND tipo = 'saida' GROUP BY produto_id",
+        last_pedido,
+    )
+    assert dict(module_cur.fetchall()) == sold and sold
+
+
+def test_generated_summary_matches_the_invoice_lines(module_cur, generated):
+    module_cur.execute(
+        "SELECT CAST(fa.data_emissao AS DATE), fi.categoria_id, fi.percentual_iva, COUNT(*), SUM(fi.quantidade), "
+        "       SUM(fi.valor_liquido), SUM(fi.valor_iva), SUM(fi.valor_total_linha) "
+        "FROM FaturaItem fi JOIN Fatura fa ON fa.fatura_id = fi.fatura_id "
+        "GROUP BY CAST(fa.data_emissao AS DATE), fi.categoria_id, fi.percentual_iva"
+    )
+    lines = {tuple(row[:3]): tuple(row[3:]) for row in module_cur.fetchall()}
+    module_cur.execute(
+        'SELECT data, categoria_id, percentual_iva, linhas, quantidade, valor_liquido, valor_iva, valor_total '
+        'FROM ResumoFaturacaoDiaria'
+    )
+    assert {tuple(row[:3]): tuple(row[3:]) for row in module_cur.fetchall()} == lines
+    # Every invoice with a total, generated ones included, is in the lines
+    module_cur.execute(
+        'SELECT COUNT(*) FROM Fatura fa WHERE fa.total <> 0 '
+        'AND NOT EXISTS (SELECT 1 FROM FaturaItem fi WHERE fi.fatura_id = fa.fatura_id)'
+    )
+    assert module_cur.fetchone()[0] == 0
+
+
+def test_triggers_are_enabled_again(module_cur, generated):
+    names = [trigger for trigger, _ in service.GENERATOR_DISABLED_TRIGGERS]
+    module_cur.execute(
+        f"SELECT COUNT(*) FROM sys.triggers WHERE is_disabled = 1 AND name IN ({', '.join('?' * len(names))})",
+        *names,
+    )
+    assert module_cur.fetchone()[0] == 0
@@ -0,0 +1,123 @@
+import xml.etree.ElementTree as ET
+
+import pytest
+
+from .helpers import NUMBERS, ROWS, new_pedido
+
+SHOWPLAN = '{http://schemas.microsoft.com/sqlserver/2004/07/showplan}'
+
+# NUMBERS plus f: every employee with k = 0..total-1, for i % total
+NUMBERS_AND_EMPLOYEES = NUMBERS + (
+    ", f AS (SELECT funcionario_id, ROW_NUMBER() OVER (ORDER BY funcionario_id) - 1 AS k, "
+    "COUNT(*) OVER () AS total FROM Funcionario) "
+)
+
+
+@pytest.fixture(scope='module', autouse=True)
+def seeded(module_cur):
+    seed(module_cur)
+
+
+def seed(cur):
+    """Closed orders, their items, supplier orders and hours spread over every employee."""
+    cur.execute('CREATE TABLE #pedidos (pedido_id INT)')
+    cur.execute(
+        NUMBERS_AND_EMPLOYEES +
+        "INSERT INTO Pedido (mesa_id, funcionario_id, data_pedido, status) "
+        "OUTPUT inserted.pedido_id INTO #pedidos "
+        "SELECT m.mesa_id, f.funcionario_id, DATEADD(MINUTE, -i, GETDATE()), "
+        "       CASE WHEN i % 2 = 0 THEN 'finalizado' ELSE 'cancelado' END "
+        "FROM n JOIN f ON f.k = n.i % f.total CROSS JOIN (SELECT TOP 1 mesa_id FROM Mesa) m"
+    )
+    cur.execute(
+        "INSERT INTO PedidoItem (pedido_id, prato_id, produto_id, quantidade, preco_unitario, iva) "
+        "SELECT p.pedido_id, NULL, pr.produto_id, 1, 1.00, 23.00 "
+        "FROM #pedidos p CROSS JOIN (SELECT TOP 1 produto_id FROM Produto ORDER BY produto_id) pr"
+    )
+    cur.execute('CREATE TABLE #encomendas (encomenda_id INT)')
+    cur.execute(
+        "INSERT INTO Encomenda (fornecedor_id, data_encomenda, status, valor_total) "
+        "OUTPUT inserted.encomenda_id INTO #encomendas "
+        "SELECT TOP (?) fo.fornecedor_id, GETDATE(), 'pendente', 0.00 "
+        "FROM Fornecedor fo CROSS JOIN sys.all_objects",
+        ROWS // 10,
+    )
+    cur.execute(
+        "INSERT INTO EncomendaItem (encomenda_id, produto_id, quantidade, preco_unitario) "
+        "SELECT e.encomenda_id, p.produto_id, 1, 1.00 "
+        "FROM #encomendas e CROSS JOIN (SELECT TOP 10 produto_id FROM Produto ORDER BY produto_id) p"
+    )
+    cur.execute(
+        NUMBERS_AND_EMPLOYEES +
+        "INSERT INTO RegistroHoras (funcionario_id, data_registro, horas_normais, horas_extra) "
+        "SELECT f.funcionario_id, DATEADD(DAY, -(i / f.total), CAST(GETDATE() AS DATE)), 8.00, 0.00 "
+        "FROM n JOIN f ON f.k = n.i % f.total"
+    )
+    for table in ('Pedido', 'PedidoItem', 'EncomendaItem', 'RegistroHoras'):
+        cur.execute(f'UPDATE STATISTICS {table}')
+
+
+def access_paths(cur, sql, *params) -> list:
+    """Run ``sql`` and return (physical operator, index) for every access to a user table."""
+    cur.execute('SET STATISTICS XML ON')
+    cur.execute(sql, *params)
+    plans = []
+    while True:
+        if cur.description and 'Showplan' in cur.description[0][0]:
+            plans.extend(row[0] for row in cur.fetchall())
+        elif cur.description:
+            cur.fetchall()
+        if not cur.nextset():
+            break
+    cur.execute('SET STATISTICS XML OFF')
+
+    paths = []
+    for plan in plans:
+        for relop in ET.fromstring(plan).iter(f'{SHOWPLAN}RelOp'):
+            for access in relop:
+                obj = access.find(f'{SHOWPLAN}Object')
+                if obj is not None and obj.get('Table') and not obj.get('Table').startswith('[#'):
+                    paths.append((relop.get('PhysicalOp'), obj.get('Table'), obj.get('Index')))
+    return paths
+
+
+def assert_seeks(paths, table, index):
+    used = [path for path in paths if path[1] == f'[{table}]']
+    assert used, paths
+    assert all('Seek' in op for op, _, _ in used), used
+    assert any(ix == f'[{index}]' for _, _, ix in used), used
+
+
+def test_pedidos_por_funcionario_seeks(module_cur):
+    module_cur.execute('SELECT TOP 1 funcionario_id FROM Funcionario ORDER BY funcionario_id')
+    funcionario_id = module_cur.fetchone()[0]
+    paths = access_paths(module_cur, 'EXEC sp_obter_pedidos_por_funcionario @funcionario_id = ?', funcionario_id)
+    assert_seeks(paths, 'Pedido', 'idx_pedido_funcionario_status')
+
+
+def test_fatura_ao_finalizar_pedido_seeks_itens(module_cur):
+    module_cur.execute('SELECT TOP 1 produto_id FROM Produto ORDER BY produto_id')
+    produto_id = module_cur.fetchone()[0]
+    pedido_id = new_pedido(module_cur, [(None, produto_id, 1, 1.00, 23.00)])
+    # trg_gerar_fatura_ao_finalizar_pedido reads the order's items
+    paths = access_paths(module_cur, "UPDATE Pedido SET status = 'finalizado' WHERE pedido_id = ?", pedido_id)
+    assert_seeks(paths, 'PedidoItem', 'idx_pedidoitem_pedido')
+
+
+def test_receber_encomenda_seeks_itens(module_cur):
+    module_cur.execute('SELECT TOP 1 encomenda_id FROM #encomendas ORDER BY encomenda_id DESC')
+    encomenda_id = module_cur.fetchone()[0]
+    # trg_receber_encomenda reads the supplier order's items
+    paths = access_paths(module_cur, "UPDATE Encomenda SET status = 'recebida' WHERE encomenda_id = ?", encomenda_id)
+    assert_seeks(paths, 'EncomendaItem', 'idx_encomendaitem_encomenda')
+
+
+def test_horas_trabalhadas_seek(module_cur):
+    module_cur.execute('SELECT TOP 1 funcionario_id FROM Funcionario ORDER BY funcionario_id')
+    funcionario_id = module_cur.fetchone()[0]
+    paths = access_paths(
+        module_cur,
+        'EXEC sp_obter_horas_trabalhadas @funcionario_id = ?, @data_inicio = ?, @data_fim = ?',
+        funcionario_id, '2020-01-01', '2099-12-31',
+    )
+    assert_seeks(paths, 'RegistroHoras', 'idx_reghoras_funcionario_data')
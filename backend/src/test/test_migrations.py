@@ -0,0 +1,169 @@
+import os
+import re
+import sys
+from pathlib import Path
+
+import pytest
+import pyodbc
+
+# Ensure db package is in path
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+import db.service as service
+from db.service import SqlBatch
+
+
+def test_split_batches_on_go_lines():
+    script = 'USE botecopro_db;\ngo\n\nSELECT 1;\n  GO   \nSELECT 2;\nGO -- fim\n'
+    assert service.split_batches(script) == [
+        SqlBatch('USE botecopro_db;', 1, 1),
+        SqlBatch('SELECT 1;', 1, 4),
+        SqlBatch('SELECT 2;', 1, 6),
+    ]
+
+
+def test_split_batches_repeat_count_and_last_batch_without_go():
+    script = "INSERT INTO Mesa (numero) VALUES (1);\nGO 3\nSELECT COUNT(*) FROM Mesa"
+    assert service.split_batches(script) == [
+        SqlBatch('INSERT INTO Mesa (numero) VALUES (1);', 3, 1),
+        SqlBatch('SELECT COUNT(*) FROM Mesa', 1, 3),
+    ]
+
+
+def test_split_batches_ignores_go_in_comments_and_strings():
+    script = (
+        "/* cabeçalho\n"
+        "GO\n"
+        "   /* aninhado */\n"
+        "GO\n"
+        "*/\n"
+        "SELECT 'linha\n"
+        "GO\n"
+        "it''s' -- GO\n"
+        "GO\n"
+        "GOTO_LABEL:\n"
+        "SELECT 1\n"
+    )
+    batches = service.split_batches(script)
+    assert [b.line for b in batches] == [1, 10]
+    assert batches[0].sql.endswith("it''s' -- GO")
+    assert batches[1].sql == 'GOTO_LABEL:\nSELECT 1'
+
+
+def test_checksum_ignores_line_endings_and_trailing_whitespace():
+    assert service.checksum('SELECT 1;\nGO\n') == service.checksum('SELECT 1;   \r\nGO\r\n\r\n')
+    assert service.checksum('SELECT 1;') != service.checksum('SELECT 2;')
+
+
+def test_pending_migrations_are_new_or_changed(tmp_path):
+    for name, body in [('01_a.sql', 'SELECT 1;'), ('02_b.sql', 'SELECT 2;'), ('03_c.sql', 'SELECT 3;')]:
+        (tmp_path / name).write_text(body, encoding='utf-8')
+    applied = {
+        '01_a.sql': service.checksum('SELECT 1;'),
+        '02_b.sql': service.checksum('SELECT 20;'),
+    }
+    pending = service.pending_migrations(list(tmp_path.glob('*.sql')), applied)
+    assert [(path.name, status) for path, status, _ in pending] == [('02_b.sql', 'changed'), ('03_c.sql', 'new')]
+    assert pending[0][2] == service.checksum('SELECT 2;')
+
+
+class FakeCursor:
+    def __init__(self, fail_on=None):
+        self.executed = []
+        self.fail_on = fail_on
+
+    def execute(self, sql, *params):
+        if sql == self.fail_on:
+            raise service.pyodbc.Error('42S01', 'There is already an object named Mesa')
+        self.executed.append(sql)
+
+    def nextset(self):
+        return False
+
+
+def test_execute_sql_file_repeats_and_reports_failing_line(tmp_path):
+    script = tmp_path / '05_x.sql'
+    script.write_text('SELECT 1;\nGO 2\n\nCREATE TABLE Mesa (id INT);\nGO\n', encoding='utf-8')
+    cursor = FakeCursor()
+    assert service.execute_sql_file(cursor, script) == 2
+    assert cursor.executed == ['SELECT 1;', 'SELECT 1;', 'CREATE TABLE Mesa (id INT);']
+
+    with pytest.raises(RuntimeError, match='^05_x.sql, batch at line 4:'):
+        service.execute_sql_file(FakeCursor(fail_on='CREATE TABLE Mesa (id INT);'), script)
+
+
+def test_scripts_only_create_guarded_objects():
+    # A changed script runs again in full, so a batch may not start with a bare
+    # CREATE; temporary procedures are dropped first and only live for the script
+    for script in sorted(service.SQL_DIR.glob('*.sql')):
+        for batch in service.split_batches(script.read_text(encoding='utf-8')):
+            code = re.sub(r'/\*.*?\*/|--[^\n]*', '', batch.sql, flags=re.S).strip()
+            if re.match(r'CREATE\b', code, re.I):
+                assert re.match(r'CREATE\s+(OR\s+ALTER\s+\w+|PROCEDURE\s+#)', code, re.I), \
+                    f'{script.name}, batch at line {batch.line}'
+
+
+def table_counts(cursor) -> dict:
+    cursor.execute("SELECT name FROM sys.tables WHERE is_ms_shipped = 0")
+    tables = [name for (name,) in cursor.fetchall()]
+    counts = {}
+    for name in tables:
+        cursor.execute(f'SELECT COUNT(*) FROM dbo.[{name}]')
+        counts[name] = cursor.fetchone()[0]
+    return counts
+
+
+def test_changed_scripts_can_be_applied_twice(database):
+    connection = pyodbc.connect(os.environ['BOTECOPRO_DB_DSN'], autocommit=True)
+    cursor = connection.cursor()
+    cursor.execute(f'USE [{database}]')
+    before = table_counts(cursor)
+    indexes = index_stats_dates(cursor)
+
+    # The clone was built from these scripts; as after an edit, migrate runs each one again
+    for _ in range(2):
+        for script in sorted(service.SQL_DIR.glob('*.sql')):
+            text = script.read_text(encoding='utf-8').replace(service.DATABASE, database)
+            service.execute_sql(cursor, text, script.name)
+
+    cursor.execute(f'USE [{database}]')
+    assert table_counts(cursor) == before
+    # Altering the indexed view drops its index; the script creates it again
+    cursor.execute(
+        "SELECT INDEXPROPERTY(OBJECT_ID('dbo.mv_estoque_saida_agregado'), 'idx_mv_estoque_saida_agregado', 'IndexID')"
+    )
+    assert cursor.fetchone()[0] is not None
+    assert service.reconcile_stock(cursor, fix=False) == []
+    # Unchanged indexes are left alone rather than rebuilt
+    assert index_stats_dates(cursor) == indexes
+    connection.close()
+
+
+def index_stats_dates(cursor) -> dict:
+    """Statistics date of every index created by 07_create_indices.sql; a rebuild renews it."""
+    cursor.execute(
+        "SELECT i.name, STATS_DATE(i.object_id, i.index_id) FROM sys.indexes i "
+        "JOIN sys.tables t ON t.object_id = i.object_id WHERE i.name LIKE 'idx[_]%' AND i.type = 2"
+    )
+    return dict(cursor.fetchall())
+
+
+def test_changed_index_definition_is_rebuilt(database):
+    connection = pyodbc.connect(os.environ['BOTECOPRO_DB_DSN'], autocommit=False)
+    cursor = connection.cursor()
+    cursor.execute(f'USE [{database}]')
+    # An index as an older 07_create_indices.sql defined it
+    cursor.execute(
+        'CREATE NONCLUSTERED INDEX idx_fatura_data ON Fatura (data_emissao, fatura_id) WITH (DROP_EXISTING = ON)'
+    )
+    script = service.SQL_DIR / '07_create_indices.sql'
+    service.execute_sql(cursor, script.read_text(encoding='utf-8').replace(service.DATABASE, database), script.name)
+    cursor.execute(
+        "SELECT c.name, ic.is_included_column FROM sys.index_columns ic "
+        "JOIN sys.indexes i ON i.object_id = ic.object_id AND i.index_id = ic.index_id "
+        "JOIN sys.columns c ON c.object_id = ic.object_id AND c.column_id = ic.column_id "
+        "WHERE i.object_id = OBJECT_ID('dbo.Fatura') AND i.name = 'idx_fatura_data' "
+        "ORDER BY ic.is_included_column, ic.key_ordinal"
+    )
+    assert [tuple(row) for row in cursor.fetchall()] == [('data_emissao', False), ('total', True)]
+    connection.rollback()
+    connection.close()
@@ -0,0 +1,126 @@
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+# Ensure api package is in path
+sys.path.append(str(Path(__file__).resolve().parents[1] / 'api'))
+from boteco.db import ConnectionPool, PoolTimeout
+
+
+class FakeCursor:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def execute(self, *args):
+        if self.conn.broken:
+            raise RuntimeError('connection lost')
+        return self
+
+    def fetchone(self):
+        return (1,)
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    def __init__(self):
+        self.autocommit = False
+        self.broken = False
+        self.closed = False
+        self.rollbacks = 0
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def rollback(self):
+        if self.broken:
+            raise RuntimeError('connection lost')
+        self.rollbacks += 1
+
+    def close(self):
+        self.closed = True
+
+
+def make_pool(**kwargs):
+    created = []
+
+    def factory():
+        conn = FakeConnection()
+        created.append(conn)
+        return conn
+
+    return ConnectionPool(factory, **kwargs), created
+
+
+def test_connections_are_reused():
+    pool, created = make_pool(max_size=2, min_idle=0)
+    with pool.connection() as first:
+        pass
+    with pool.connection() as second:
+        pass
+    assert first is second
+    assert len(created) == 1
+    assert first.rollbacks == 2
+    assert pool.stats()['checkouts'] == 2
+
+
+def test_fill_opens_min_idle_connections():
+    pool, created = make_pool(max_size=5, min_idle=3)
+    pool.fill()
+    stats = pool.stats()
+    assert len(created) == 3
+    assert stats['idle'] == 3
+    assert stats['in_use'] == 0
+
+
+def test_pool_is_bounded():
+    pool, _ = make_pool(max_size=1, min_idle=0, timeout=0.05)
+    entry = pool.acquire()
+    with pytest.raises(PoolTimeout):
+        pool.acquire()
+    pool.release(entry)
+    assert pool.stats()['timeouts'] == 1
+
+
+def test_waiter_gets_released_connection():
+    pool, created = make_pool(max_size=1, min_idle=0, timeout=5)
+    entry = pool.acquire()
+    result = []
+    waiter = threading.Thread(target=lambda: result.append(pool.acquire()))
+    waiter.start()
+    pool.release(entry)
+    waiter.join(timeout=5)
+    assert result and result[0].conn is created[0]
+    assert pool.stats()['waits'] == 1
+
+
+def test_unhealthy_connection_is_replaced():
+    pool, created = make_pool(max_size=1, min_idle=0, ping_after=0)
+    with pool.connection() as conn:
+        pass
+    conn.broken = True
+    with pool.connection() as replacement:
+        pass
+    assert replacement is not conn
+    assert conn.closed
+    assert pool.stats()['health_check_failures'] == 1
+
+
+def test_expired_connection_is_closed_on_release():
+    pool, created = make_pool(max_size=1, min_idle=0, max_lifetime=0.0001)
+    with pool.connection() as conn:
+        time.sleep(0.01)
+    assert conn.closed
+    assert pool.stats()['size'] == 0
+
+
+def test_session_state_reset_on_release():
+    pool, _ = make_pool(max_size=1, min_idle=0)
+    with pool.connection() as conn:
+        conn.autocommit = True
+    assert conn.autocommit is False
+    assert conn.rollbacks == 1
@@ -0,0 +1,133 @@
+import datetime
+import decimal
+import sys
+from pathlib import Path
+
+import pytest
+
+# Ensure api package is in path
+sys.path.append(str(Path(__file__).resolve().parents[1] / 'api'))
+from boteco.query import QueryError, ViewQuery, decode_cursor, encode_cursor, parse_order_by
+
+TYPES = {'pedido_id': 'int', 'mesa_id': 'int', 'funcionario_id': 'int',
+         'data_pedido': 'datetime', 'status': 'varchar'}
+COLUMNS = list(TYPES)
+
+
+def test_order_by_appends_key_as_tie_breaker():
+    assert parse_order_by('-data_pedido', COLUMNS, ('pedido_id',)) == [
+        ('data_pedido', True), ('pedido_id', False)]
+    assert parse_order_by('pedido_id', COLUMNS, ('pedido_id',)) == [('pedido_id', False)]
+    assert parse_order_by('-mes', ['ano', 'mes', 'total_faturado'], ('ano', 'mes')) == [
+        ('mes', True), ('ano', False)]
+
+
+def test_order_by_rejects_unknown_columns():
+    with pytest.raises(QueryError):
+        parse_order_by('pedido_id; DROP TABLE Pedido', COLUMNS)
+
+
+def test_cursor_round_trips_typed_values():
+    order = [('data_pedido', True), ('pedido_id', False)]
+    row = {'data_pedido': datetime.datetime(2025, 6, 1, 20, 30), 'pedido_id': 42}
+    assert decode_cursor(encode_cursor(order, row), order) == [row['data_pedido'], 42]
+    row = {'data_pedido': decimal.Decimal('12.50'), 'pedido_id': None}
+    assert decode_cursor(encode_cursor(order, row), order) == [decimal.Decimal('12.50'), None]
+
+
+def test_cursor_must_match_order_by():
+    token = encode_cursor([('pedido_id', False)], {'pedido_id': 1})
+    with pytest.raises(QueryError):
+        ViewQuery('view_pedidos_em_andamento', TYPES, order_by='-data_pedido', limit=10, cursor=token)
+    with pytest.raises(QueryError):
+        ViewQuery('view_pedidos_em_andamento', TYPES, limit=10, cursor='not-a-cursor')
+
+
+def test_first_page_sql():
+    query = ViewQuery('view_pedidos_em_andamento', TYPES, order_by='-data_pedido', limit=20)
+    sql, params = query.build()
+    assert sql == ('SELECT TOP (?) * FROM [view_pedidos_em_andamento] '
+                   'ORDER BY [data_pedido] DESC, [pedido_id] ASC')
+    assert params == [21]
+
+
+def test_next_page_uses_keyset_predicate():
+    first = ViewQuery('view_pedidos_em_andamento', TYPES, order_by='-data_pedido', limit=2)
+    when = datetime.datetime(2025, 6, 1, 20, 30)
+    rows = [{'pedido_id': i, 'data_pedido': when} for i in (1, 2, 3)]
+    page, token = first.paginate(rows)
+    assert page == rows[:2]
+    sql, params = ViewQuery('view_pedidos_em_andamento', TYPES, order_by='-data_pedido',
+                            limit=2, cursor=token).build()
+    assert ('WHERE ((([data_pedido] < ? OR [data_pedido] IS NULL)) '
+            'OR ([data_pedido] = ? AND [pedido_id] > ?))') in sql
+    assert params == [3, when, when, 2]
+
+
+def test_last_page_has_no_cursor():
+    query = ViewQuery('view_mesas_disponiveis', {'mesa_id': 'int'}, limit=5)
+    assert query.paginate([{'mesa_id': 1}]) == ([{'mesa_id': 1}], None)
+
+
+def test_projection_and_filters_are_parameterised():
+    query = ViewQuery('view_pedidos_em_andamento', TYPES, select='pedido_id,status',
+                      filters=[('funcionario_id', '3'), ('data_pedido__gte', '2025-06-01'),
+                               ('status__in', 'pendente,em_preparo')])
+    sql, params = query.build()
+    assert sql == ('SELECT [pedido_id], [status] FROM [view_pedidos_em_andamento] '
+                   'WHERE [funcionario_id] = ? AND [data_pedido] >= ? AND [status] IN (?, ?)')
+    assert params == [3, datetime.datetime(2025, 6, 1), 'pendente', 'em_preparo']
+
+
+def test_filters_are_validated_against_columns_and_types():
+    with pytest.raises(QueryError):
+        ViewQuery('view_pedidos_em_andamento', TYPES, filters=[('funcionario_id', 'abc')])
+    with pytest.raises(QueryError):
+        ViewQuery('view_pedidos_em_andamento', TYPES, filters=[('nome', 'x')])
+    with pytest.raises(QueryError):
+        ViewQuery('view_pedidos_em_andamento', TYPES, filters=[('status__like', 'p%')])
+    with pytest.raises(QueryError):
+        ViewQuery('view_pedidos_em_andamento', TYPES, select='pedido_id,[status]')
+
+
+def test_order_columns_are_fetched_but_not_returned_when_not_selected():
+    query = ViewQuery('view_pedidos_em_andamento', TYPES, select='status', limit=1)
+    sql, _ = query.build()
+    assert sql.startswith('SELECT TOP (?) [status], [pedido_id] FROM')
+    rows, token = query.paginate([{'status': 'pendente', 'pedido_id': 1},
+                                  {'status': 'pendente', 'pedido_id': 2}])
+    assert rows == [{'status': 'pendente'}]
+    assert decode_cursor(token, query.order) == [1]
+
+
+def test_pages_through_a_view_whose_first_column_repeats():
+    columns = {'ano': 'int', 'mes': 'int', 'total_faturado': 'decimal'}
+    table = [{'ano': ano, 'mes': mes, 'total_faturado': decimal.Decimal(mes)}
+             for ano in (2024, 2025) for mes in (1, 2, 3)]
+
+    def run(query):
+        # Evaluate the keyset predicate the way SQL Server would
+        rows = table
+        if query.keys is not None:
+            ano, mes = query.keys
+            rows = [r for r in rows if r['ano'] > ano or (r['ano'] == ano and r['mes'] > mes)]
+        return query.paginate(rows[:query.limit + 1])
+
+    seen, token = [], None
+    while True:
+        query = ViewQuery('view_faturamento_periodo', columns, limit=1, cursor=token)
+        assert query.order == [('ano', False), ('mes', False)]
+        page, token = run(query)
+        seen += page
+        if token is None:
+            break
+    assert seen == table
+    sql, _ = query.build()
+    assert '([ano] = ? AND [mes] > ?)' in sql and sql.endswith('ORDER BY [ano] ASC, [mes] ASC')
+
+
+def test_views_without_a_unique_key_cannot_be_paginated():
+    with pytest.raises(QueryError, match='no unique key'):
+        ViewQuery('view_sem_chave', {'nome': 'varchar'}, limit=10)
+    sql, _ = ViewQuery('view_sem_chave', {'nome': 'varchar'}, order_by='-nome').build()
+    assert sql.endswith('ORDER BY [nome] DESC')
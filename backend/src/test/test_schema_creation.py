@@ -1,41 +1,31 @@
 import os
+import re
 from pathlib import Path
+
 import pytest
 import pyodbc
 
 SQL_DIR = Path(__file__).resolve().parents[1] / 'db' / 'sql'
 
-# Helper to execute scripts separated by GO
-def run_sql_script(cursor, path):
-    with open(path, 'r', encoding='utf-8') as f:
-        contents = f.read()
-    for statement in contents.split('\nGO'):
-        stmt = statement.strip()
-        if stmt:
-            cursor.execute(stmt)
-            try:
-                cursor.commit()
-            except Exception:
-                pass
-
-def get_connection():
-    dsn = os.getenv('BOTECOPRO_DB_DSN')
-    if not dsn:
-        return None
-    return pyodbc.connect(dsn, autocommit=True)
 
 @pytest.fixture(scope='session')
-def conn():
-    connection = get_connection()
-    if connection is None:
-        pytest.skip('BOTECOPRO_DB_DSN not configured')
+def conn(database):
+    # The database fixture built it from every script in db/sql
+    connection = pyodbc.connect(os.environ['BOTECOPRO_DB_DSN'], autocommit=True)
+    connection.cursor().execute(f'USE [{database}]')
     yield connection
     connection.close()
 
+
 def test_create_tables(conn):
     cur = conn.cursor()
-    run_sql_script(cur, SQL_DIR / '01_create_tables.sql')
     cur.execute("SELECT COUNT(*) FROM INFORMATION_SCHEMA.TABLES WHERE TABLE_NAME='Prato'")
     assert cur.fetchone()[0] == 1
 
 
+def test_every_scripted_table_exists(conn):
+    script = (SQL_DIR / '01_create_tables.sql').read_text(encoding='utf-8')
+    expected = set(re.findall(r'^CREATE TABLE (\w+)', script, re.MULTILINE))
+    cur = conn.cursor()
+    cur.execute("SELECT TABLE_NAME FROM INFORMATION_SCHEMA.TABLES WHERE TABLE_TYPE = 'BASE TABLE'")
+    assert expected <= {row[0] for row in cur.fetchall()}
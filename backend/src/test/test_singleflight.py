@@ -0,0 +1,60 @@
+import asyncio
+import sys
+from pathlib import Path
+
+# Ensure api package is in path
+sys.path.append(str(Path(__file__).resolve().parents[1] / 'api'))
+from boteco.singleflight import SingleFlight
+
+
+def test_concurrent_identical_calls_share_one_execution():
+    flight = SingleFlight()
+    executions = []
+
+    async def query():
+        executions.append(1)
+        await asyncio.sleep(0.01)
+        return ['mesa 1']
+
+    async def main():
+        return await asyncio.gather(*(flight.do(('view_mesas_disponiveis', ()), query,
+                                                group='view_mesas_disponiveis')
+                                      for _ in range(30)))
+
+    results = asyncio.run(main())
+    assert results == [['mesa 1']] * 30
+    assert len(executions) == 1
+    stats = flight.stats()
+    assert stats['collapsed'] == 29
+    assert stats['collapsed_by_view'] == {'view_mesas_disponiveis': 29}
+    assert stats['in_flight'] == 0
+
+
+def test_different_keys_run_separately_and_errors_fan_out():
+    flight = SingleFlight()
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise RuntimeError('boom')
+
+    async def main():
+        return await asyncio.gather(flight.do('a', fail), flight.do('a', fail),
+                                    flight.do('b', fail), return_exceptions=True)
+
+    results = asyncio.run(main())
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert flight.stats()['executions'] == 2
+
+
+def test_later_calls_start_a_new_execution():
+    flight = SingleFlight()
+    calls = []
+
+    async def query():
+        calls.append(1)
+        return len(calls)
+
+    async def main():
+        return [await flight.do('a', query), await flight.do('a', query)]
+
+    assert asyncio.run(main()) == [1, 2]
@@ -0,0 +1,214 @@
+import sys
+from collections import Counter
+from pathlib import Path
+
+# Ensure db package is in path
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+import db.service as service
+
+from .helpers import new_pedido
+
+ITEMS = 3000
+
+
+def test_multi_row_insert_deducts_stock_for_every_item(cur):
+    cur.execute(
+        'SELECT TOP 1 prato_id FROM PratoIngrediente '
+        'GROUP BY prato_id HAVING COUNT(*) > 1 ORDER BY prato_id'
+    )
+    prato_id = cur.fetchone()[0]
+    cur.execute('SELECT TOP 1 produto_id FROM Produto ORDER BY produto_id')
+    produto_id = cur.fetchone()[0]
+    cur.execute('SELECT produto_id, quantidade_necessaria FROM PratoIngrediente WHERE prato_id = ?', prato_id)
+    ingredientes = cur.fetchall()
+    pedido_id = new_pedido(cur)
+
+    # Alternate dish and product lines with varying quantities, all in one statement
+    cur.execute(
+        "WITH n AS (SELECT TOP (?) ROW_NUMBER() OVER (ORDER BY (SELECT NULL)) AS i "
+        "           FROM sys.all_objects a CROSS JOIN sys.all_objects b) "
+        "INSERT INTO PedidoItem (pedido_id, prato_id, produto_id, quantidade, preco_unitario, iva) "
+        "SELECT ?, CASE WHEN i % 2 = 0 THEN ? END, CASE WHEN i % 2 = 1 THEN ? END, "
+        "       1 + i % 3, 1.00, 13.00 "
+        "FROM n",
+        ITEMS, pedido_id, prato_id, produto_id,
+    )
+
+    expected = Counter()
+    for i in range(1, ITEMS + 1):
+        quantidade = 1 + i % 3
+        if i % 2 == 0:
+            for ingrediente, necessaria in ingredientes:
+                # The INT column truncates like CAST(... AS INT)
+                expected[ingrediente] += int(necessaria * quantidade)
+        else:
+            expected[produto_id] += quantidade
+
+    cur.execute(
+        "SELECT produto_id, SUM(quantidade), COUNT(*) FROM MovimentacaoEstoque "
+        "WHERE pedido_id = ? AND tipo = 'saida' GROUP BY produto_id",
+        pedido_id,
+    )
+    rows = cur.fetchall()
+    assert {produto: total for produto, total, _ in rows} == dict(expected)
+    assert sum(count for _, _, count in rows) == ITEMS // 2 * (len(ingredientes) + 1)
+
+
+def stock(cur, produtos) -> dict:
+    cur.execute(
+        f"SELECT produto_id, stock_atual FROM Produto WHERE produto_id IN ({', '.join('?' for _ in produtos)})",
+        *produtos,
+    )
+    return dict(cur.fetchall())
+
+
+def test_movements_adjust_stock_by_their_delta(cur):
+    cur.execute('SELECT TOP 2 produto_id FROM Produto ORDER BY produto_id')
+    first, second = [row[0] for row in cur.fetchall()]
+    before = stock(cur, [first, second])
+
+    cur.execute(
+        "INSERT INTO MovimentacaoEstoque (produto_id, data_movimentacao, tipo, quantidade, preco_unitario) "
+        "VALUES (?, GETDATE(), 'entrada', 40, 1.00), (?, GETDATE(), 'saida', 15, 1.00), "
+        "       (?, GETDATE(), 'saida', 3, 1.00)",
+        first, first, second,
+    )
+
+    assert stock(cur, [first, second]) == {first: before[first] + 25, second: before[second] - 3}
+
+
+def test_reconcile_repairs_drift(cur):
+    # Start from a consistent state so only the drift below is reported
+    service.reconcile_stock(cur, fix=True)
+    cur.execute('SELECT TOP 1 produto_id, stock_atual FROM Produto ORDER BY produto_id')
+    produto_id, stock_atual = cur.fetchone()
+    cur.execute('UPDATE Produto SET stock_atual = stock_atual + 7 WHERE produto_id = ?', produto_id)
+
+    drift = service.reconcile_stock(cur, fix=False)
+    assert [(row[0], row[2], row[3]) for row in drift] == [(produto_id, stock_atual + 7, stock_atual)]
+
+    repaired = service.reconcile_stock(cur, fix=True)
+    assert [row[0] for row in repaired] == [produto_id]
+    assert service.reconcile_stock(cur, fix=False) == []
+    assert stock(cur, [produto_id]) == {produto_id: stock_atual}
+
+
+def new_encomenda(cur, itens) -> int:
+    cur.execute(
+        "INSERT INTO Encomenda (fornecedor_id, data_encomenda, status, valor_total) "
+        "SELECT TOP 1 fornecedor_id, GETDATE(), 'pendente', 0.00 FROM Fornecedor"
+    )
+    cur.execute('SELECT CAST(SCOPE_IDENTITY() AS INT)')
+    encomenda_id = cur.fetchone()[0]
+    for produto_id, quantidade in itens:
+        cur.execute(
+            'INSERT INTO EncomendaItem (encomenda_id, produto_id, quantidade, preco_unitario) '
+            'VALUES (?, ?, ?, 1.00)',
+            encomenda_id, produto_id, quantidade,
+        )
+    return encomenda_id
+
+
+def test_receiving_several_encomendas_in_one_update(cur):
+    cur.execute('SELECT TOP 2 produto_id FROM Produto ORDER BY produto_id')
+    first, second = [row[0] for row in cur.fetchall()]
+    before = stock(cur, [first, second])
+    encomendas = [
+        new_encomenda(cur, [(first, 10), (second, 5)]),
+        new_encomenda(cur, [(first, 7)]),
+    ]
+    marks = ', '.join('?' for _ in encomendas)
+
+    cur.execute(f"UPDATE Encomenda SET status = 'recebida' WHERE encomenda_id IN ({marks})", *encomendas)
+    expected = {first: before[first] + 17, second: before[second] + 5}
+    assert stock(cur, [first, second]) == expected
+
+    # Touching an already received encomenda must not add the stock again
+    cur.execute(f"UPDATE Encomenda SET status = 'recebida' WHERE encomenda_id IN ({marks})", *encomendas)
+    assert stock(cur, [first, second]) == expected
+
+
+def pending_quantity(cur, produto_id) -> int:
+    cur.execute(
+        "SELECT ISNULL(SUM(ei.quantidade), 0) FROM EncomendaItem ei "
+        "JOIN Encomenda e ON e.encomenda_id = ei.encomenda_id "
+        "WHERE e.status = 'pendente' AND ei.produto_id = ?",
+        produto_id,
+    )
+    return cur.fetchone()[0]
+
+
+def test_reorder_groups_per_supplier_without_duplicates(cur):
+    cur.execute('SELECT TOP 2 produto_id FROM Produto WHERE fornecedor_id = '
+                '(SELECT TOP 1 fornecedor_id FROM Produto GROUP BY fornecedor_id HAVING COUNT(*) > 1) '
+                'ORDER BY produto_id')
+    produtos = [row[0] for row in cur.fetchall()]
+    # A sale inside the trigger path no longer creates any order
+    cur.execute('SELECT COUNT(*) FROM Encomenda')
+    encomendas_antes = cur.fetchone()[0]
+    for produto_id in produtos:
+        cur.execute(
+            "INSERT INTO MovimentacaoEstoque (produto_id, data_movimentacao, tipo, quantidade, preco_unitario) "
+            "SELECT produto_id, GETDATE(), 'saida', stock_atual - stock_minimo + 1, custo_unitario "
+            "FROM Produto WHERE produto_id = ?",
+            produto_id,
+        )
+    cur.execute('SELECT COUNT(*) FROM Encomenda')
+    assert cur.fetchone()[0] == encomendas_antes
+
+    orders = service.generate_reorders(cur)
+    assert orders
+    cur.execute(
+        f"SELECT produto_id, stock_encomenda - stock_atual FROM Produto "
+        f"WHERE produto_id IN ({', '.join('?' for _ in produtos)})",
+        *produtos,
+    )
+    for produto_id, needed in cur.fetchall():
+        assert pending_quantity(cur, produto_id) >= needed
+    # Both products share a supplier, so they land on the same order
+    cur.execute(
+        f"SELECT COUNT(DISTINCT ei.encomenda_id) FROM EncomendaItem ei "
+        f"JOIN Encomenda e ON e.encomenda_id = ei.encomenda_id "
+        f"WHERE e.status = 'pendente' AND e.encomenda_id IN ({', '.join('?' for _ in orders)}) "
+        f"AND ei.produto_id IN (?, ?)",
+        *[row[0] for row in orders], *produtos,
+    )
+    assert cur.fetchone()[0] == 1
+
+    # Running again finds everything already on order
+    assert service.generate_reorders(cur) == []
+
+
+# Definition of view_estoque_utilizado_detalhado before the index-backed rewrite
+DETALHADO_ORIGINAL = (
+    "SELECT agg.produto_id, p.nome, agg.quantidade_total, "
+    "(SELECT MIN(me2.data_movimentacao) FROM dbo.MovimentacaoEstoque AS me2 "
+    " WHERE me2.tipo = 'saida' AND me2.produto_id = agg.produto_id), "
+    "(SELECT MAX(me3.data_movimentacao) FROM dbo.MovimentacaoEstoque AS me3 "
+    " WHERE me3.tipo = 'saida' AND me3.produto_id = agg.produto_id) "
+    "FROM mv_estoque_saida_agregado AS agg JOIN dbo.Produto AS p ON agg.produto_id = p.produto_id"
+)
+
+
+def test_estoque_utilizado_detalhado_matches_original_definition(cur):
+    cur.execute('SELECT TOP 2 produto_id FROM Produto ORDER BY produto_id')
+    first, second = [row[0] for row in cur.fetchall()]
+    # Entradas outside the saida range must not move the dates
+    cur.execute(
+        "INSERT INTO MovimentacaoEstoque (produto_id, data_movimentacao, tipo, quantidade, preco_unitario) "
+        "VALUES (?, '2001-01-01', 'saida', 1, 1.00), (?, '2099-12-31', 'saida', 1, 1.00), "
+        "       (?, '1990-06-15', 'entrada', 5, 1.00), (?, '2098-01-01', 'saida', 2, 1.00)",
+        first, first, second, second,
+    )
+
+    cur.execute(
+        'SELECT produto_id, nome_produto, quantidade_total, data_inicio, data_fim '
+        'FROM view_estoque_utilizado_detalhado'
+    )
+    current = sorted(tuple(row) for row in cur.fetchall())
+    cur.execute(DETALHADO_ORIGINAL)
+    assert current == sorted(tuple(row) for row in cur.fetchall())
+
+    dates = {row[0]: (row[3].year, row[4].year) for row in current}
+    assert dates[first] == (2001, 2099)
+    assert dates[second][1] == 2098